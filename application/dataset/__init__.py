@@ -1,5 +1,16 @@
 from . import io, processing
+from .chunked import generate_training_sample_chunked
 from .dwh_export import build_tables, fetch_all_docs, save_data
+from .incremental import refresh_training_sample
 from .sampling import generate_training_sample
 
-__all__ = ["io", "processing", "generate_training_sample", "fetch_all_docs", "build_tables", "save_data"]
+__all__ = [
+    "io",
+    "processing",
+    "generate_training_sample",
+    "generate_training_sample_chunked",
+    "refresh_training_sample",
+    "fetch_all_docs",
+    "build_tables",
+    "save_data",
+]
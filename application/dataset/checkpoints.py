@@ -0,0 +1,85 @@
+"""
+Content-addressed checkpoints for the sampling stages.
+
+Every stage gets a key derived from the key of the stage before it, its own name and the config values it
+depends on; the first key is a content hash of the loaded input frames and of the source code of the stages
+(``source_fingerprint``). A stage output saved under its key is therefore valid for exactly one combination of
+inputs, code and config, and a rerun can resume from the last stage whose key still has a checkpoint on disk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import importlib.util
+import os
+import pickle
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+from loguru import logger
+
+# bump when stage outputs change without a change to the hashed source (e.g. a new version of a dependency)
+CHECKPOINT_VERSION = 1
+
+
+def frame_fingerprint(df: pd.DataFrame) -> str:
+    """Hash a DataFrame's contents (values, index, column names and dtypes)."""
+    h = hashlib.sha256()
+    h.update(repr(list(zip(df.columns, df.dtypes.astype(str), strict=True))).encode())
+    try:
+        h.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    except TypeError:  # unhashable cells (e.g. lists): fall back to the pickled frame
+        h.update(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL))
+    return h.hexdigest()
+
+
+def source_fingerprint(*packages: str) -> str:
+    """Hash the Python source files of ``packages`` (importable package names, sub-packages included)."""
+    h = hashlib.sha256()
+    for package in packages:
+        root = Path(importlib.util.find_spec(package).origin).parent
+        for path in sorted(root.rglob("*.py")):
+            h.update(f"{package}/{path.relative_to(root).as_posix()}".encode())
+            h.update(b"\0")
+            h.update(path.read_bytes())
+            h.update(b"\0")
+    return h.hexdigest()
+
+
+def fingerprint(*parts: Any) -> str:
+    """Hash a sequence of DataFrames and plain values (strings, numbers, tuples, ...) into one hex key."""
+    h = hashlib.sha256(f"v{CHECKPOINT_VERSION}".encode())
+    for part in parts:
+        h.update(frame_fingerprint(part).encode() if isinstance(part, pd.DataFrame) else repr(part).encode())
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class CheckpointStore:
+    """Pickle stage outputs under ``<root>/<stage>-<key>.pkl``; a ``None`` root disables checkpointing."""
+
+    def __init__(self, root: str | os.PathLike | None):
+        self.root = Path(root) if root is not None else None
+
+    def _path(self, stage: str, key: str) -> Path:
+        safe_stage = "".join(c if c.isalnum() or c in "-_" else "_" for c in stage)
+        return self.root / f"{safe_stage}-{key[:16]}.pkl"
+
+    def exists(self, stage: str, key: str) -> bool:
+        return self.root is not None and self._path(stage, key).exists()
+
+    def load(self, stage: str, key: str) -> Any:
+        with open(self._path(stage, key), "rb") as f:
+            return pickle.load(f)
+
+    def save(self, stage: str, key: str, value: Any) -> None:
+        if self.root is None:
+            return
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)  # never leave a truncated checkpoint behind
+        logger.debug("Checkpoint saved: {}", path)
@@ -0,0 +1,183 @@
+"""
+Out-of-core variant of ``generate_training_sample`` for menu tables that do not fit in memory.
+
+Only the restaurant-level inputs (restaurants, density, cost index, states) are loaded whole. The menus are
+streamed twice, in chunks of ``Config.chunk_rows`` rows:
+
+1. aggregate pass: each chunk is cleaned and reduced to menu-category counts per city and mergeable price
+   quantile sketches per city and outlier group (over the focus categories); the merged aggregates give the
+   top categories/cities and the IQR bounds as the in-memory pipeline computes them on the full frame
+   (exactly, unless ``Config.outlier_sketch_compression`` bounds the sketches);
+2. sample pass: each chunk is cleaned again, filtered to the selected cities/categories and the IQR bounds,
+   run through NER and enrichment, and appended to the output (typed sample and CSV export). With row sampling configured
+   (``Config.sample_per_stratum``/``sample_size``) the chunks feed a stratified reservoir instead, and NER and
+   enrichment run once on the sample.
+
+Peak memory is set by the chunk size and the (small) aggregates, not by the number of selected states.
+Chunks always end on a restaurant boundary, so the per-chunk duplicate removal of ``preprocess_menu`` and
+``build_final_menu_frame`` sees all rows of a restaurant at once; with a menu file grouped by restaurant (as
+the Kaggle export is) the output equals the in-memory one.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator
+
+import pandas as pd
+from loguru import logger
+
+from application.utils.profiling import StageProfiler
+
+from . import io, processing
+from .config import Config
+from .processing import LOCATION_KEY
+from .processing.selection import RESTAURANT_FEATURE_COLS
+from .sampling import (
+    MENU_DTYPES,
+    _stage_enrichment,
+    _stage_ner,
+    load_lookup_frames,
+    restaurants_in_top_states,
+    row_reservoir,
+)
+
+
+def _restaurant_aligned(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Re-cut menu chunks so that the rows of the last restaurant of a chunk move to the next chunk."""
+    carry = None
+    for chunk in chunks:
+        if carry is not None:
+            chunk = pd.concat([carry, chunk], ignore_index=True)
+        ids = chunk["restaurant_id"].to_numpy()
+        # first row of the trailing run of the last restaurant id
+        tail_start = len(ids) - (ids[::-1] != ids[-1]).argmax() if (ids != ids[-1]).any() else 0
+        carry = chunk.iloc[tail_start:]
+        if tail_start:
+            yield chunk.iloc[:tail_start]
+    if carry is not None and len(carry):
+        yield carry
+
+
+def iter_menu_chunks(cfg: Config) -> Iterator[pd.DataFrame]:
+    """Stream the menus (through the local dataset cache) in restaurant-aligned chunks of about ``chunk_rows``."""
+    chunks = io.iter_cached_dataset(
+        cfg.MENUS_DS,
+        cfg.MENUS_FILE,
+        cache_dir=cfg.DATASET_CACHE_DIR,
+        chunk_rows=cfg.chunk_rows,
+        dtypes=MENU_DTYPES,
+        pandas_kwargs={"skipinitialspace": True},
+        refresh=cfg.refresh_cache,
+    )
+    return _restaurant_aligned(chunks)
+
+
+def _add_counts(total: pd.Series | None, counts: pd.Series) -> pd.Series:
+    return counts if total is None else total.add(counts, fill_value=0)
+
+
+def _aggregate_menus(cfg: Config, df_res_ext: pd.DataFrame) -> tuple[pd.Series, dict[tuple, processing.QuantileSketch]]:
+    """
+    First pass: menu-category counts per (``location_id``, category) and pre-NER price sketches per
+    (state_id, city, *``cfg.outlier_groups``).
+    """
+    category_counts = None
+    price_sketches: dict[tuple, processing.QuantileSketch] = {}
+    sketch_by = ["state_id", "city", *cfg.outlier_groups]
+    all_locations = df_res_ext[[LOCATION_KEY]].drop_duplicates()
+    for chunk in iter_menu_chunks(cfg):
+        df_menu = processing.preprocess_menu(chunk)
+        del chunk
+
+        # the same menu x restaurant rows compute_top_categories counts
+        keyed = pd.merge(df_menu[["restaurant_id", "category"]], df_res_ext[["restaurant_id", LOCATION_KEY]])
+        counts = keyed.groupby([LOCATION_KEY, keyed["category"].astype(object)]).size()
+        category_counts = counts if category_counts is None else category_counts.add(counts, fill_value=0)
+
+        # pre-NER rows of every city; the IQR bounds only need their price distribution per city (and group)
+        df_final = processing.build_final_menu_frame(df_menu, df_res_ext, all_locations, cfg.focus_categories)
+        chunk_sketches = processing.sketch_groups(df_final, sketch_by, "price", cfg.outlier_sketch_compression)
+        price_sketches = processing.merge_sketch_groups(price_sketches, chunk_sketches)
+        del df_menu, keyed, df_final
+
+    if category_counts is None:  # no menu rows at all
+        category_counts = pd.Series(dtype="int64", index=pd.MultiIndex.from_arrays([[], []]))
+    return category_counts.astype("int64").sort_index(), price_sketches
+
+
+def generate_training_sample_chunked(cfg: Config) -> int:
+    """
+    Out-of-core ``generate_training_sample``: stream the menus in chunks of ``cfg.chunk_rows`` rows and append
+    the enriched sample to the typed sample (and CSV export) of ``cfg.FINAL_SAMPLED_DATA_PATH`` chunk by chunk.
+    Returns the number of rows written.
+
+    Stage checkpoints and the polars engine only apply to the in-memory pipeline.
+    """
+    if not cfg.chunk_rows or cfg.chunk_rows <= 0:
+        raise ValueError(f"Out-of-core sampling needs a positive chunk_rows, got {cfg.chunk_rows!r}.")
+    if cfg.engine != "pandas":
+        raise ValueError("Out-of-core sampling runs on the pandas engine only.")
+    profiler = StageProfiler()
+
+    with profiler.stage("load") as stats:
+        df_restaurant, df_index, df_density, df_states = load_lookup_frames(cfg)
+        stats.rows = len(df_restaurant)
+    lookups = {"index": df_index, "states_name_dict": processing.load_states_name_dict(df_states)}
+
+    with profiler.stage("restaurants") as stats:
+        df_res = df_restaurant.dropna(subset=["price_range", "full_address"])  # as sync_restaurants_and_menus
+        df_top_state = restaurants_in_top_states(df_res, df_density, cfg.top_states_filter)
+        df_res_ext = df_top_state.rename(columns={"id": "restaurant_id"})[
+            ["restaurant_id", *RESTAURANT_FEATURE_COLS, LOCATION_KEY]
+        ]
+        del df_restaurant, df_res, df_density
+        stats.rows = len(df_res_ext)
+
+    with profiler.stage("aggregate") as stats:
+        category_counts, price_sketches = _aggregate_menus(cfg, df_res_ext)
+        locations = df_top_state[[LOCATION_KEY, "state_id", "city"]].drop_duplicates(LOCATION_KEY)
+        top_categories = processing.top_categories_from_counts(category_counts, locations, cfg.top_categories_per_city)
+        top_cities = processing.pick_top_cities(top_categories, cfg.focus_categories, cfg.top_cities_per_state)
+        # merge the city sketches of the selected cities into one sketch per outlier group
+        top_city_keys = set(zip(top_cities["state_id"].astype(object), top_cities["city"].astype(object), strict=False))
+        selected = processing.merge_sketch_groups(
+            *({key[2:]: sketch} for key, sketch in price_sketches.items() if key[:2] in top_city_keys)
+        )
+        bounds = processing.iqr_bounds_by_group(selected, cfg.outlier_groups, whisker=1.5)
+        logger.info("Price IQR bounds over the selected cities: {} group(s)", len(bounds))
+        stats.rows = sum(sketch.count for sketch in selected.values())
+        del df_top_state, category_counts, price_sketches, selected
+
+    writer = io.TrainingSampleWriter(cfg.FINAL_SAMPLED_DATA_PATH, export_csv=cfg.export_csv)
+
+    def _write(frames: dict[str, pd.DataFrame]) -> None:
+        if len(frames["sample"]):
+            frames = _stage_enrichment(_stage_ner(frames, cfg, lookups), cfg, lookups)
+        writer.write(frames["sample"])
+
+    # with row sampling configured, the reservoir sees every chunk first and NER only runs on the sample
+    reservoir = row_reservoir(cfg)
+    with profiler.stage("sample") as stats:
+        for i, chunk in enumerate(iter_menu_chunks(cfg)):
+            df_menu = processing.preprocess_menu(chunk)
+            del chunk
+            df_final = processing.build_final_menu_frame(df_menu, df_res_ext, top_cities, cfg.focus_categories)
+            df_final = processing.as_object(df_final)
+            frames = {"sample": processing.remove_price_outliers_grouped(df_final, bounds, cfg.outlier_groups)}
+            del df_menu, df_final
+            if reservoir is not None:
+                reservoir.update(frames["sample"])
+            else:
+                _write(frames)
+                logger.info("Chunk {}: {} rows written in total", i, writer.rows)
+            del frames
+        if reservoir is not None and reservoir.seen:
+            _write({"sample": reservoir.result()})
+        stats.rows = writer.rows
+
+    if not writer.rows:
+        logger.warning("No rows selected; writing an empty sample")
+    rows = writer.close()  # never leave a half-written sample behind
+    logger.success("Wrote {} rows -> {}", rows, writer.typed_path)
+    profiler.log_summary()
+    return rows
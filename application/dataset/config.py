@@ -25,6 +25,13 @@ class Config:
     STATES_DS: str = settings.STATES_DS
     STATES_FILE: str = settings.STATES_FILE
 
+    # Local typed (Parquet) cache of the Kaggle files above; None disables it
+    DATASET_CACHE_DIR: str | None = settings.DATASET_CACHE_DIR
+    refresh_cache: bool = False  # rebuild cached files (e.g. for unpinned handles)
+
+    # Checkpoints of the sampling stages (see generate_training_sample); None disables them
+    CHECKPOINT_DIR: str | None = settings.SAMPLING_CHECKPOINT_DIR
+
     # TODO: add dynamic config to select categories
     # Category sampling choices
     focus_categories: tuple[str, ...] = ("Sandwiches", "Salads", "Wraps")  # top 3 categories by count
@@ -35,8 +42,36 @@ class Config:
     # State filtering (to focus on top states by count)
     top_states_filter: tuple[str, ...] = ("tx", "va", "wa", "wi", "ut")  # top 5 states by count
 
+    # Execution engine for the pre-NER cleaning/selection stages: "pandas" or "polars" (optional dependency)
+    engine: str = "pandas"
+    # pandas engine: attach menu rows with a merge-join on sorted restaurant ids instead of a hash join
+    sorted_merge: bool = False
+    # Out-of-core mode: stream the menus in chunks of this many rows (see generate_training_sample_chunked);
+    # None loads everything in memory
+    chunk_rows: int | None = None
+
+    # IQR price-outlier filter: bounds per group of these columns (e.g. ("category", "state_id"); () = one global
+    # group), from mergeable quantile sketches of about this many centroids (None = exact quantiles)
+    outlier_groups: tuple[str, ...] = ()
+    outlier_sketch_compression: int | None = None
+
+    # Row sampling of the selected (post-outlier) rows before NER, so NER only runs on rows that are kept:
+    # at most sample_per_stratum rows per distinct value of the sample_strata columns (e.g. ("state_id",
+    # "category")) and/or sample_size rows in total, by seeded stratified reservoir sampling. None = keep all.
+    sample_strata: tuple[str, ...] = ()
+    sample_per_stratum: int | None = None
+    sample_size: int | None = None
+    sample_seed: int = settings.SEED
+
+    # Incremental refresh (see refresh_training_sample): manifest + NER cache of the last build, and the
+    # category drift (total variation distance) above which top categories/cities and bounds are recomputed
+    SAMPLE_STATE_DIR: str | None = settings.SAMPLE_STATE_DIR
+    drift_threshold: float = 0.05
+
     # NER model
     NER_MODEL: str = settings.NER_MODEL
 
-    # Output sampled final featured data
+    # Output sampled final featured data: the typed sample (<name>.parquet, what training loads) is written next
+    # to this path; the CSV itself is an export for other consumers and can be skipped
     FINAL_SAMPLED_DATA_PATH: str = settings.SAMPLED_DATA_PATH
+    export_csv: bool = True
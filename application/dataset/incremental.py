@@ -0,0 +1,231 @@
+"""
+Incremental refresh of the training sample.
+
+A refresh keeps a small state next to the sample (``Config.SAMPLE_STATE_DIR``):
+
+- ``manifest.json``: the version of the current sample, and the derived aggregates it was selected with
+  (top categories, top cities, IQR bounds) plus what the last build changed;
+- ``ner_cache.pkl``: the raw NER output per menu description (keyed by a hash of the text).
+
+Cleaning and selection are vectorized and rerun on the current menus. NER is the expensive step, so it only runs
+on descriptions that are new or changed since the last build. The previous top categories/cities and IQR bounds are
+kept unless the menu-category mix drifted by more than ``Config.drift_threshold``, so the sample stays stable
+between small deltas. When the selection is recomputed (first build, drift, selection config change) the result
+is the same as a full ``generate_training_sample`` run.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import asdict, dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from application.utils.profiling import StageProfiler
+
+from . import checkpoints, io, processing, sampling
+from .config import Config
+
+MANIFEST_FILE = "manifest.json"
+NER_CACHE_FILE = "ner_cache.pkl"
+
+_DEFAULT_CFG = Config()
+
+
+@dataclass
+class SampleManifest:
+    """Version and selection aggregates of the current training sample."""
+
+    version: int
+    built_at: str
+    ner_model: str
+    selection_key: str  # fingerprint of the config values the selection depends on
+    top_categories: list[list] = field(default_factory=list)  # [state_id, city, menu_category, count]
+    top_cities: list[list] = field(default_factory=list)  # [state_id, city]
+    outlier_bounds: list[dict] = field(default_factory=list)  # one record per outlier group
+    sample_rows: int = 0
+    ner_rows: int = 0  # descriptions run through NER by this build
+    reused_rows: int = 0  # rows whose ingredients came from the NER cache
+    drift: float | None = None  # category drift against the previous build
+    reselected: bool = True  # top categories/cities and bounds were recomputed
+
+    def save(self, path: Path) -> None:
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(self), indent=2))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path) -> SampleManifest | None:
+        return cls(**json.loads(path.read_text())) if path.exists() else None
+
+
+def selection_key(cfg: Config) -> str:
+    """Fingerprint of the config values the top categories/cities and the IQR bounds depend on."""
+    return checkpoints.fingerprint(
+        cfg.top_states_filter,
+        cfg.top_categories_per_city,
+        cfg.focus_categories,
+        cfg.top_cities_per_state,
+        cfg.outlier_groups,
+        cfg.outlier_sketch_compression,
+    )
+
+
+def category_drift(previous: pd.DataFrame, current: pd.DataFrame) -> float:
+    """
+    Total variation distance between two top-category tables (state_id, city, menu_category, count).
+
+    0 means the same category mix per city, 1 means disjoint ones.
+    """
+    keys = ["state_id", "city", "menu_category"]
+    p = previous.set_index(keys)["count"].astype(float)
+    q = current.set_index(keys)["count"].astype(float)
+    p, q = (p / p.sum() if p.sum() else p), (q / q.sum() if q.sum() else q)
+    p, q = p.align(q, fill_value=0.0)
+    return float((p - q).abs().sum() / 2)
+
+
+def description_keys(descriptions: pd.Series) -> pd.Series:
+    """Stable uint64 key of every description text (the NER cache key)."""
+    return pd.Series(pd.util.hash_pandas_object(descriptions, index=False).to_numpy(), index=descriptions.index)
+
+
+def _ingredients_with_cache(descriptions: pd.Series, cache: pd.Series) -> tuple[pd.Series, pd.Series, int, int]:
+    """
+    Raw NER ingredients of every description, running NER only on the texts missing from ``cache``.
+
+    Returns the ingredients column, the cache restricted to the current descriptions (plus the new entries),
+    the number of descriptions that went through NER and the number of rows served from the cache.
+    """
+    keys = description_keys(descriptions)
+    missing = ~keys.isin(cache.index)
+    todo = descriptions[missing].drop_duplicates()
+    if len(todo):
+        ner_pipeline = sampling.NERModelSingleton().get_pipeline()
+        extracted = processing.extract_ingredients_series(todo, ner_pipeline)
+        cache = pd.concat([cache, pd.Series(extracted.to_numpy(), index=keys[todo.index].to_numpy())])
+    cache = cache[cache.index.isin(keys.to_numpy())]
+    ingredients = pd.Series(cache.reindex(keys.to_numpy()).to_numpy(), index=descriptions.index)
+    return ingredients, cache, len(todo), int((~missing).sum())
+
+
+def _bounds_records(bounds: pd.DataFrame) -> list[dict]:
+    return json.loads(bounds.to_json(orient="records"))
+
+
+def refresh_training_sample(cfg: Config = _DEFAULT_CFG, full: bool = False) -> pd.DataFrame:
+    """
+    Rebuild the training sample at ``cfg.FINAL_SAMPLED_DATA_PATH`` from the current menus, reusing the NER
+    output and (unless the category drift exceeds ``cfg.drift_threshold``) the selection of the last build.
+
+    ``full=True`` ignores the previous state: everything is reselected and every description goes through NER.
+    """
+    if cfg.SAMPLE_STATE_DIR is None:
+        raise ValueError("Incremental refresh needs a SAMPLE_STATE_DIR to keep its manifest and NER cache in.")
+    if cfg.engine != "pandas" or cfg.chunk_rows:
+        raise ValueError("Incremental refresh runs on the in-memory pandas pipeline only.")
+    state_dir = Path(cfg.SAMPLE_STATE_DIR)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path, cache_path = state_dir / MANIFEST_FILE, state_dir / NER_CACHE_FILE
+
+    previous = None if full else SampleManifest.load(manifest_path)
+    if previous is not None and previous.ner_model == cfg.NER_MODEL and cache_path.exists():
+        ner_cache = pd.read_pickle(cache_path)
+    else:
+        ner_cache = pd.Series(dtype=object)
+    profiler = StageProfiler()
+
+    with profiler.stage("load"):
+        df_restaurant, df_menu_raw, df_index, df_density, df_states = sampling.load_base_frames(cfg)
+    lookups = {"index": df_index, "states_name_dict": processing.load_states_name_dict(df_states)}
+    frames = {"restaurant": df_restaurant, "menu_raw": df_menu_raw, "density": df_density}
+    del df_restaurant, df_menu_raw, df_density
+
+    with profiler.stage("clean") as stats:
+        for run in (sampling._stage_preprocess_menu, sampling._stage_sync, sampling._stage_address_density):
+            frames = run(frames, cfg, lookups)
+        stats.rows = len(frames["menu"])
+
+    with profiler.stage("selection") as stats:
+        df_menu = frames.pop("menu")
+        df_res_ext, top_categories = processing.compute_top_categories(
+            df_menu, frames.pop("top_state"), cfg.top_categories_per_city
+        )
+        drift, reselect = None, True
+        if previous is not None and previous.selection_key == selection_key(cfg):
+            old_categories = pd.DataFrame(
+                previous.top_categories, columns=["state_id", "city", "menu_category", "count"]
+            )
+            drift = category_drift(old_categories, top_categories)
+            reselect = drift > cfg.drift_threshold
+            logger.info(
+                "Category drift since v{}: {:.4f} (threshold {}) -> {}",
+                previous.version,
+                drift,
+                cfg.drift_threshold,
+                "reselecting" if reselect else "keeping the previous selection",
+            )
+        if reselect:
+            top_cities = processing.pick_top_cities(top_categories, cfg.focus_categories, cfg.top_cities_per_state)
+        else:
+            top_categories = old_categories
+            top_cities = pd.DataFrame(previous.top_cities, columns=["state_id", "city"])
+        df_final = processing.build_final_menu_frame(
+            df_menu, df_res_ext, top_cities[["state_id", "city"]], cfg.focus_categories, sorted_merge=cfg.sorted_merge
+        )
+        df_sampled = processing.as_object(df_final)
+        del df_menu, df_res_ext, df_final
+
+        groups = cfg.outlier_groups
+        if reselect:
+            sketches = processing.sketch_groups(df_sampled, groups, "price", cfg.outlier_sketch_compression)
+            bounds = processing.iqr_bounds_by_group(sketches, groups, whisker=1.5)
+        else:
+            bounds = pd.DataFrame(previous.outlier_bounds, columns=[*groups, "lower", "upper"])
+        df_sampled = processing.remove_price_outliers_grouped(df_sampled, bounds, groups)
+        reservoir = sampling.row_reservoir(cfg)
+        if reservoir is not None:
+            reservoir.update(df_sampled)
+            df_sampled = reservoir.result()
+        stats.rows = len(df_sampled)
+
+    with profiler.stage("ner") as stats:
+        ingredients, ner_cache, ner_rows, reused_rows = _ingredients_with_cache(df_sampled["description"], ner_cache)
+        df_sampled = df_sampled.drop(columns=["description"]).assign(ingredients=ingredients)
+        df_sampled = processing.clean_ingredients_column(df_sampled, col="ingredients")
+        stats.rows = ner_rows
+        logger.info("NER ran on {} new description(s); {} row(s) reused cached ingredients", ner_rows, reused_rows)
+
+    with profiler.stage("enrichment"):
+        df_sampled = sampling._stage_enrichment({"sample": df_sampled}, cfg, lookups)["sample"]
+
+    with profiler.stage("persist"):
+        io.write_training_sample(df_sampled, cfg.FINAL_SAMPLED_DATA_PATH, export_csv=cfg.export_csv)
+        ner_cache.to_pickle(cache_path.with_suffix(".tmp"))
+        os.replace(cache_path.with_suffix(".tmp"), cache_path)
+        manifest = SampleManifest(
+            version=(previous.version + 1) if previous is not None else 1,
+            built_at=datetime.now(UTC).isoformat(timespec="seconds"),
+            ner_model=cfg.NER_MODEL,
+            selection_key=selection_key(cfg),
+            top_categories=top_categories[["state_id", "city", "menu_category", "count"]]
+            .astype(object)
+            .values.tolist(),
+            top_cities=top_cities[["state_id", "city"]].astype(object).values.tolist(),
+            outlier_bounds=_bounds_records(bounds),
+            sample_rows=len(df_sampled),
+            ner_rows=ner_rows,
+            reused_rows=reused_rows,
+            drift=drift,
+            reselected=reselect,
+        )
+        manifest.save(manifest_path)
+
+    out_path = io.typed_sample_path(cfg.FINAL_SAMPLED_DATA_PATH)
+    logger.success("Wrote {} rows -> {} (sample v{})", len(df_sampled), out_path, manifest.version)
+    profiler.log_summary()
+    return df_sampled
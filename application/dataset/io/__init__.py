@@ -1,4 +1,18 @@
-from .loader import load_kaggle_dataset, load_model_data
+from .cache import dataset_cache_path, iter_cached_dataset, load_cached_dataset
+from .loader import download_kaggle_file, load_kaggle_dataset, load_model_data
+from .sample_format import TrainingSampleWriter, read_training_sample, typed_sample_path, write_training_sample
 from .splitter import split_data
 
-__all__ = ["load_kaggle_dataset", "load_model_data", "split_data"]
+__all__ = [
+    "TrainingSampleWriter",
+    "dataset_cache_path",
+    "download_kaggle_file",
+    "iter_cached_dataset",
+    "load_cached_dataset",
+    "load_kaggle_dataset",
+    "load_model_data",
+    "read_training_sample",
+    "split_data",
+    "typed_sample_path",
+    "write_training_sample",
+]
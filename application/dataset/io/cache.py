@@ -0,0 +1,172 @@
+"""
+Local, typed cache for the Kaggle source files.
+
+The first load of a file parses the CSV through kagglehub as before, casts it to the requested dtypes and writes
+it as Parquet under ``<cache_dir>/<owner>/<dataset>/<version>/<file>.parquet``. Later loads read (memory-map) the
+Parquet file directly, with column pruning, so no CSV parsing or per-cell converters are involved.
+
+``iter_cached_dataset`` is the streaming counterpart for files that should not be loaded whole: the CSV is
+parsed and written to the cache chunk by chunk, and the Parquet file is read back in record batches.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+from collections.abc import Iterator, Mapping, Sequence
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+from . import loader
+
+try:
+    import pyarrow  # (parquet engine; ships transitively with mlflow/streamlit)
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None  # type: ignore
+    pq = None  # type: ignore
+
+_VERSION_RE = re.compile(r"^(?P<dataset>.+?)/versions/(?P<version>\d+)$")
+
+
+def dataset_cache_path(cache_dir: str | os.PathLike, dataset_handle: str, dataset_path: str) -> Path:
+    """
+    Return the cache file for ``dataset_path`` inside ``dataset_handle``.
+
+    Handles pinned to a version (``owner/dataset/versions/12``) get their own directory per version; unpinned
+    handles are cached under ``latest`` and only refreshed on request (``refresh=True``).
+    """
+    match = _VERSION_RE.match(dataset_handle.strip("/"))
+    dataset, version = (match["dataset"], match["version"]) if match else (dataset_handle.strip("/"), "latest")
+    return Path(cache_dir, dataset, version, Path(dataset_path).with_suffix(".parquet"))
+
+
+def load_cached_dataset(
+    dataset_handle: str,
+    dataset_path: str,
+    cache_dir: str | os.PathLike | None,
+    columns: Sequence[str] | None = None,
+    dtypes: Mapping[str, str] | None = None,
+    pandas_kwargs: dict | None = None,
+    refresh: bool = False,
+) -> pd.DataFrame:
+    """Load a Kaggle dataset file through the local Parquet cache.
+    Args:
+        dataset_handle (str): The Kaggle dataset handle, e.g. "owner/dataset-name/versions/12".
+        dataset_path (str): The file inside the dataset (e.g., "data.csv").
+        cache_dir (str | PathLike | None): Cache root; ``None`` disables the cache (plain kagglehub CSV load).
+        columns (Sequence[str], optional): Columns to return (pruned at read time on cache hits).
+        dtypes (Mapping[str, str], optional): Explicit dtypes, used both for CSV parsing and for the cached file.
+        pandas_kwargs (dict, optional): Extra read_csv options for the (first) CSV parse.
+        refresh (bool): Rebuild the cache file even if it exists.
+    Returns:
+        pd.DataFrame: The loaded dataset, restricted to ``columns`` when given.
+    """
+    csv_kwargs = dict(pandas_kwargs or {})
+    if dtypes:
+        csv_kwargs["dtype"] = dict(dtypes)
+
+    if cache_dir is None or pyarrow is None:
+        if cache_dir is not None:
+            logger.warning("pyarrow is not installed; dataset cache disabled, loading {} from CSV", dataset_path)
+        if columns is not None:
+            csv_kwargs["usecols"] = list(columns)
+        return loader.load_kaggle_dataset(dataset_handle, dataset_path, pandas_kwargs=csv_kwargs)
+
+    path = dataset_cache_path(cache_dir, dataset_handle, dataset_path)
+    if refresh or not path.exists():
+        # cache the whole file, so every column selection of it is served from the same entry
+        df = loader.load_kaggle_dataset(dataset_handle, dataset_path, pandas_kwargs=csv_kwargs)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".parquet.tmp")
+        df.to_parquet(tmp_path, engine="pyarrow", index=False)
+        os.replace(tmp_path, path)  # atomic: concurrent readers never see a partial file
+        logger.info("Cached {} ({} rows) -> {}", dataset_path, len(df), path)
+        return df[list(columns)] if columns is not None else df
+
+    df = pd.read_parquet(
+        path, engine="pyarrow", columns=list(columns) if columns is not None else None, memory_map=True
+    )
+    if dtypes:
+        # parquet keeps the dtypes it was written with; re-assert them in case the cache predates a dtype change
+        df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+    logger.info("Loaded {} ({} rows) from cache {}", dataset_path, len(df), path)
+    return df
+
+
+def _write_parquet_chunks(chunks: Iterator[pd.DataFrame], path: Path) -> int:
+    """Append DataFrame chunks to one Parquet file (atomically replaced at the end); returns the row count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".parquet.tmp")
+    writer, rows, string_cols = None, 0, []
+    try:
+        for chunk in chunks:
+            if writer is None:
+                # columns that are all-missing in the first chunk (parsed as float) may hold strings further down
+                string_cols = [c for c in chunk.columns if chunk[c].dtype == object or chunk[c].isna().all()]
+            for col in string_cols:
+                if chunk[col].dtype != object:
+                    chunk[col] = chunk[col].astype(object).where(chunk[col].notna(), None)
+            if writer is None:
+                schema = pyarrow.Schema.from_pandas(chunk, preserve_index=False)
+                for col in string_cols:
+                    i = schema.get_field_index(col)
+                    schema = schema.set(i, schema.field(i).with_type(pyarrow.string()))
+                writer = pq.ParquetWriter(tmp_path, schema)
+            writer.write_table(pyarrow.Table.from_pandas(chunk, schema=writer.schema, preserve_index=False))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is not None:
+        os.replace(tmp_path, path)
+    return rows
+
+
+def iter_cached_dataset(
+    dataset_handle: str,
+    dataset_path: str,
+    cache_dir: str | os.PathLike | None,
+    chunk_rows: int,
+    columns: Sequence[str] | None = None,
+    dtypes: Mapping[str, str] | None = None,
+    pandas_kwargs: dict | None = None,
+    refresh: bool = False,
+) -> Iterator[pd.DataFrame]:
+    """Stream a Kaggle dataset file in chunks of at most ``chunk_rows`` rows, through the local Parquet cache.
+
+    Arguments are those of ``load_cached_dataset``. On a cache miss the CSV is downloaded and converted to the
+    cache file chunk by chunk; the chunks are then read back as Parquet record batches (with column pruning).
+    Without a cache (``cache_dir=None`` or no pyarrow) the downloaded CSV is read in chunks directly.
+    Memory stays bounded by the chunk size either way.
+    """
+    csv_kwargs = dict(pandas_kwargs or {})
+    if dtypes:
+        csv_kwargs["dtype"] = dict(dtypes)
+
+    if cache_dir is None or pyarrow is None:
+        if cache_dir is not None:
+            logger.warning("pyarrow is not installed; dataset cache disabled, streaming {} from CSV", dataset_path)
+        if columns is not None:
+            csv_kwargs["usecols"] = list(columns)
+        local_csv = loader.download_kaggle_file(dataset_handle, dataset_path)
+        with pd.read_csv(local_csv, chunksize=chunk_rows, **csv_kwargs) as reader:
+            yield from reader
+        return
+
+    path = dataset_cache_path(cache_dir, dataset_handle, dataset_path)
+    if refresh or not path.exists():
+        local_csv = loader.download_kaggle_file(dataset_handle, dataset_path)
+        with pd.read_csv(local_csv, chunksize=chunk_rows, **csv_kwargs) as reader:
+            rows = _write_parquet_chunks(reader, path)
+        logger.info("Cached {} ({} rows) -> {}", dataset_path, rows, path)
+
+    parquet_file = pq.ParquetFile(path, memory_map=True)
+    logger.info("Streaming {} ({} rows) from cache {}", dataset_path, parquet_file.metadata.num_rows, path)
+    for batch in parquet_file.iter_batches(batch_size=chunk_rows, columns=list(columns) if columns else None):
+        df = batch.to_pandas()
+        if dtypes:
+            df = df.astype({c: t for c, t in dtypes.items() if c in df.columns})
+        yield df
@@ -1,9 +1,13 @@
 import ast
+import os
+from pathlib import Path
 
 import pandas as pd
-from kagglehub import KaggleDatasetAdapter, dataset_load
+from kagglehub import KaggleDatasetAdapter, dataset_download, dataset_load
 from loguru import logger
 
+from . import sample_format
+
 
 def _safe_eval_ingredients(v):
     if pd.isna(v):
@@ -33,16 +37,39 @@ def load_kaggle_dataset(dataset_handle: str, dataset_path: str, pandas_kwargs: d
     )
 
 
+def download_kaggle_file(dataset_handle: str, dataset_path: str) -> str:
+    """Download (or reuse kagglehub's local copy of) a single dataset file and return its local path.
+    Args:
+        dataset_handle (str): The Kaggle dataset handle in the format "owner/dataset-name".
+        dataset_path (str): The specific file path within the dataset (e.g., "data.csv").
+    Returns:
+        str: Path of the file on the local disk, for readers that stream it instead of loading it whole.
+    """
+    logger.info(f"Downloading {dataset_path} from {dataset_handle}...")
+    return dataset_download(dataset_handle, path=dataset_path)
+
+
 # -------------------- Data --------------------
 def load_model_data(path: str) -> pd.DataFrame:
     """
-    Load CSV and apply minimal parsing consistent with the notebook.
-    - parses `ingredients` as a Python list (tokenized) if present.
+    Load the training sample.
+    - reads the typed sample (``<name>.parquet`` next to the CSV export, see ``sample_format``) when it exists and
+      is not older than the CSV: ``ingredients`` is a native list column, so nothing is parsed per row.
+    - otherwise reads the CSV and parses `ingredients` as a Python list (tokenized) if present.
     Args:
-        path (str): Path to the CSV file.
+        path (str): Path to the CSV export (or the Parquet file) of the sample.
     Returns:
         pd.DataFrame: Loaded DataFrame with parsed ingredients if applicable.
     """
+    typed_path = sample_format.typed_sample_path(path)
+    csv_newer = (
+        Path(path) != typed_path
+        and Path(path).exists()
+        and (not typed_path.exists() or os.path.getmtime(path) > os.path.getmtime(typed_path))
+    )
+    if sample_format.pq is not None and typed_path.exists() and not csv_newer:
+        return sample_format.read_training_sample(typed_path).reset_index(drop=True)
+
     df = pd.read_csv(path)
     if "ingredients" in df.columns:
         df["ingredients"] = df["ingredients"].apply(_safe_eval_ingredients)
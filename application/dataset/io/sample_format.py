@@ -0,0 +1,138 @@
+"""
+Typed (Parquet) storage of the training sample.
+
+The sample is written next to its CSV export as ``<name>.parquet``: ``ingredients`` is a native ``list<string>``
+column and the string columns are dictionary-encoded (they come back as pandas categoricals). Loading it needs no
+CSV parsing and no per-row ``ast.literal_eval`` of the ingredient lists, which dominates the training start-up
+for large samples. The CSV is kept as an export only (e.g. for ``services/common/export_state_metadata.py``).
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterable
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore
+    pq = None  # type: ignore
+
+LIST_COLUMNS = ("ingredients",)
+TYPED_SUFFIX = ".parquet"
+
+
+def typed_sample_path(path: str | os.PathLike) -> Path:
+    """The Parquet file of the sample whose CSV export is ``path`` (``path`` itself if it is a Parquet file)."""
+    return Path(path).with_suffix(TYPED_SUFFIX)
+
+
+def sample_table(df: pd.DataFrame, schema: pa.Schema | None = None) -> pa.Table:
+    """
+    Arrow table of a sample frame: list columns as ``list<string>``, string columns dictionary-encoded.
+
+    Pass the ``schema`` of a previous chunk to append chunks of the same sample to one file.
+    """
+    arrays = []
+    for col in df.columns:
+        if col in LIST_COLUMNS:
+            arrays.append(pa.array(df[col].tolist(), type=pa.list_(pa.string())))
+        elif df[col].dtype == object:
+            arrays.append(pa.array(df[col], type=pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(df[col]))
+    table = pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns])
+    if schema is not None:
+        # dictionaries are per chunk; only the (dictionary-encoded) types have to line up
+        table = table.cast(schema)
+    return table
+
+
+def write_training_sample(df: pd.DataFrame, path: str | os.PathLike, export_csv: bool = True) -> None:
+    """Write the typed sample next to ``path`` and, with ``export_csv``, the CSV export at ``path``."""
+    typed_path = typed_sample_path(path)
+    if pa is None and not export_csv:
+        raise ImportError("Writing the typed training sample needs pyarrow; install it or keep the CSV export.")
+    # the CSV goes first: load_model_data only prefers the typed sample while it is not older than the CSV
+    if export_csv and Path(path) != typed_path:
+        df.to_csv(path, index=False)
+    if pa is not None:
+        tmp_path = typed_path.with_name(typed_path.name + ".tmp")
+        pq.write_table(sample_table(df), tmp_path)
+        os.replace(tmp_path, typed_path)  # atomic: never leave a half-written sample behind
+
+
+class TrainingSampleWriter:
+    """
+    Append a sample chunk by chunk to its typed file (and CSV export), for the out-of-core sampler.
+
+    Files are written under a ``.tmp`` name and moved into place by ``close()``, so readers never see a partial
+    sample. With no rows written, the CSV export is left empty and the typed file is removed.
+    """
+
+    def __init__(self, path: str | os.PathLike, export_csv: bool = True):
+        if pa is None and not export_csv:
+            raise ImportError("Writing the typed training sample needs pyarrow; install it or keep the CSV export.")
+        self.path = Path(path)
+        self.typed_path = typed_sample_path(path)
+        self.export_csv = export_csv and self.path != self.typed_path
+        self.rows = 0
+        self._writer = None
+
+    def _tmp(self, path: Path) -> Path:
+        return path.with_name(path.name + ".tmp")
+
+    def write(self, df: pd.DataFrame) -> None:
+        if not len(df):
+            return
+        if pa is not None:
+            if self._writer is None:
+                table = sample_table(df)
+                self._writer = pq.ParquetWriter(self._tmp(self.typed_path), table.schema)
+            else:
+                table = sample_table(df, self._writer.schema)
+            self._writer.write_table(table)
+        if self.export_csv:
+            df.to_csv(self._tmp(self.path), mode="a" if self.rows else "w", header=not self.rows, index=False)
+        self.rows += len(df)
+
+    def close(self) -> int:
+        """Move the written files into place; returns the number of rows written."""
+        if self.export_csv:
+            if not self.rows:
+                self._tmp(self.path).write_text("")
+            os.replace(self._tmp(self.path), self.path)
+        if self._writer is not None:
+            self._writer.close()
+            os.replace(self._tmp(self.typed_path), self.typed_path)
+        else:
+            self.typed_path.unlink(missing_ok=True)  # a stale typed sample must not outlive an empty rebuild
+        return self.rows
+
+
+def sample_frame(table: pa.Table) -> pd.DataFrame:
+    """
+    pandas frame of a sample table: string columns as categoricals, list columns as lists of strings.
+
+    Lists (rather than the numpy arrays ``to_pandas`` yields) are what the TF-IDF step iterates fastest; the
+    conversion is a plain ``tolist`` per row, no parsing.
+    """
+    df = table.to_pandas()
+    for col in LIST_COLUMNS:
+        if col in df.columns:
+            df[col] = [values.tolist() if values is not None else [] for values in df[col]]
+    return df
+
+
+def read_training_sample(path: str | os.PathLike, columns: Iterable[str] | None = None) -> pd.DataFrame:
+    """Read a typed training sample (see ``sample_frame`` for the column types)."""
+    if pq is None:
+        raise ImportError("Reading the typed training sample needs pyarrow.")
+    table = pq.read_table(typed_sample_path(path), columns=list(columns) if columns is not None else None)
+    logger.info("Loaded typed training sample {} ({} rows)", typed_sample_path(path), table.num_rows)
+    return sample_frame(table)
@@ -6,6 +6,7 @@ from .cleaning import (
     remove_price_outliers_iqr,
     sync_restaurants_and_menus,
 )
+from .dtypes import CATEGORICAL_COLS, LOCATION_KEY, as_categorical, as_object, location_key
 from .features import (
     attach_cost_index,
     extract_ingredients_series,
@@ -13,10 +14,19 @@ from .features import (
     load_states_name_dict,
     merge_density,
 )
+from .reservoir import StratifiedReservoir, stratified_sample
 from .selection import (
     build_final_menu_frame,
     compute_top_categories,
     pick_top_cities,
+    top_categories_from_counts,
+)
+from .sketches import (
+    QuantileSketch,
+    iqr_bounds_by_group,
+    merge_sketch_groups,
+    remove_price_outliers_grouped,
+    sketch_groups,
 )
 
 __all__ = [
@@ -30,10 +40,26 @@ __all__ = [
     "compute_top_categories",
     "pick_top_cities",
     "build_final_menu_frame",
+    "top_categories_from_counts",
+    # quantile sketches / grouped outlier bounds
+    "QuantileSketch",
+    "sketch_groups",
+    "merge_sketch_groups",
+    "iqr_bounds_by_group",
+    "remove_price_outliers_grouped",
+    # row sampling
+    "StratifiedReservoir",
+    "stratified_sample",
     # feature functions
     "extract_ingredients_series",
     "attach_cost_index",
     "merge_density",
     "filter_to_top_states",
     "load_states_name_dict",
+    # dtype helpers
+    "CATEGORICAL_COLS",
+    "as_categorical",
+    "as_object",
+    "LOCATION_KEY",
+    "location_key",
 ]
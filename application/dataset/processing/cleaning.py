@@ -1,50 +1,112 @@
 from __future__ import annotations
 
 import html
+import re
+import time
 
+import numpy as np
 import pandas as pd
 from bs4 import BeautifulSoup
 from loguru import logger
 
-from application.utils.misc import unescape_html
+from .dtypes import as_categorical, with_columns
 
+# last three comma-separated parts of a full address: "<street>, <city>, <ST>, <zip>"
+_ADDRESS_RE = re.compile(r"^(?:.*,)?(?P<city>[^,]*),(?P<state_id>[^,]*),(?P<zip>[^,]*)$", flags=re.DOTALL)
 
-def preprocess_menu(df_menu: pd.DataFrame) -> pd.DataFrame:
-    """Preprocess the menu DataFrame by cleaning text fields, handling missing values, and formatting prices."""
-    logger.info("Preprocessing menus...")
-    df = df_menu.copy()
-    df["description"] = df.description.str.strip()
-    before = len(df)
-    df.dropna(subset=["description"], inplace=True)
 
-    df["category"] = df.category.map(unescape_html).str.strip().str.normalize("NFKD")
-    df["description"] = df.description.map(unescape_html).str.strip().str.normalize("NFKD")
+def _take(uniques, codes: np.ndarray) -> np.ndarray:
+    """Broadcast factorized ``uniques`` back to rows; code -1 (missing) maps to NaN."""
+    return np.append(np.asarray(uniques, dtype=object), np.nan)[codes]
 
-    df = df[df.description.str.len() > 0].drop_duplicates()
 
-    # Coerce numeric price (remove currency suffixes like "USD")
-    df["price"] = df["price"].replace({"USD": ""}, regex=True).astype(float)
-    df = df[df["price"] != 0]
+def _normalize_text(values: pd.Series) -> tuple[pd.Series, np.ndarray, pd.Index]:
+    """
+    Unescape HTML, strip and NFKD-normalize a string column, working on its distinct values only.
+
+    Menu text is highly repetitive, so each distinct value is cleaned once and the result is broadcast back
+    through the factorized codes; ``html.unescape`` only runs on values containing ``&``.
+    Returns the cleaned column, the integer codes of the *cleaned* values (-1 for missing) and those values.
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype=object)
+    has_entity = uniques.str.contains("&", regex=False, na=False).to_numpy(dtype=bool)
+    uniques[has_entity] = uniques[has_entity].map(html.unescape)
+    cleaned = uniques.str.strip().str.normalize("NFKD")
+    # distinct raw values can collapse to the same cleaned value
+    cleaned_codes, cleaned_uniques = pd.factorize(cleaned)
+    codes = np.append(cleaned_codes, -1)[codes]
+    return pd.Series(_take(cleaned_uniques, codes), index=values.index), codes, cleaned_uniques
+
+
+def _parse_price(price: pd.Series) -> tuple[pd.Series, np.ndarray]:
+    """
+    Parse prices like ``"12.5 USD"`` to float; numeric columns take the fast path.
+
+    Returns the parsed column and integer codes of the *raw* values (rows are deduplicated on the raw price).
+    """
+    codes, uniques = pd.factorize(price)
+    if pd.api.types.is_numeric_dtype(price):
+        return price.astype(float), codes
+    parsed = pd.Series(uniques, dtype=object).replace({"USD": ""}, regex=True).astype(float)
+    return pd.Series(_take(parsed, codes).astype(float), index=price.index), codes
 
-    # Remove the meta-category
-    df = df[df.category != "Picked for you"].copy()
-    logger.info("Menus: {} -> {} after cleaning", before, len(df))
+
+def _codes_of(uniques: pd.Index, values) -> np.ndarray:
+    """Codes (positions in ``uniques``) of the given values; absent values are skipped."""
+    return np.flatnonzero(uniques.isin(values))
+
+
+def preprocess_menu(df_menu: pd.DataFrame) -> pd.DataFrame:
+    """
+    Preprocess the menu DataFrame by cleaning text fields, handling missing values, and formatting prices.
+
+    Text cleaning and price parsing run once per distinct value (see ``_normalize_text``/``_parse_price``),
+    and row filters and duplicate detection work on the integer codes of the cleaned columns instead of the
+    strings.
+    """
+    logger.info("Preprocessing menus...")
+    t0 = time.perf_counter()
+    before = len(df_menu)
+
+    description, description_codes, descriptions = _normalize_text(df_menu.description)
+    category, category_codes, categories = _normalize_text(df_menu.category)
+    price, price_codes = _parse_price(df_menu.price)
+
+    # missing or (after cleaning) empty description, zero price and the meta-category
+    keep = (description_codes >= 0) & ~np.isin(description_codes, _codes_of(descriptions, [""]))
+    keep &= (price != 0).to_numpy() & ~np.isin(category_codes, _codes_of(categories, ["Picked for you"]))
+
+    # rows are duplicates if all columns match after text cleaning, with the price compared as raw text
+    keys = {col: df_menu[col] for col in df_menu.columns if col not in ("category", "description", "price")}
+    keys.update(category=category_codes, description=description_codes, price=price_codes)
+    keys = pd.DataFrame(keys, index=df_menu.index)[keep]
+    keep[keep] = ~keys.duplicated().to_numpy()
+    del keys
+
+    columns = {"category": category[keep], "description": description[keep], "price": price[keep]}
+    df = as_categorical(with_columns(df_menu[keep], columns), ["category"])
+    elapsed = time.perf_counter() - t0
+    logger.info(
+        "Menus: {} -> {} after cleaning in {:.2f}s ({:,.0f} rows/s)",
+        before,
+        len(df),
+        elapsed,
+        before / max(elapsed, 1e-9),
+    )
     return df
 
 
 def sync_restaurants_and_menus(df_restaurant: pd.DataFrame, df_menu: pd.DataFrame):
     """Ensure that restaurants and menus are synchronized, removing any restaurants without menus and vice versa."""
     logger.info("Syncing restaurants and menus...")
-    df_res = df_restaurant.copy()
-    df_mnu = df_menu.copy()
-    df_res = df_res.dropna(subset=["price_range", "full_address"])  # keep only those we can use
+    df_res = df_restaurant.dropna(subset=["price_range", "full_address"])  # keep only those we can use
     before_res, before_mnu = len(df_res), len(df_menu)
 
-    no_menu_res_list = set(df_res.id.unique()) - set(df_mnu.restaurant_id.unique())
-    df_res = df_res.loc[~df_res["id"].isin(no_menu_res_list)].copy()
-
-    no_res_menu_list = set(df_mnu.restaurant_id.unique()) - set(df_res.id.unique())
-    df_mnu = df_mnu.loc[~df_mnu["restaurant_id"].isin(no_res_menu_list)].copy()
+    # hash semi-joins on the integer ids (restaurants with menus, then menus of the kept restaurants)
+    df_res = df_res[df_res["id"].isin(df_menu["restaurant_id"].unique())]
+    df_mnu = df_menu[df_menu["restaurant_id"].isin(df_res["id"].unique())]
+    df_res = as_categorical(df_res, ["price_range"])
     logger.info(
         "Restaurants: {} -> {}, Menus: {} -> {} after syncing",
         before_res,
@@ -55,52 +117,89 @@ def sync_restaurants_and_menus(df_restaurant: pd.DataFrame, df_menu: pd.DataFram
     return df_res, df_mnu
 
 
-def build_address_fields(df_restaurant: pd.DataFrame) -> pd.DataFrame:
-    """Extract city and state_id from the full_address field in the restaurant DataFrame."""
+def build_address_fields(df_restaurant: pd.DataFrame, keep_zip: bool = False) -> pd.DataFrame:
+    """
+    Extract city and state_id (and optionally zip) from the full_address field in the restaurant DataFrame.
+
+    Addresses look like ``"<street>, <city>, <ST>, <zip>"``; the last three comma-separated parts are
+    captured with a single regex pass and validated with vectorized masks (2-letter state, non-empty city).
+    Rows whose address has fewer than three parts are dropped.
+    """
     logger.info("Extracting city/state_id from full_address...")
-    df = df_restaurant.copy()
-    df = df[df.full_address.str.split(",").apply(lambda x: len(x[-2].strip())) == 2].copy()
-    has_city = df.full_address.str.strip().str.lower().str.split(",").apply(lambda x: len(x[-3])) != 0
-    df = df[has_city].copy()
-    df["city"] = df.full_address.str.strip().str.lower().str.split(",").str[-3].str.strip()
-    df["state_id"] = df.full_address.str.strip().str.lower().str.split(",").str[-2].str.strip()
+    parts = df_restaurant.full_address.str.strip().str.lower().str.extract(_ADDRESS_RE)
+    state_id = parts["state_id"].str.strip()
+    valid = ((state_id.str.len() == 2) & (parts["city"].str.len() > 0)).to_numpy()
+    parts = parts[valid]
+
+    fields = {"city": parts["city"].str.strip().to_numpy(), "state_id": state_id[valid].to_numpy()}
+    if keep_zip:
+        fields["zip"] = parts["zip"].str.strip().to_numpy()
+    df = as_categorical(with_columns(df_restaurant[valid], fields), ["city", "state_id"])
     logger.info("Address fields added: {} rows", len(df))
     return df
 
 
-def remove_price_outliers_iqr(df: pd.DataFrame, price_col: str = "price", whisker: float = 1.5) -> pd.DataFrame:
-    """Remove outliers from the price column using the IQR method."""
-    q1 = df[price_col].quantile(0.25)
-    q3 = df[price_col].quantile(0.75)
+def _iqr_bounds(q1: float, q3: float, whisker: float) -> tuple[float, float]:
     iqr = q3 - q1
-    lower = q1 - whisker * iqr
-    upper = q3 + whisker * iqr
+    return q1 - whisker * iqr, q3 + whisker * iqr
+
+
+def remove_price_outliers_iqr(
+    df: pd.DataFrame,
+    price_col: str = "price",
+    whisker: float = 1.5,
+    bounds: tuple[float, float] | None = None,
+) -> pd.DataFrame:
+    """
+    Remove outliers from the price column using the IQR method.
+
+    ``bounds`` overrides the (lower, upper) bounds computed from ``df``, for frames that are one chunk of a
+    larger sample (see ``processing.sketches`` for bounds computed over chunks, optionally per group).
+    """
+    if bounds is None:
+        bounds = _iqr_bounds(df[price_col].quantile(0.25), df[price_col].quantile(0.75), whisker)
+    lower, upper = bounds
     logger.info("Removed {} outliers using IQR ({}).", price_col, whisker)
-    return df[(df[price_col] >= lower) & (df[price_col] <= upper)].copy()
+    return df[(df[price_col] >= lower) & (df[price_col] <= upper)]
+
+
+def _strip_markup(token: str) -> str:
+    """Strip HTML tags and entities from a single ingredient token (slow path)."""
+    return html.unescape(BeautifulSoup(token, "html.parser").get_text(strip=True)).strip()
 
 
 def clean_ingredients_column(df: pd.DataFrame, col: str = "ingredients") -> pd.DataFrame:
     """
     Clean the ingredients column by removing
     empty lists, lowercasing, deduplicating, stripping whitespace, and unescaping HTML.
-    Requires BeautifulSoup and html for HTML parsing and unescaping.
+
+    The lists are exploded once and normalized as a flat array. Only tokens that contain
+    markup characters (``<`` or ``&``) go through BeautifulSoup/html; for every other token
+    tag-stripping and unescaping reduce to ``str.strip``.
     """
-    out = df.copy()
-    before = len(out)
-    out = out[out[col].apply(len) > 0].copy()
-
-    out[col] = out[col].map(lambda xs: list(map(lambda y: y.lower(), xs)))
-    out[col] = out[col].map(lambda xs: list(set(xs)))
-    out[col] = out[col].map(lambda xs: list(map(lambda y: y.strip(), xs)))
-    out[col] = out[col].map(lambda xs: list(map(lambda y: BeautifulSoup(y, "html.parser").get_text(strip=True), xs)))
-    out[col] = out[col].map(lambda xs: list(map(lambda y: html.unescape(y).strip(), xs)))
+    before = len(df)
+    out = df[df[col].str.len() > 0]
+    if out.empty:
+        logger.info("Ingredients cleaned: {} -> 0 rows", before)
+        return out
+
+    # lowercase + per-row dedupe (set order is kept identical to the original list(set(...)))
+    deduped = out[col].map(lambda xs: list(set(map(str.lower, xs))))
+    lengths = deduped.str.len().to_numpy()
+
+    flat = deduped.explode(ignore_index=True).str.strip()
+    has_markup = flat.str.contains("[<&]", regex=True)
+    if has_markup.any():
+        flat[has_markup] = flat[has_markup].map(_strip_markup)
+
+    # re-aggregate the flat tokens into per-row lists
+    values = flat.to_numpy(dtype=object)
+    out = with_columns(out, {col: [chunk.tolist() for chunk in np.split(values, np.cumsum(lengths)[:-1])]})
     logger.info("Ingredients cleaned: {} -> {} rows", before, len(out))
     return out
 
 
 def normalize_price_range(df: pd.DataFrame, col: str = "price_range") -> pd.DataFrame:
     """Normalize the price_range column from symbols to categorical labels."""
-    out = df.copy()
     mapping = {"$": "cheap", "$$": "moderate"}
-    out[col] = out[col].apply(lambda x: mapping.get(x, "expensive"))
-    return out
+    return df.assign(**{col: df[col].astype(object).map(mapping).fillna("expensive")})
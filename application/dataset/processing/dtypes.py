@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+
+import pandas as pd
+
+# low-cardinality string columns carried through the sampling pipeline
+CATEGORICAL_COLS: tuple[str, ...] = ("category", "city", "state_id", "price_range")
+
+
+def with_columns(df: pd.DataFrame, columns: dict) -> pd.DataFrame:
+    """
+    ``df`` with ``columns`` set, in a shallow copy: ``df`` itself is not modified and its other columns are shared,
+    not copied. Safe on a filtered slice, without relying on pandas Copy-on-Write.
+    """
+    if not columns:
+        return df
+    out = df.copy(deep=False)
+    for col, values in columns.items():
+        out[col] = values
+    return out
+
+
+def as_categorical(df: pd.DataFrame, cols: Iterable[str] = CATEGORICAL_COLS) -> pd.DataFrame:
+    """Convert the given columns (when present and not already categorical) to the pandas category dtype."""
+    return with_columns(
+        df,
+        {
+            col: df[col].astype("category")
+            for col in cols
+            if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype)
+        },
+    )
+
+
+def as_object(df: pd.DataFrame, cols: Iterable[str] = CATEGORICAL_COLS) -> pd.DataFrame:
+    """Convert categorical columns back to plain object (string) columns."""
+    return with_columns(
+        df,
+        {
+            col: df[col].astype(object)
+            for col in cols
+            if col in df.columns and isinstance(df[col].dtype, pd.CategoricalDtype)
+        },
+    )
+
+
+# integer key of a (state_id, city) pair, shared by the restaurant, top-category and top-city frames
+LOCATION_KEY = "location_id"
+
+
+def location_key(df: pd.DataFrame, cols: Iterable[str] = ("state_id", "city")) -> pd.Series:
+    """
+    Number the distinct (state_id, city) pairs of ``df`` as int32, in sorted key order.
+
+    Because the ids follow the sort order of the keys, grouping or sorting on ``location_id`` gives the same
+    row order as grouping or sorting on the string/categorical keys themselves.
+    """
+    return df.groupby(list(cols), observed=True, sort=True).ngroup().astype("int32").rename(LOCATION_KEY)
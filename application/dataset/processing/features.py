@@ -5,6 +5,8 @@ from loguru import logger
 
 from application.utils.misc import convert_entities_to_list
 
+from .dtypes import as_categorical
+
 
 # extract ingredients using NER pipeline
 def extract_ingredients_series(descriptions: pd.Series, ner_pipeline) -> pd.Series:
@@ -29,10 +31,8 @@ def attach_cost_index(df: pd.DataFrame, df_cost_index: pd.DataFrame) -> pd.DataF
         df_cost_index[["state_id", "city", "cost_of_living_index"]],
         how="left",
         on=["city", "state_id"],
-    ).copy()
-    out = out[out.city != "layton"].copy()
-    out.reset_index(drop=True, inplace=True)
-    return out
+    )
+    return out[out.city != "layton"].reset_index(drop=True)
 
 
 # === DataFrame Utilities ===
@@ -42,10 +42,12 @@ def merge_density(df_restaurant_with_address: pd.DataFrame, df_density: pd.DataF
     """Merge city density data into the restaurant dataframe based on city and state_id."""
     logger.info("Merging city density data")
     temp_df = df_density[["city", "density", "state_id"]].apply(lambda x: x.astype(str).str.lower().str.strip())
-    out = pd.merge(df_restaurant_with_address, temp_df, how="left", on=["city", "state_id"]).copy()
+    out = pd.merge(df_restaurant_with_address, temp_df, how="left", on=["city", "state_id"])
     before = len(out)
-    out = out.dropna(subset=["density"]).copy()
-    out["density"] = out.density.astype("int32")
+    out = out.dropna(subset=["density"])
+    out = out.assign(density=out.density.astype("int32"))
+    # merging against the plain-string density table drops the categorical dtype of the keys
+    out = as_categorical(out, ["city", "state_id"])
     logger.info("Density merge: kept {} / {} rows with density", len(out), before)
     return out
 
@@ -54,7 +56,7 @@ def filter_to_top_states(df_res_density: pd.DataFrame, states):
     """Filter the dataframe to only include restaurants in the specified states."""
     states = tuple(s.lower() for s in states)
     logger.info("Filtering out states not in {}", states)
-    return df_res_density[df_res_density.state_id.isin(states)].copy()
+    return df_res_density[df_res_density.state_id.isin(states)]
 
 
 def load_states_name_dict(df_states: pd.DataFrame) -> dict:
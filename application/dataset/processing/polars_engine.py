@@ -0,0 +1,172 @@
+"""
+Polars execution engine for the pre-NER part of the sampling pipeline.
+
+Runs the same cleaning and selection logic as the pandas functions in ``cleaning``, ``features`` and
+``selection`` (preprocess → sync → address → density → top states → top categories → top cities →
+final menu frame), but as a single lazy, multi-threaded query plan that is collected once.
+The result is returned as a pandas DataFrame with plain (object) string columns, equal to the pandas
+engine output up to the row index.
+"""
+
+from __future__ import annotations
+
+import html
+from collections.abc import Iterable
+
+import pandas as pd
+from loguru import logger
+
+from .cleaning import _ADDRESS_RE
+from .selection import RESTAURANT_FEATURE_COLS
+
+try:
+    import polars as pl
+except ImportError:  # pragma: no cover - optional dependency
+    pl = None  # type: ignore
+
+
+def _require_polars() -> None:
+    if pl is None:
+        raise RuntimeError("engine='polars' requires the optional 'polars' package (pip install 'polars>=1.20').")
+
+
+def _unescape_html(s: pl.Series) -> pl.Series:
+    """html.unescape only the values that contain an entity marker; everything else passes through."""
+    idx = s.str.contains("&", literal=True).fill_null(False).arg_true()
+    if idx.len() == 0:
+        return s
+    return s.scatter(idx, [html.unescape(v) for v in s.gather(idx).to_list()])
+
+
+def _clean_text(col: str) -> pl.Expr:
+    return pl.col(col).map_batches(_unescape_html, return_dtype=pl.String).str.strip_chars().str.normalize("NFKD")
+
+
+def _preprocess_menu(menu: pl.LazyFrame, price_is_text: bool) -> pl.LazyFrame:
+    """Lazy equivalent of ``cleaning.preprocess_menu``."""
+    price = pl.col("price")
+    if price_is_text:
+        price = price.str.replace_all("USD", "", literal=True).str.strip_chars()
+    return (
+        menu.with_columns(pl.col("description").str.strip_chars())
+        .drop_nulls(subset=["description"])
+        .with_columns(_clean_text("category"), _clean_text("description"))
+        .filter(pl.col("description").str.len_chars() > 0)
+        .unique(keep="first", maintain_order=True)
+        .with_columns(price.cast(pl.Float64))
+        .filter(pl.col("price").ne_missing(0) & pl.col("category").ne_missing("Picked for you"))
+    )
+
+
+def _restaurant_geo(restaurants: pl.LazyFrame, density: pl.LazyFrame, states: Iterable[str]) -> pl.LazyFrame:
+    """Lazy equivalent of ``build_address_fields`` → density intersect/merge → ``filter_to_top_states``."""
+    parts = pl.col("full_address").str.strip_chars().str.to_lowercase().str.extract_groups(_ADDRESS_RE.pattern)
+    density_keys = density.select(
+        [pl.col(c).cast(pl.String).str.to_lowercase().str.strip_chars() for c in ("city", "density", "state_id")]
+    )
+    density_cities = density.select(pl.col("city").cast(pl.String).str.strip_chars().str.to_lowercase())
+    return (
+        restaurants.with_columns(parts.alias("_addr"))
+        .with_columns(
+            pl.col("_addr").struct.field("city").alias("_city_raw"),
+            pl.col("_addr").struct.field("state_id").str.strip_chars().alias("state_id"),
+        )
+        .filter((pl.col("state_id").str.len_chars() == 2) & (pl.col("_city_raw").str.len_chars() > 0))
+        .with_columns(pl.col("_city_raw").str.strip_chars().alias("city"))
+        .drop("_addr", "_city_raw")
+        .join(density_cities, on="city", how="semi", maintain_order="left")
+        .join(density_keys, on=["city", "state_id"], how="left", maintain_order="left")
+        .drop_nulls(subset=["density"])
+        .with_columns(pl.col("density").cast(pl.Int32))
+        .filter(pl.col("state_id").is_in([s.lower() for s in states]))
+    )
+
+
+def _head_per_group(lf: pl.LazyFrame, keys: list[str], n: int) -> pl.LazyFrame:
+    """Keep the first ``n`` rows per group, preserving row order (pandas ``groupby(keys).head(n)``)."""
+    return lf.filter(pl.int_range(pl.len()).over(keys) < n)
+
+
+def select_final_menu_frame(
+    df_restaurant: pd.DataFrame,
+    df_menu: pd.DataFrame,
+    df_density: pd.DataFrame,
+    top_states: Iterable[str],
+    top_categories_per_city: int,
+    focus_categories: Iterable[str],
+    top_cities_per_state: int,
+) -> pd.DataFrame:
+    """
+    Build the pre-NER menu frame (same as the pandas chain ending in ``build_final_menu_frame``)
+    with one lazy polars query plan.
+    """
+    _require_polars()
+    focus_categories = list(focus_categories)
+    logger.info("Building final menu frame with the polars engine...")
+
+    # the cleaned menu feeds four branches of the plan; materialize it once instead of re-running the text UDFs
+    price_is_text = not pd.api.types.is_numeric_dtype(df_menu["price"])
+    menu = _preprocess_menu(pl.from_pandas(df_menu).lazy(), price_is_text).collect().lazy()
+
+    # sync: restaurants with a usable price_range/address that have menus, and menus of those restaurants
+    restaurants = (
+        pl.from_pandas(df_restaurant[["id", "price_range", "full_address"]])
+        .lazy()
+        .drop_nulls(subset=["price_range", "full_address"])
+        .join(menu.select(pl.col("restaurant_id").alias("id")), on="id", how="semi", maintain_order="left")
+    )
+    menu = menu.join(
+        restaurants.select(pl.col("id").alias("restaurant_id")), on="restaurant_id", how="semi", maintain_order="left"
+    )
+
+    density = pl.from_pandas(df_density[["city", "density", "state_id"]]).lazy()
+    top_state_restaurants = _restaurant_geo(restaurants, density, top_states)
+
+    # compute_top_categories
+    res_ext = menu.select("restaurant_id", pl.col("category").alias("menu_category")).join(
+        top_state_restaurants.select(pl.col("id").alias("restaurant_id"), *RESTAURANT_FEATURE_COLS),
+        on="restaurant_id",
+        how="inner",
+        maintain_order="left",
+    )
+    category_counts = (
+        res_ext.drop_nulls(subset=["state_id", "city", "menu_category"])
+        .group_by("state_id", "city", "menu_category")
+        .agg(pl.len().cast(pl.Int64).alias("count"))
+        .sort("state_id", "city", "menu_category")
+        .sort("count", descending=True, maintain_order=True)
+    )
+    top_categories = _head_per_group(category_counts, ["state_id", "city"], top_categories_per_city)
+
+    # pick_top_cities
+    top_cities = _head_per_group(
+        top_categories.filter(pl.col("menu_category").is_in(focus_categories))
+        .group_by("state_id", "city")
+        .agg(pl.col("count").sum())
+        .sort("state_id", "city")
+        .sort(["state_id", "count"], descending=[False, True], maintain_order=True),
+        ["state_id"],
+        top_cities_per_state,
+    )
+
+    # build_final_menu_frame
+    restaurants_final = (
+        res_ext.drop_nulls(subset=["price_range"])
+        .join(top_cities.select("state_id", "city"), on=["state_id", "city"], how="inner", maintain_order="left")
+        .select("restaurant_id", *RESTAURANT_FEATURE_COLS)
+        .unique(keep="first", maintain_order=True)
+    )
+    final = (
+        restaurants_final.join(
+            menu.select("restaurant_id", "category", "description", "price"),
+            on="restaurant_id",
+            how="inner",
+            maintain_order="left_right",
+        )
+        .filter(pl.col("category").is_in(focus_categories))
+        .unique(keep="first", maintain_order=True)
+    )
+
+    df_final = final.collect().to_pandas()
+    logger.info("Final pre-NER frame (polars): {} rows", len(df_final))
+    return df_final
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+_ORDER_COL = "_reservoir_row"
+_KEY_COL = "_reservoir_key"
+
+
+def row_sample_keys(df: pd.DataFrame, seed: int) -> np.ndarray:
+    """
+    Pseudo-random uint64 sampling key of every row, derived from the row's contents and ``seed``.
+
+    Keys depend only on the row itself (not on its position or on how the data is chunked), so the same seed
+    selects the same rows in the in-memory and the out-of-core sampler.
+    """
+    hash_key = str(seed).zfill(16)[-16:]  # hash_pandas_object wants a 16-character key
+    return pd.util.hash_pandas_object(df, index=False, hash_key=hash_key).to_numpy()
+
+
+class StratifiedReservoir:
+    """
+    One-pass stratified reservoir (bottom-k) sampler over a stream of DataFrame chunks.
+
+    Every row gets a seeded pseudo-random key (``row_sample_keys``); the sample is the ``per_stratum`` rows with
+    the smallest keys in each stratum (distinct values of the ``strata`` columns), capped to the ``size`` rows
+    with the smallest keys overall. Both caps are optional; without strata ``size`` gives a simple random
+    sample. Memory stays bounded by the sample itself plus one chunk, and the result keeps the input row order.
+
+    Usage:
+        reservoir = StratifiedReservoir(("state_id", "category"), per_stratum=500, seed=settings.SEED)
+        for chunk in chunks:
+            reservoir.update(chunk)
+        df_sample = reservoir.result()
+    """
+
+    def __init__(
+        self,
+        strata: Sequence[str] = (),
+        per_stratum: int | None = None,
+        size: int | None = None,
+        seed: int = 0,
+    ):
+        if per_stratum is not None and not strata:
+            raise ValueError("per_stratum needs at least one strata column.")
+        for name, value in (("per_stratum", per_stratum), ("size", size)):
+            if value is not None and value < 1:
+                raise ValueError(f"{name} must be a positive number of rows, got {value}.")
+        self.strata = list(strata)
+        self.per_stratum = per_stratum
+        self.size = size
+        self.seed = seed
+        self.seen = 0
+        self._kept: pd.DataFrame | None = None
+
+    def update(self, chunk: pd.DataFrame) -> None:
+        """Offer the rows of ``chunk`` to the sample."""
+        missing = [c for c in self.strata if c not in chunk.columns]
+        if missing:
+            raise ValueError(f"Strata column(s) {missing} not in the sampled frame; columns: {list(chunk.columns)}")
+        keyed = chunk.assign(
+            **{
+                _KEY_COL: row_sample_keys(chunk, self.seed),
+                _ORDER_COL: np.arange(self.seen, self.seen + len(chunk), dtype=np.int64),
+            }
+        )
+        self.seen += len(chunk)
+        candidates = keyed if self._kept is None else pd.concat([self._kept, keyed], ignore_index=True)
+        # ties on the (64-bit) key are broken by arrival order, so the result is fully deterministic
+        candidates = candidates.sort_values([_KEY_COL, _ORDER_COL], kind="stable")
+        if self.per_stratum is not None:
+            candidates = candidates.groupby(self.strata, observed=True, dropna=False).head(self.per_stratum)
+        if self.size is not None:
+            candidates = candidates.head(self.size)
+        self._kept = candidates
+
+    def result(self) -> pd.DataFrame:
+        """The sampled rows, in input order."""
+        if self._kept is None:
+            raise ValueError("No rows were offered to the reservoir.")
+        out = self._kept.sort_values(_ORDER_COL, ignore_index=True).drop(columns=[_KEY_COL, _ORDER_COL])
+        logger.info(
+            "Reservoir sample: kept {} / {} rows (strata={}, per_stratum={}, size={})",
+            len(out),
+            self.seen,
+            self.strata or None,
+            self.per_stratum,
+            self.size,
+        )
+        return out
+
+
+def stratified_sample(
+    df: pd.DataFrame,
+    strata: Iterable[str] = (),
+    per_stratum: int | None = None,
+    size: int | None = None,
+    seed: int = 0,
+) -> pd.DataFrame:
+    """Sample a whole DataFrame with ``StratifiedReservoir`` (same rows as streaming it chunk by chunk)."""
+    reservoir = StratifiedReservoir(tuple(strata), per_stratum=per_stratum, size=size, seed=seed)
+    reservoir.update(df)
+    return reservoir.result()
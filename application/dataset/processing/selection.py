@@ -5,60 +5,132 @@ from collections.abc import Iterable
 import pandas as pd
 from loguru import logger
 
+from .dtypes import LOCATION_KEY, location_key
+
+# restaurant attributes carried into the menu-level frame (everything else is dropped before the join)
+RESTAURANT_FEATURE_COLS: tuple[str, ...] = ("price_range", "state_id", "city", "density")
+
+
+def _with_location_key(df: pd.DataFrame) -> pd.DataFrame:
+    return df if LOCATION_KEY in df.columns else df.assign(**{LOCATION_KEY: location_key(df)})
+
+
+def _attach_location(df: pd.DataFrame, locations: pd.DataFrame) -> pd.DataFrame:
+    """Put the (state_id, city) columns of each ``location_id`` back in front of ``df``."""
+    out = pd.merge(locations, df, on=LOCATION_KEY, how="right")
+    return out[["state_id", "city", *(c for c in df.columns if c != LOCATION_KEY), LOCATION_KEY]]
+
 
 def compute_top_categories(df_menu: pd.DataFrame, df_top_state_restaurants: pd.DataFrame, top_n_per_city: int):
-    """Compute the top menu categories per city from the menu and restaurant dataframes."""
+    """
+    Compute the top menu categories per city from the menu and restaurant dataframes.
+
+    Only the restaurant columns needed downstream (``RESTAURANT_FEATURE_COLS``) are joined onto the menu rows,
+    and menus of restaurants outside the selected states are dropped by the (inner) join.
+    Cities are grouped on their integer ``location_id`` (added here if the restaurants don't carry it yet).
+    """
     logger.info("Computing top categories per city...")
+    df_top_state_restaurants = _with_location_key(df_top_state_restaurants)
     df_res_ext = pd.merge(
         df_menu[["restaurant_id", "category"]],
-        df_top_state_restaurants,
+        df_top_state_restaurants[["id", *RESTAURANT_FEATURE_COLS, LOCATION_KEY]],
         left_on="restaurant_id",
         right_on="id",
-        how="left",
-    ).copy()
+        how="inner",
+    )
+    df_res_ext.drop(columns=["id"], inplace=True)
+    df_res_ext.rename(columns={"category": "menu_category"}, inplace=True)
+
+    category_counts = df_res_ext.groupby([LOCATION_KEY, "menu_category"], observed=True).size()
+    locations = df_top_state_restaurants[[LOCATION_KEY, "state_id", "city"]].drop_duplicates(LOCATION_KEY)
+    top_categories = top_categories_from_counts(category_counts, locations, top_n_per_city)
+    return df_res_ext, top_categories
 
-    df_res_ext.rename(columns={"category_x": "menu_category", "category_y": "restaurant_category"}, inplace=True)
-    if "id" in df_res_ext.columns:
-        df_res_ext.drop(["id"], axis=1, inplace=True)
 
-    category_counts = df_res_ext.groupby(["state_id", "city", "menu_category"]).size().reset_index(name="count")
-    sorted_categories = category_counts.sort_values("count", ascending=False)
-    top_categories = sorted_categories.groupby(["state_id", "city"]).head(top_n_per_city)
+def top_categories_from_counts(category_counts: pd.Series, locations: pd.DataFrame, top_n_per_city: int):
+    """
+    Keep the ``top_n_per_city`` most frequent menu categories of every city.
+
+    ``category_counts`` holds menu row counts indexed by (``location_id``, ``menu_category``) in sorted key
+    order, e.g. the sum of per-chunk counts in the out-of-core sampler; ``locations`` maps ``location_id`` back
+    to (state_id, city).
+    """
+    category_counts = category_counts.rename_axis([LOCATION_KEY, "menu_category"]).reset_index(name="count")
+    # stable sort: ties keep the (state_id, city, menu_category) key order, so the top-N cut is deterministic
+    sorted_categories = category_counts.sort_values("count", ascending=False, kind="stable")
+    top_categories = sorted_categories.groupby(LOCATION_KEY).head(top_n_per_city)
+    top_categories = _attach_location(top_categories, locations)
     logger.info("Top categories computed: {} rows", len(top_categories))
-    return df_res_ext, top_categories
+    return top_categories
 
 
 def pick_top_cities(top_categories: pd.DataFrame, focus_categories: Iterable[str], top_cities_per_state: int):
     """Select the top cities per state based on the focus categories."""
     logger.info("Selecting top cities per state for focus categories {}...", ", ".join(focus_categories))
-    top_filtered_categories = top_categories[top_categories.menu_category.isin(tuple(focus_categories))].copy()
-    state_city_counts = top_filtered_categories.groupby(["state_id", "city"])["count"].sum().reset_index()
-    state_city_counts = state_city_counts.sort_values(["state_id", "count"], ascending=[True, False])
-    top_cities = state_city_counts.groupby("state_id").head(top_cities_per_state).copy()
+    top_categories = _with_location_key(top_categories)
+    top_filtered_categories = top_categories[top_categories.menu_category.isin(tuple(focus_categories))]
+    state_city_counts = top_filtered_categories.groupby(LOCATION_KEY)["count"].sum().reset_index()
+    locations = top_categories[[LOCATION_KEY, "state_id", "city"]].drop_duplicates(LOCATION_KEY)
+    state_city_counts = _attach_location(state_city_counts, locations)
+    state_city_counts = state_city_counts.sort_values(["state_id", "count"], ascending=[True, False], kind="stable")
+    top_cities = state_city_counts.groupby("state_id", observed=True).head(top_cities_per_state)
     logger.info("Picked {} top cities across states", len(top_cities))
     return top_cities
 
 
+def _merge_sorted(left: pd.DataFrame, right: pd.DataFrame, on: str) -> pd.DataFrame:
+    """
+    Inner join via a merge-join of both sides sorted on ``on``.
+
+    Rows come back in the same order as ``pd.merge(left, right, on=on)`` (left order, then right order),
+    so the result is identical to the hash join.
+    """
+    left = left.reset_index(drop=True).rename_axis("_left_pos").reset_index()
+    right = right.reset_index(drop=True).rename_axis("_right_pos").reset_index()
+    joined = (
+        left.sort_values(on, kind="stable")
+        .set_index(on)
+        .join(right.sort_values(on, kind="stable").set_index(on), how="inner")
+    )
+    joined = joined.reset_index().sort_values(["_left_pos", "_right_pos"], ignore_index=True)
+    return joined[[*left.columns.drop("_left_pos"), *(c for c in right.columns if c not in ("_right_pos", on))]]
+
+
 def build_final_menu_frame(
-    df_menu: pd.DataFrame, df_res_ext: pd.DataFrame, top_cities: pd.DataFrame, focus_categories: Iterable[str]
+    df_menu: pd.DataFrame,
+    df_res_ext: pd.DataFrame,
+    top_cities: pd.DataFrame,
+    focus_categories: Iterable[str],
+    sorted_merge: bool = False,
 ) -> pd.DataFrame:
-    """Build the final menu dataframe filtered by top cities and focus categories."""
+    """
+    Build the final menu dataframe filtered by top cities and focus categories.
+
+    Cities are matched on ``location_id`` when both frames carry it (on the string keys otherwise).
+    With ``sorted_merge=True`` the menu rows are attached with a merge-join on sorted restaurant ids instead
+    of a hash join; the output is the same.
+    """
     logger.info("Building final menu frame...")
-    df_res_ext_nonnull = df_res_ext.dropna(subset=["price_range"]).copy()
-    res_filtered_df = pd.merge(
-        df_res_ext_nonnull,
-        top_cities[["state_id", "city"]],
-        on=["state_id", "city"],
-    ).copy()
-    res_filtered_df.drop_duplicates(inplace=True)
-
-    df_final = pd.merge(
-        res_filtered_df[["restaurant_id", "price_range", "state_id", "city", "density"]],
-        df_menu[["restaurant_id", "category", "description", "price"]],
-        on=["restaurant_id"],
-    ).copy()
-
-    df_final = df_final[df_final.category.isin(tuple(focus_categories))].copy()
-    df_final.drop_duplicates(inplace=True)
+    if LOCATION_KEY in df_res_ext.columns and LOCATION_KEY in top_cities.columns:
+        # top_cities has one row per city, so the inner join is a semi-join filter
+        in_top_city = df_res_ext[LOCATION_KEY].isin(top_cities[LOCATION_KEY].to_numpy())
+        res_filtered_df = df_res_ext[in_top_city & df_res_ext["price_range"].notna()]
+    else:
+        res_filtered_df = pd.merge(
+            df_res_ext.dropna(subset=["price_range"]),
+            top_cities[["state_id", "city"]],
+            on=["state_id", "city"],
+        )
+    # one row per restaurant; the menu_category granularity of df_res_ext is not needed for the join below
+    res_filtered_df = res_filtered_df[["restaurant_id", "price_range", "state_id", "city", "density"]].drop_duplicates()
+
+    menu_cols = df_menu[["restaurant_id", "category", "description", "price"]]
+    if sorted_merge:
+        df_final = _merge_sorted(res_filtered_df, menu_cols, on="restaurant_id")
+    else:
+        df_final = pd.merge(res_filtered_df, menu_cols, on=["restaurant_id"])
+    del res_filtered_df, menu_cols
+
+    df_final = df_final[df_final.category.isin(tuple(focus_categories))].drop_duplicates()
     logger.info("Final pre-NER frame: {} rows", df_final.shape[0])
     return df_final
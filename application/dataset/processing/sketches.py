@@ -0,0 +1,173 @@
+"""
+Mergeable quantile sketches for the IQR price-outlier filter.
+
+A ``QuantileSketch`` summarizes a sample as sorted centroids (value, weight). Sketches of chunks or partitions
+can be built independently (also in parallel) and merged in any order. While the number of distinct values
+stays within ``compression`` the centroids are the exact value counts and the quantiles equal
+``Series.quantile``; beyond that, neighbouring centroids are merged t-digest style (small clusters at the tails,
+larger ones in the middle), so memory stays bounded by ``compression`` and the quantile error is smallest where
+the IQR bounds need it least.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from .cleaning import _iqr_bounds
+
+
+def _quantile_from_counts(values: np.ndarray, cum_counts: np.ndarray, q: float) -> float:
+    """``Series.quantile(q)`` (linear interpolation) of a sample given as sorted distinct values and their counts."""
+    n = int(cum_counts[-1])
+    h = (n - 1) * q
+    lo = int(np.floor(h))
+    a, b = values[np.searchsorted(cum_counts, [lo, min(lo + 1, n - 1)], side="right")]
+    t = h - lo
+    # same arithmetic as numpy's linear interpolation, so the result is bit-identical to the row-wise quantile
+    return float(b - (b - a) * (1 - t)) if t >= 0.5 else float(a + (b - a) * t)
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch (t-digest style centroids, exact value counts while they fit).
+
+    ``compression`` bounds the number of centroids kept (about ``compression``); ``None`` never compresses, i.e.
+    the sketch is an exact value -> count table.
+    """
+
+    def __init__(self, compression: int | None = 200):
+        if compression is not None and compression < 10:
+            raise ValueError(f"compression must be at least 10 (or None for exact), got {compression}.")
+        self.compression = compression
+        self.means = np.empty(0, dtype=float)
+        self.weights = np.empty(0, dtype=np.int64)
+        self.exact = True  # centroids are still distinct values with their counts
+
+    @classmethod
+    def from_counts(cls, values, counts, compression: int | None = 200) -> QuantileSketch:
+        """Sketch of a sample given as distinct values and their counts (NaN values are ignored)."""
+        sketch = cls(compression)
+        return sketch._add(np.asarray(values, dtype=float), np.asarray(counts, dtype=np.int64), exact=True)
+
+    @classmethod
+    def from_values(cls, values, compression: int | None = 200) -> QuantileSketch:
+        """Sketch of a sample of raw values (NaN values are ignored)."""
+        values, counts = np.unique(np.asarray(values, dtype=float), return_counts=True)
+        return cls.from_counts(values, counts, compression)
+
+    @property
+    def count(self) -> int:
+        return int(self.weights.sum())
+
+    def merge(self, other: QuantileSketch) -> QuantileSketch:
+        """Return the sketch of both samples (neither input is modified)."""
+        out = type(self)(self.compression)
+        out.means, out.weights, out.exact = self.means, self.weights, self.exact
+        return out._add(other.means, other.weights, exact=other.exact)
+
+    def quantile(self, q: float) -> float:
+        """Estimate ``Series.quantile(q)`` (linear interpolation); exact while ``self.exact``."""
+        if not len(self.means):
+            return np.nan
+        cum_counts = np.cumsum(self.weights)
+        if self.exact:
+            return _quantile_from_counts(self.means, cum_counts, q)
+        # interpolate between centroid centres (in rank units) as if each cluster's values were spread around it
+        centres = cum_counts - self.weights / 2
+        return float(np.interp(q * (cum_counts[-1] - 1) + 0.5, centres, self.means))
+
+    def _add(self, means: np.ndarray, weights: np.ndarray, exact: bool) -> QuantileSketch:
+        keep = ~np.isnan(means) & (weights > 0)
+        means = np.concatenate([self.means, means[keep]])
+        weights = np.concatenate([self.weights, weights[keep]])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        self.exact = self.exact and exact
+        if self.exact and len(means):
+            # exact centroids are distinct values: fold equal values together
+            starts = np.flatnonzero(np.r_[True, means[1:] != means[:-1]])
+            means, weights = means[starts], np.add.reduceat(weights, starts)
+        self.means, self.weights = means, weights
+        if self.compression is not None and len(self.means) > self.compression:
+            self._compress()
+        return self
+
+    def _compress(self) -> None:
+        # t-digest k1 scale: k(q) = delta / (2 pi) * asin(2q - 1) spans about delta / 2 units over [0, 1]; a
+        # cluster covers at most one unit, so clusters are small at the tails and large around the median
+        weights = self.weights.astype(float)
+        q_mid = (np.cumsum(weights) - weights / 2) / weights.sum()
+        k = self.compression / (2 * np.pi) * np.arcsin(np.clip(2 * q_mid - 1, -1, 1))
+        cluster = np.floor(k - k[0]).astype(np.int64)
+        starts = np.flatnonzero(np.r_[True, cluster[1:] != cluster[:-1]])
+        merged_weights = np.add.reduceat(self.weights, starts)
+        self.means = np.add.reduceat(self.means * weights, starts) / merged_weights
+        self.weights = merged_weights
+        self.exact = False
+
+
+def sketch_groups(
+    df: pd.DataFrame,
+    by: Sequence[str] = (),
+    value_col: str = "price",
+    compression: int | None = 200,
+) -> dict[tuple, QuantileSketch]:
+    """One sketch of ``value_col`` per distinct value of the ``by`` columns (a single ``()`` group without ``by``)."""
+    by = list(by)
+    missing = [c for c in by if c not in df.columns]
+    if missing:
+        raise ValueError(f"Outlier group column(s) {missing} not in the frame; columns: {list(df.columns)}")
+    keys = [df[c].astype(object) for c in by]
+    counts = df.groupby([*keys, df[value_col]]).size()
+    if not by:
+        return {(): QuantileSketch.from_counts(counts.index.to_numpy(), counts.to_numpy(), compression)}
+    sketches = {}
+    for key, group in counts.groupby(level=list(range(len(by)))):
+        key = key if isinstance(key, tuple) else (key,)
+        values = group.index.get_level_values(-1).to_numpy()
+        sketches[key] = QuantileSketch.from_counts(values, group.to_numpy(), compression)
+    return sketches
+
+
+def merge_sketch_groups(*groups: Mapping[tuple, QuantileSketch]) -> dict[tuple, QuantileSketch]:
+    """Merge per-group sketches (e.g. of several chunks or partitions) group by group."""
+    merged: dict[tuple, QuantileSketch] = {}
+    for sketches in groups:
+        for key, sketch in sketches.items():
+            merged[key] = merged[key].merge(sketch) if key in merged else sketch
+    return merged
+
+
+def iqr_bounds_by_group(
+    sketches: Mapping[tuple, QuantileSketch], by: Sequence[str] = (), whisker: float = 1.5
+) -> pd.DataFrame:
+    """IQR (lower, upper) bounds of every group, as a frame with the ``by`` columns plus ``lower``/``upper``."""
+    rows = [
+        (*key, *_iqr_bounds(sketch.quantile(0.25), sketch.quantile(0.75), whisker)) for key, sketch in sketches.items()
+    ]
+    return pd.DataFrame(rows, columns=[*by, "lower", "upper"])
+
+
+def remove_price_outliers_grouped(
+    df: pd.DataFrame,
+    bounds: pd.DataFrame,
+    by: Iterable[str] = (),
+    price_col: str = "price",
+) -> pd.DataFrame:
+    """Keep the rows whose price lies within the IQR bounds of their group (rows of unknown groups are dropped)."""
+    by = list(by)
+    if by:
+        index = pd.MultiIndex.from_frame(bounds[by].astype(object))
+        pos = index.get_indexer(pd.MultiIndex.from_frame(df[by].astype(object)))
+        lower = np.append(bounds["lower"].to_numpy(dtype=float), np.nan)[pos]
+        upper = np.append(bounds["upper"].to_numpy(dtype=float), np.nan)[pos]
+    else:
+        lower, upper = (bounds[c].iloc[0] if len(bounds) else np.nan for c in ("lower", "upper"))
+    price = df[price_col].to_numpy(dtype=float)
+    keep = (price >= lower) & (price <= upper)
+    logger.info("Removed {} / {} {} outliers using IQR bounds per {}.", int((~keep).sum()), len(df), price_col, by)
+    return df[keep]
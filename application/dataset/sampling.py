@@ -1,49 +1,63 @@
 from __future__ import annotations
 
+import gc
 import time
+from collections.abc import Callable
+from dataclasses import dataclass
 
-import numpy as np
 import pandas as pd
 from loguru import logger
 
 from application.networks import NERModelSingleton
+from application.utils.profiling import StageProfiler
 
-from . import io, processing
+from . import checkpoints, io, processing
+from .checkpoints import CheckpointStore
 from .config import Config
+from .processing import polars_engine
 
 _DEFAULT_CFG = Config()
+# the code of the stages and of the helpers they call (cleaning, selection, NER): part of every checkpoint key
+STAGE_PACKAGES = ("application.dataset", "application.networks")
+
+
+# selected columns from restaurants.csv
+# zip code varies in states, hence removed, we can get location from coordinates or full address
+# search position doesn't give any context in price prediction, hence removed
+# name is removed as it's not helpful in price prediction
+RESTAURANT_COLUMNS = ["id", "score", "ratings", "category", "price_range", "full_address", "lat", "lng"]
+# dtype parsing instead of per-cell converters
+RESTAURANT_DTYPES = {"id": "int32", "lat": "float32", "lng": "float32"}
+MENU_DTYPES = {"restaurant_id": "int32"}
+
+
+def _load(cfg: Config, handle: str, file: str, **kwargs) -> pd.DataFrame:
+    return io.load_cached_dataset(
+        handle,
+        file,
+        cache_dir=cfg.DATASET_CACHE_DIR,
+        pandas_kwargs={"skipinitialspace": True},
+        refresh=cfg.refresh_cache,
+        **kwargs,
+    )
+
+
+def load_lookup_frames(cfg: Config):
+    """Load the small inputs (everything but the menus): restaurants, cost index, density and states."""
+    df_restaurant = _load(
+        cfg, cfg.RESTAURANTS_DS, cfg.RESTAURANTS_FILE, columns=RESTAURANT_COLUMNS, dtypes=RESTAURANT_DTYPES
+    )
+    df_index = _load(cfg, cfg.INDEX_DS, cfg.INDEX_FILE)
+    df_density = _load(cfg, cfg.DENSITY_DS, cfg.DENSITY_FILE)
+    df_states = _load(cfg, cfg.STATES_DS, cfg.STATES_FILE)
+    return df_restaurant, df_index, df_density, df_states
 
 
 def load_base_frames(cfg: Config):
     t0 = time.time()
-    # Load datasets
-
-    # selected columns from restaurants.csv
-    # zip code varies in states, hence removed, we can get location from coordinates or full address
-    # search position doesn't give any context in price prediction, hence removed
-    # name is removed as it's not helpful in price prediction
-    res_cols = ["id", "score", "ratings", "category", "price_range", "full_address", "lat", "lng"]
-
-    df_restaurant = io.load_kaggle_dataset(
-        cfg.RESTAURANTS_DS,
-        cfg.RESTAURANTS_FILE,
-        pandas_kwargs={
-            "skipinitialspace": True,
-            "usecols": res_cols,
-            "converters": {
-                "id": np.int32,
-                "position": np.int32,
-                # 'score': lambda x: np.float32(x) if x != None else np.nan,
-                # 'score':np.float32, 'ratings':np.float32,
-                "lat": np.float32,
-                "lng": np.float32,
-            },
-        },
-    )
-    df_menu = io.load_kaggle_dataset(cfg.MENUS_DS, cfg.MENUS_FILE, pandas_kwargs={"skipinitialspace": True})
-    df_index = io.load_kaggle_dataset(cfg.INDEX_DS, cfg.INDEX_FILE, pandas_kwargs={"skipinitialspace": True})
-    df_density = io.load_kaggle_dataset(cfg.DENSITY_DS, cfg.DENSITY_FILE, pandas_kwargs={"skipinitialspace": True})
-    df_states = io.load_kaggle_dataset(cfg.STATES_DS, cfg.STATES_FILE, pandas_kwargs={"skipinitialspace": True})
+    # Load datasets (through the local typed cache, see io.load_cached_dataset)
+    df_restaurant, df_index, df_density, df_states = load_lookup_frames(cfg)
+    df_menu = _load(cfg, cfg.MENUS_DS, cfg.MENUS_FILE, dtypes=MENU_DTYPES)
     logger.info(
         "Loaded: restaurants={} rows, menus={} rows, index={} rows, density={} rows in {:.2f}s",
         len(df_restaurant),
@@ -55,52 +69,116 @@ def load_base_frames(cfg: Config):
     return df_restaurant, df_menu, df_index, df_density, df_states
 
 
-def generate_training_sample(cfg: Config = _DEFAULT_CFG) -> pd.DataFrame:
-    # Load
-    df_restaurant, df_menu_raw, df_index, df_density, df_states = load_base_frames(cfg)
-
-    # Preprocess + sync
-    df_menu = processing.preprocess_menu(df_menu_raw)
-    df_restaurant_synced, df_menu_synced = processing.sync_restaurants_and_menus(df_restaurant, df_menu)
-
-    # Address + density
-    df_addr = processing.build_address_fields(df_restaurant_synced)
+def restaurants_in_top_states(df_restaurant: pd.DataFrame, df_density: pd.DataFrame, states) -> pd.DataFrame:
+    """Restaurants of ``states`` with city/state_id, city density and the integer ``location_id`` attached."""
+    df_addr = processing.build_address_fields(df_restaurant)
 
     # Intersect only cities present in density
     density_cities = set(df_density.city.str.strip().str.lower())
-    df_addr = df_addr[df_addr.city.isin(density_cities)].copy()
+    df_addr = df_addr[df_addr.city.isin(density_cities)]
     df_res_density = processing.merge_density(df_addr, df_density)
+    del df_addr
 
     # Filter to selected states
-    df_top_state = processing.filter_to_top_states(df_res_density, cfg.top_states_filter)
-    # generate states name dict
-    states_name_dict = processing.load_states_name_dict(df_states)
+    df_top_state = processing.filter_to_top_states(df_res_density, states)
+    del df_res_density
+
+    # integer (state_id, city) key used by all joins/filters of the selection stage
+    return df_top_state.assign(**{processing.LOCATION_KEY: processing.location_key(df_top_state)})
 
-    # Category/city selection
+
+# -------------------- stages --------------------
+# Each stage takes the frames produced so far (by name) and returns the frames the next stages need.
+Frames = dict[str, pd.DataFrame]
+
+
+def _stage_preprocess_menu(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    frames["menu"] = processing.preprocess_menu(frames.pop("menu_raw"))
+    return frames
+
+
+def _stage_sync(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    frames["restaurant"], frames["menu"] = processing.sync_restaurants_and_menus(frames["restaurant"], frames["menu"])
+    return frames
+
+
+def _stage_address_density(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    frames["top_state"] = restaurants_in_top_states(
+        frames.pop("restaurant"), frames.pop("density"), cfg.top_states_filter
+    )
+    return frames
+
+
+def _stage_selection(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    df_menu = frames.pop("menu")
     df_res_ext, top_categories = processing.compute_top_categories(
-        df_menu_synced, df_top_state, cfg.top_categories_per_city
+        df_menu, frames.pop("top_state"), cfg.top_categories_per_city
     )
 
     # Category -> cities
     top_cities = processing.pick_top_cities(top_categories, cfg.focus_categories, cfg.top_cities_per_state)
 
     # Final base frame
-    df_final = processing.build_final_menu_frame(df_menu_synced, df_res_ext, top_cities, cfg.focus_categories)
+    df_final = processing.build_final_menu_frame(
+        df_menu, df_res_ext, top_cities, cfg.focus_categories, sorted_merge=cfg.sorted_merge
+    )
+    # the pre-NER frame is small; the enrichment steps below work on plain string columns
+    return {"sample": processing.as_object(df_final)}
+
+
+def _stage_selection_polars(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    # preprocess → sync → address/density → selection as one lazy polars plan
+    df_final = polars_engine.select_final_menu_frame(
+        frames.pop("restaurant"),
+        frames.pop("menu_raw"),
+        frames.pop("density"),
+        cfg.top_states_filter,
+        cfg.top_categories_per_city,
+        cfg.focus_categories,
+        cfg.top_cities_per_state,
+    )
+    return {"sample": df_final}
+
 
-    # Price outliers + NER ingredients
-    df_sampled = processing.remove_price_outliers_iqr(df_final, price_col="price", whisker=1.5)
+def _stage_outliers(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    df_sampled = frames["sample"]
+    groups = cfg.outlier_groups
+    sketches = processing.sketch_groups(df_sampled, groups, "price", compression=cfg.outlier_sketch_compression)
+    bounds = processing.iqr_bounds_by_group(sketches, groups, whisker=1.5)
+    df_sampled = processing.remove_price_outliers_grouped(df_sampled, bounds, groups, price_col="price")
     logger.info("Remaining rows: {}", len(df_sampled))
+    return {"sample": df_sampled}
+
+
+def row_reservoir(cfg: Config) -> processing.StratifiedReservoir | None:
+    """The configured pre-NER row sampler, or None when every selected row is kept."""
+    if cfg.sample_per_stratum is None and cfg.sample_size is None:
+        return None
+    return processing.StratifiedReservoir(
+        cfg.sample_strata, per_stratum=cfg.sample_per_stratum, size=cfg.sample_size, seed=cfg.sample_seed
+    )
+
+
+def _stage_reservoir(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    reservoir = row_reservoir(cfg)
+    reservoir.update(frames["sample"])
+    return {"sample": reservoir.result()}
 
+
+def _stage_ner(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    df_sampled = frames["sample"]
     ner_pipeline = NERModelSingleton().get_pipeline()
-    df_sampled["ingredients"] = processing.extract_ingredients_series(df_sampled["description"], ner_pipeline)
-    df_sampled = df_sampled.drop(columns=["description"])  # drop after extracting
-    df_sampled = processing.clean_ingredients_column(df_sampled, col="ingredients")
+    ingredients = processing.extract_ingredients_series(df_sampled["description"], ner_pipeline)
+    df_sampled = df_sampled.drop(columns=["description"]).assign(ingredients=ingredients)  # drop after extracting
+    return {"sample": processing.clean_ingredients_column(df_sampled, col="ingredients")}
+
 
-    # Enrichment & normalize
+def _stage_enrichment(frames: Frames, cfg: Config, lookups: dict) -> Frames:
+    df_sampled = frames["sample"]
     if "restaurant_id" in df_sampled.columns:
         df_sampled = df_sampled.drop(columns=["restaurant_id"])  # mirrors original
 
-    df_sampled = processing.attach_cost_index(df_sampled, df_index)
+    df_sampled = processing.attach_cost_index(df_sampled, lookups["index"])
     logger.info("Cost-of-living index attached")
 
     # Normalize price_range to buckets
@@ -108,13 +186,116 @@ def generate_training_sample(cfg: Config = _DEFAULT_CFG) -> pd.DataFrame:
     logger.info("Normalized price_range to buckets (cheap/moderate/expensive)")
 
     # Replace state_id with full state names
-    df_sampled["state_id"] = df_sampled["state_id"].replace(states_name_dict)
+    df_sampled["state_id"] = df_sampled["state_id"].replace(lookups["states_name_dict"])
     logger.info("Replaced state_id with full state names")
 
     # Final clean-up
-    df_sampled.dropna(inplace=True)
+    return {"sample": df_sampled.dropna()}
+
+
+@dataclass(frozen=True)
+class SampleStage:
+    """A named sampling stage: the config values its output depends on, and whether to checkpoint it."""
+
+    name: str
+    run: Callable[[Frames, Config, dict], Frames]
+    params: tuple = ()
+    checkpoint: bool = True
+
+
+def sampling_stages(cfg: Config) -> list[SampleStage]:
+    """The stage graph (a chain) of ``generate_training_sample`` for the configured engine."""
+    selection_params = (cfg.top_categories_per_city, cfg.focus_categories, cfg.top_cities_per_state)
+    if cfg.engine == "polars":
+        head = [SampleStage("selection[polars]", _stage_selection_polars, (cfg.top_states_filter, *selection_params))]
+    else:
+        head = [
+            # stages that output the full-size menu are cheap to rerun relative to their size on disk
+            SampleStage("preprocess_menu", _stage_preprocess_menu, checkpoint=False),
+            SampleStage("sync", _stage_sync, checkpoint=False),
+            SampleStage("address_density", _stage_address_density, (cfg.top_states_filter,), checkpoint=False),
+            SampleStage("selection", _stage_selection, selection_params),
+        ]
+    outlier_params = (1.5, cfg.outlier_groups, cfg.outlier_sketch_compression)
+    stages = [*head, SampleStage("outliers", _stage_outliers, outlier_params, checkpoint=False)]
+    if row_reservoir(cfg) is not None:
+        sample_params = (cfg.sample_strata, cfg.sample_per_stratum, cfg.sample_size, cfg.sample_seed)
+        stages.append(SampleStage("reservoir", _stage_reservoir, sample_params, checkpoint=False))
+    return [
+        *stages,
+        SampleStage("ner", _stage_ner, (cfg.NER_MODEL,)),
+        SampleStage("enrichment", _stage_enrichment),
+    ]
+
+
+def generate_training_sample(cfg: Config = _DEFAULT_CFG, force: bool = False) -> pd.DataFrame | None:
+    """
+    Run the sampling stages and write the training sample (``io.write_training_sample``: the typed Parquet sample
+    next to ``cfg.FINAL_SAMPLED_DATA_PATH``, plus the CSV export at that path).
+
+    Checkpointed stage outputs are stored in ``cfg.CHECKPOINT_DIR`` under a key built from a content hash of
+    the input frames, of the source of ``STAGE_PACKAGES`` and of the config values of the stage and every stage
+    before it. A rerun resumes after the last stage whose checkpoint is still valid; ``force=True`` recomputes
+    (and overwrites) everything.
+
+    With ``cfg.chunk_rows`` set the sample is built out of core instead (``generate_training_sample_chunked``)
+    and written chunk by chunk; nothing is returned then, as the sample is not held in memory.
+    """
+    if cfg.chunk_rows:
+        from .chunked import generate_training_sample_chunked  # chunked builds on the stages of this module
+
+        generate_training_sample_chunked(cfg)
+        return None
+    if cfg.engine not in ("pandas", "polars"):
+        raise ValueError(f"Unknown sampling engine {cfg.engine!r}; expected 'pandas' or 'polars'.")
+    profiler = StageProfiler()
+    store = CheckpointStore(cfg.CHECKPOINT_DIR)
+
+    # Load
+    with profiler.stage("load"):
+        df_restaurant, df_menu_raw, df_index, df_density, df_states = load_base_frames(cfg)
+
+    stages = sampling_stages(cfg)
+    with profiler.stage("fingerprint"):
+        key = checkpoints.fingerprint(
+            checkpoints.source_fingerprint(*STAGE_PACKAGES), df_restaurant, df_menu_raw, df_index, df_density, df_states
+        )
+        keys = []
+        for stage in stages:
+            key = checkpoints.fingerprint(key, stage.name, stage.params)
+            keys.append(key)
+
+    lookups = {"index": df_index, "states_name_dict": processing.load_states_name_dict(df_states)}
+    frames: Frames = {"restaurant": df_restaurant, "menu_raw": df_menu_raw, "density": df_density}
+    del df_restaurant, df_menu_raw, df_index, df_density, df_states
+
+    # resume after the last stage with a valid checkpoint
+    start = 0
+    if store.root is not None and not force:
+        hits = [i for i, stage in enumerate(stages) if stage.checkpoint and store.exists(stage.name, keys[i])]
+        if hits:
+            start = hits[-1] + 1
+            stage = stages[hits[-1]]
+            with profiler.stage(stage.name) as stats:
+                frames = store.load(stage.name, keys[hits[-1]])
+                stats.cached = True
+                stats.rows = len(next(iter(frames.values())))
+            gc.collect()
+            logger.info("Resuming after checkpoint '{}' (skipped: {})", stage.name, [s.name for s in stages[:start]])
+
+    for stage, stage_key in zip(stages[start:], keys[start:], strict=True):
+        with profiler.stage(stage.name) as stats:
+            frames = stage.run(frames, cfg, lookups)
+            gc.collect()
+            stats.rows = len(next(iter(frames.values())))
+        if stage.checkpoint:
+            store.save(stage.name, stage_key, frames)
+
+    df_sampled = frames["sample"]
 
     # Persist
-    df_sampled.to_csv(cfg.FINAL_SAMPLED_DATA_PATH, index=False)
-    logger.success("Wrote {} rows -> {}", len(df_sampled), cfg.FINAL_SAMPLED_DATA_PATH)
+    with profiler.stage("persist"):
+        io.write_training_sample(df_sampled, cfg.FINAL_SAMPLED_DATA_PATH, export_csv=cfg.export_csv)
+    logger.success("Wrote {} rows -> {}", len(df_sampled), io.typed_sample_path(cfg.FINAL_SAMPLED_DATA_PATH))
+    profiler.log_summary()
     return df_sampled
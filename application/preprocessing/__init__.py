@@ -1,5 +1,5 @@
 from .schema import ModelSchema, schema
-from .transformers import build_preprocessor
+from .transformers import DEFAULT_TEXT_COMPONENTS, FEATURE_ENCODINGS, TEXT_FEATURIZERS, build_preprocessor
 
 # convenient module-level constants (pulled from schema)
 NUMERIC_COLS = list(schema.numeric)
@@ -10,6 +10,9 @@ DATA_SPLIT_COL = schema.data_split_col
 
 __all__ = [
     "build_preprocessor",
+    "TEXT_FEATURIZERS",
+    "FEATURE_ENCODINGS",
+    "DEFAULT_TEXT_COMPONENTS",
     "ModelSchema",
     "schema",
     "NUMERIC_COLS",
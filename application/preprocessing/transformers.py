@@ -1,38 +1,112 @@
+import numpy as np
 from sklearn.compose import ColumnTransformer
-from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
 from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder, OrdinalEncoder
+
+from core import settings
+from menu_transformers import ColumnPicker, identity
 
 from .schema import schema
 
+# "tfidf": fitted vocabulary of phrases/bigrams (min_df=2); "hashing": stateless feature hashing of the same terms
+TEXT_FEATURIZERS = ("tfidf", "hashing")
+DEFAULT_HASH_FEATURES = 2**18
+# "onehot": wide sparse matrix (linear models, forests); "ordinal": narrow dense one (histogram GBDTs)
+FEATURE_ENCODINGS = ("onehot", "ordinal")
+DEFAULT_TEXT_COMPONENTS = 32
+# HistGradientBoostingRegressor bins a categorical feature per value, at most 255 of them;
+# rarer values share one code
+MAX_ORDINAL_CATEGORIES = 255
 
-def build_preprocessor() -> ColumnTransformer:
-    num_tf = Pipeline([("scaler", MinMaxScaler())])
-    cat_tf = Pipeline([("onehot", OneHotEncoder(handle_unknown="ignore"))])
+
+def _text_vectorizer(text_features: str, n_features: int, use_idf: bool) -> list[tuple]:
+    """Vectorizer step(s) over the list of ingredient phrases of each row."""
+    phrase_terms = dict(
+        analyzer="word",
+        # rows are already lists of phrases; `menu_transformers` is bundled with the logged model (code_paths),
+        # so the pipeline unpickles and serves without this repository installed
+        tokenizer=identity,
+        preprocessor=identity,
+        token_pattern=None,  # required when you provide your own tokenizer
+        lowercase=False,  # optional: keep original casing if important
+        ngram_range=(1, 2),  # unigrams + bigrams
+    )
+    if text_features == "tfidf":
+        return [("tfidf", TfidfVectorizer(**phrase_terms, min_df=2))]  # ignore very rare phrases
+    if text_features == "hashing":
+        # no vocabulary: transforms in any chunk/worker without fitting, fixed size in memory and on disk;
+        # rare phrases are kept (there is no min_df) and may collide, which n_features bounds
+        hashing = HashingVectorizer(
+            **phrase_terms, n_features=n_features, alternate_sign=False, norm=None if use_idf else "l2"
+        )
+        if not use_idf:
+            return [("hashing", hashing)]
+        # the only fitted state is one IDF weight per hashed column
+        return [("hashing", hashing), ("idf", TfidfTransformer())]
+    raise ValueError(f"Unknown text featurizer {text_features!r}; expected one of {TEXT_FEATURIZERS}")
+
+
+def _build_ordinal_preprocessor(text_tf: Pipeline, text_components: int) -> ColumnTransformer:
+    """Ordinal-coded categorical, raw numeric and SVD-projected ingredient features, all dense."""
+    cat_tf = Pipeline(
+        [
+            (
+                "ordinal",
+                OrdinalEncoder(
+                    handle_unknown="use_encoded_value",
+                    unknown_value=np.nan,  # unseen categories go where missing ones do
+                    max_categories=MAX_ORDINAL_CATEGORIES,
+                ),
+            )
+        ]
+    )
+    text_tf.steps.append(("svd", TruncatedSVD(n_components=text_components, random_state=settings.SEED)))
+    return ColumnTransformer(
+        [
+            # first: the codes are columns 0 .. len(schema.categorical) - 1 of the output
+            ("cat", cat_tf, list(schema.categorical)),
+            ("num", "passthrough", list(schema.numeric)),  # tree splits do not depend on the scale
+            ("text", text_tf, list(schema.text)),
+        ],
+        sparse_threshold=0.0,
+        n_jobs=-1,
+    )
+
+
+def build_preprocessor(
+    text_features: str = "tfidf",
+    n_features: int = DEFAULT_HASH_FEATURES,
+    use_idf: bool = True,
+    encoding: str = "onehot",
+    text_components: int = DEFAULT_TEXT_COMPONENTS,
+) -> ColumnTransformer:
+    """
+    Scaled numeric, one-hot categorical and vectorized ingredient features.
+
+    ``text_features`` selects the ingredient featurizer (see ``TEXT_FEATURIZERS``). ``n_features`` and ``use_idf``
+    only apply to ``"hashing"``: the number of hashed columns and whether to reweight them by IDF (as TF-IDF does).
+
+    ``encoding="ordinal"`` builds the narrow variant for histogram gradient boosting instead: the categorical
+    columns first, as integer codes (``MAX_ORDINAL_CATEGORIES`` at most; unseen and missing values are NaN), that
+    estimators can split on natively; the numeric columns as they are; and the vectorized ingredients projected
+    onto ``text_components`` dense SVD components.
+    """
+    if encoding not in FEATURE_ENCODINGS:
+        raise ValueError(f"Unknown feature encoding {encoding!r}; expected one of {FEATURE_ENCODINGS}")
     text_tf = Pipeline(
         [
             # Always return a Series (1 row => length-1 Series), no squeeze()
             # best approach: preserve list-of-phrases as-is, no join (e.g., "chopped onions" stays intact)
-            ("pick_col", FunctionTransformer(lambda x: x.iloc[:, 0], validate=False)),
-            (
-                "tfidf",
-                TfidfVectorizer(
-                    analyzer="word",
-                    # Inline identity functions (avoid external imports like a dummy function)
-                    # Example:
-                    #     def dummy(doc): return doc
-                    # This avoids external module dependencies (e.g., `application.text`)
-                    # and ensures the model can be unpickled and served without missing imports.
-                    tokenizer=lambda x: x,
-                    preprocessor=lambda x: x,
-                    token_pattern=None,  # required when you provide your own tokenizer
-                    lowercase=False,  # optional: keep original casing if important
-                    ngram_range=(1, 2),  # unigrams + bigrams
-                    min_df=2,  # ignore very rare phrases
-                ),
-            ),
+            ("pick_col", ColumnPicker(0)),
+            *_text_vectorizer(text_features, n_features, use_idf),
         ]
     )
+    if encoding == "ordinal":
+        return _build_ordinal_preprocessor(text_tf, text_components)
+    num_tf = Pipeline([("scaler", MinMaxScaler())])
+    cat_tf = Pipeline([("onehot", OneHotEncoder(handle_unknown="ignore"))])
     return ColumnTransformer(
         [
             ("num", num_tf, list(schema.numeric)),
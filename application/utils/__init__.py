@@ -1,3 +1,3 @@
-from . import misc
+from . import misc, profiling, shared_data
 
-__all__ = ["misc"]
+__all__ = ["misc", "profiling", "shared_data"]
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+from loguru import logger
+
+try:
+    import psutil  # type: ignore
+except ImportError:  # pragma: no cover - psutil ships transitively, but stay optional
+    psutil = None  # type: ignore
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+
+def current_rss_mb() -> float | None:
+    """Return the resident set size of this process in MiB (None if it cannot be measured)."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    return None
+
+
+def max_rss_mb() -> float | None:
+    """Return the process-lifetime peak RSS in MiB (None if it cannot be measured)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux
+    return peak / 2**20 if sys.platform == "darwin" else peak / 2**10
+
+
+@dataclass
+class StageStats:
+    """Wall time and memory footprint of one pipeline stage."""
+
+    name: str
+    seconds: float
+    rss_mb: float | None
+    peak_rss_mb: float | None
+    rows: int | None = None
+    cached: bool = False  # output was loaded from a checkpoint instead of computed
+
+
+class _PeakSampler(threading.Thread):
+    """Background thread that polls RSS and keeps the maximum seen."""
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak = current_rss_mb() or 0.0
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, current_rss_mb() or 0.0)
+
+    def stop(self) -> float:
+        self._stop_event.set()
+        self.join()
+        return max(self.peak, current_rss_mb() or 0.0)
+
+
+class StageProfiler:
+    """
+    Collect per-stage wall time and peak RSS for a pipeline run.
+
+    Usage:
+        profiler = StageProfiler()
+        with profiler.stage("preprocess_menu") as stats:
+            df = preprocess_menu(df_raw)
+            stats.rows = len(df)
+        profiler.log_summary()
+
+    Peak RSS is sampled by a background thread when psutil is available; otherwise it falls back
+    to the process-lifetime high-water mark reported by the OS.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.stages: list[StageStats] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[StageStats]:
+        stats = StageStats(name=name, seconds=0.0, rss_mb=None, peak_rss_mb=None)
+        sampler = _PeakSampler(self.interval) if psutil is not None else None
+        if sampler is not None:
+            sampler.start()
+        t0 = time.perf_counter()
+        try:
+            yield stats
+        finally:
+            stats.seconds = time.perf_counter() - t0
+            stats.peak_rss_mb = sampler.stop() if sampler is not None else max_rss_mb()
+            stats.rss_mb = current_rss_mb()
+            self.stages.append(stats)
+            logger.info(
+                "Stage '{}' {} in {:.2f}s (rss={} MiB, peak={} MiB{})",
+                name,
+                "loaded from checkpoint" if stats.cached else "done",
+                stats.seconds,
+                _fmt_mb(stats.rss_mb),
+                _fmt_mb(stats.peak_rss_mb),
+                f", rows={stats.rows:,}" if stats.rows is not None else "",
+            )
+
+    def log_summary(self) -> None:
+        """Log one line per stage, plus the total wall time."""
+        if not self.stages:
+            return
+        lines = [
+            f"  {s.name:<24} {s.seconds:>9.2f}s  rss={_fmt_mb(s.rss_mb):>8}  peak={_fmt_mb(s.peak_rss_mb):>8}"
+            + ("  (cache hit)" if s.cached else "")
+            for s in self.stages
+        ]
+        total = sum(s.seconds for s in self.stages)
+        hits = sum(s.cached for s in self.stages)
+        logger.info("Stage summary (total {:.2f}s, {} cache hit(s)):\n{}", total, hits, "\n".join(lines))
+
+
+def _process_tree_cpu_seconds() -> dict[int, float]:
+    """User+system CPU seconds of this process (incl. reaped children) and each live descendant, by pid."""
+    proc = psutil.Process()
+    times = proc.cpu_times()
+    usage = {proc.pid: times.user + times.system + times.children_user + times.children_system}
+    for child in proc.children(recursive=True):
+        try:
+            child_times = child.cpu_times()
+        except psutil.Error:  # exited in between
+            continue
+        usage[child.pid] = child_times.user + child_times.system
+    return usage
+
+
+@dataclass
+class CpuUsage:
+    """CPU time of this process tree (e.g. joblib/loky workers included) over a wall-clock interval."""
+
+    cores: int
+    seconds: float = 0.0
+    cpu_seconds: float | None = None
+
+    @property
+    def utilization(self) -> float | None:
+        """Fraction of the ``cores`` budget kept busy (1.0 = every core for the whole interval)."""
+        if self.cpu_seconds is None or self.seconds <= 0:
+            return None
+        return self.cpu_seconds / (self.seconds * self.cores)
+
+
+@contextmanager
+def cpu_usage(cores: int) -> Iterator[CpuUsage]:
+    """
+    Measure the CPU time spent by this process and its workers against a budget of ``cores``.
+
+    Workers that exit inside the interval are only counted once reaped; without psutil only wall time is recorded.
+    """
+    usage = CpuUsage(cores=cores)
+    before = _process_tree_cpu_seconds() if psutil is not None else None
+    t0 = time.perf_counter()
+    try:
+        yield usage
+    finally:
+        usage.seconds = time.perf_counter() - t0
+        if before is not None:
+            after = _process_tree_cpu_seconds()
+            usage.cpu_seconds = sum(cpu - before.get(pid, 0.0) for pid, cpu in after.items())
+
+
+def _fmt_mb(value: float | None) -> str:
+    return "n/a" if value is None else f"{value:,.0f}"
@@ -0,0 +1,111 @@
+"""
+Training data shared with joblib workers through a memory-mapped Arrow file.
+
+``cross_val_score(..., n_jobs=-1)`` pickles ``X`` into every fold task, and every Optuna trial runs a new
+``cross_val_score``: a training frame with Python ingredient lists is serialized n_folds times per trial. A
+``SharedFrame`` pickles as the path of an Arrow IPC file written once (to ``/dev/shm`` when available) instead.
+
+This is one deserialization per worker process, not zero-copy sharing: a worker memory-maps the file and builds
+the frame once, and later tasks in the same (reused) loky worker get that cached frame. Numeric columns without
+missing values are views of the mapped file; string and ingredient-list columns are rebuilt as Python objects,
+a private copy per process. (The preprocessed feature matrices, which are shared without a copy, are the fold
+cache's: ``model.feature_cache``.) Row selections (``iloc``/``take``, as sklearn's fold indexing does) are plain
+DataFrames.
+
+This module only depends on pandas/pyarrow, so attaching in a worker does not import the rest of the application.
+"""
+
+from __future__ import annotations
+
+import os
+import tempfile
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+from loguru import logger
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None  # type: ignore
+
+SHARED_MEMORY_DIR = "/dev/shm"
+
+# per process: path -> frame built from the memory-mapped file (entries of removed files are evicted)
+_ATTACHED: dict[str, pd.DataFrame] = {}
+
+
+class SharedFrame(pd.DataFrame):
+    """
+    DataFrame backed by a shared Arrow file that pickles as the file's path.
+
+    Treat it as read-only: every task of a worker process sees the same cached frame. Derived frames (slices,
+    copies, column selections) are plain DataFrames and pickle as usual.
+    """
+
+    _metadata = ["shared_path"]
+
+    @property
+    def _constructor(self):
+        return pd.DataFrame
+
+    def __reduce__(self):
+        return attach_shared_frame, (self.shared_path,)
+
+
+def _frame_from_table(table: pa.Table) -> pd.DataFrame:
+    # split_blocks: numeric columns stay zero-copy views of the mapped buffers instead of being consolidated
+    df = table.to_pandas(split_blocks=True)
+    for name, dtype in zip(table.column_names, table.schema.types, strict=True):
+        if pa.types.is_list(dtype) and name in df.columns:
+            # to_pandas yields numpy arrays; lists are what the original frame (and the TF-IDF step) uses
+            df[name] = [values.tolist() if values is not None else None for values in df[name]]
+    return df
+
+
+def attach_shared_frame(path: str) -> SharedFrame:
+    """The frame of a shared file, built once per process."""
+    # reused workers outlive a run: drop the frames of files their owner has already removed
+    for stale in [p for p in _ATTACHED if p != path and not os.path.exists(p)]:
+        del _ATTACHED[stale]
+    df = _ATTACHED.get(path)
+    if df is None:
+        with pa.memory_map(path) as source:
+            df = _frame_from_table(pa.ipc.open_file(source).read_all())
+        _ATTACHED[path] = df
+    shared = SharedFrame(df, copy=False)
+    shared.shared_path = path
+    return shared
+
+
+def shared_dir(folder: str | os.PathLike | None = None) -> Path:
+    """``folder``, or shared memory (``/dev/shm``) where available, or the temp directory."""
+    if folder is not None:
+        return Path(folder)
+    return Path(SHARED_MEMORY_DIR if os.path.isdir(SHARED_MEMORY_DIR) else tempfile.gettempdir())
+
+
+@contextmanager
+def shared_frame(df: pd.DataFrame, folder: str | os.PathLike | None = None) -> Iterator[pd.DataFrame]:
+    """
+    Write ``df`` once as a shared Arrow file and yield it as a ``SharedFrame``; the file is removed on exit.
+
+    Column types and the index are kept. Without pyarrow the frame is yielded unchanged.
+    """
+    if pa is None:
+        logger.warning("pyarrow is not installed; training data is pickled to every worker")
+        yield df
+        return
+    path = shared_dir(folder) / f"shared-frame-{uuid.uuid4().hex}.arrow"
+    table = pa.Table.from_pandas(df)
+    with pa.OSFile(str(path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    logger.info(f"Shared {len(df)} training rows through {path} ({path.stat().st_size / 2**20:.1f} MiB)")
+    try:
+        yield attach_shared_frame(str(path))
+    finally:
+        _ATTACHED.pop(str(path), None)
+        path.unlink(missing_ok=True)
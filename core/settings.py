@@ -72,6 +72,13 @@ class Settings(BaseSettings):
     STATES_DS: str | None = None
     STATES_FILE: str | None = None
 
+    # local typed (Parquet) cache of the Kaggle source files, keyed by dataset handle and version
+    DATASET_CACHE_DIR: str | None = "data/cache"
+    # checkpoints of the training-sample stages, keyed by content hash of inputs and config
+    SAMPLING_CHECKPOINT_DIR: str | None = "data/checkpoints"
+    # manifest and NER cache of the last training-sample build, for incremental refreshes
+    SAMPLE_STATE_DIR: str | None = "data/sample-state"
+
     # artifacts directory
     ARTIFACT_DIR: str | None = None
 
@@ -85,6 +92,14 @@ class Settings(BaseSettings):
     N_TRIALS: int | None = None
     CV_FOLDS: int | None = None
     SCORING: str | None = None
+    # total cores the parallelism planner splits across trials, CV folds and estimators (None = all usable CPUs)
+    TRAINING_CORES: int | None = None
+    # tuning worker processes per model; they share the Optuna study through OPTUNA_STORAGE
+    HPO_WORKERS: int = 1
+    # shared Optuna storage: RDB URL (sqlite:///optuna.db, postgresql://...) or journal file (journal:<path>)
+    OPTUNA_STORAGE: str | None = None
+    # study name prefix ("<prefix>-<model>"): workers on other machines join the studies of the same prefix
+    OPTUNA_STUDY_NAME: str | None = None
 
     # batch size for inference time during training/tuning
     # configurable; controls timing sample size
@@ -0,0 +1,51 @@
+"""
+Picklable building blocks of the training preprocessor.
+
+``build_preprocessor`` used to inline lambdas (column pick, identity tokenizer). Lambdas cannot be pickled by
+reference, which ties every saved pipeline to cloudpickle. These replacements are importable by name, so
+fitted pipelines pickle with the standard ``pickle``, hash with ``joblib.hash`` and ship to process-based workers.
+
+This package only depends on scikit-learn and pandas and imports nothing from the application. Every logged model
+bundles it through MLflow ``code_paths`` (see ``CODE_PATH``), so serving can unpickle the pipeline without
+installing this repository.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# directory to pass to MLflow ``code_paths`` so the package is importable wherever the model is loaded
+CODE_PATH = str(Path(__file__).resolve().parent)
+
+
+def identity(doc):
+    """Tokenizer/preprocessor of already tokenized documents (lists of ingredient phrases)."""
+    return doc
+
+
+class ColumnPicker(TransformerMixin, BaseEstimator):
+    """
+    Select one column of a DataFrame as a Series (a 1-row frame gives a length-1 Series, no ``squeeze()``).
+
+    ``column`` is a position (``iloc``) when it is an int, a label otherwise. Stateless: ``fit`` learns nothing.
+    """
+
+    def __init__(self, column: int | str = 0):
+        self.column = column
+
+    def fit(self, X: pd.DataFrame, y=None) -> ColumnPicker:
+        return self
+
+    def transform(self, X: pd.DataFrame) -> pd.Series:
+        if isinstance(self.column, int):
+            return X.iloc[:, self.column]
+        return X[self.column]
+
+    def __sklearn_is_fitted__(self) -> bool:
+        return True
+
+
+__all__ = ["CODE_PATH", "ColumnPicker", "identity"]
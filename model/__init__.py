@@ -1,6 +1,9 @@
 from model.registry import REGISTRY, get_model_spec
 
 from .evaluation import evaluate_model
+from .feature_cache import FoldFeatureCache
+from .parallelism import ParallelPlan, plan_parallelism
+from .study import optimize_study
 from .train import train_and_compare
 from .tune import tune_model
 
@@ -8,6 +11,10 @@ __all__ = [
     "train_and_compare",
     "tune_model",
     "evaluate_model",
+    "FoldFeatureCache",
+    "ParallelPlan",
+    "plan_parallelism",
+    "optimize_study",
     "get_model_spec",
     "REGISTRY",
 ]
@@ -1,24 +1,105 @@
+from collections.abc import Callable, Iterator
+
 import numpy as np
 import pandas as pd
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import get_scorer
 from sklearn.model_selection import KFold, cross_val_score
 from sklearn.pipeline import Pipeline
 
 from core.settings import settings
 
+from .feature_cache import FoldFeatureCache
+from .parallelism import ParallelPlan
+
+# fit params of (a clone of) the model step, given the fold's preprocessed validation matrix and target
+EvalFitParams = Callable[[BaseEstimator, object, np.ndarray], dict]
+
 
-def evaluate_model(n_folds: int, model: Pipeline, X: pd.DataFrame, y: pd.Series, scoring_criterion: str) -> np.ndarray:
+def evaluate_model(
+    n_folds: int,
+    model: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    scoring_criterion: str,
+    feature_cache: FoldFeatureCache | None = None,
+    parallel_plan: ParallelPlan | None = None,
+) -> np.ndarray:
     # TODO: Add support for additional scoring options
     # https://mlflow.org/docs/3.1.3/ml/evaluation/model-eval/#best-practices-and-optimization
     # https://scikit-learn.org/stable/modules/model_evaluation.html#scoring-parameter
-    """Evaluate a model using K-Fold cross-validation and return the scores."""
-    kf = KFold(n_splits=n_folds, shuffle=True, random_state=settings.SEED)
-    scores = cross_val_score(
-        model,
-        X,
-        y,
-        scoring=scoring_criterion,
-        cv=kf,
-        n_jobs=-1,
-        error_score="raise",
+    """
+    Evaluate a model using K-Fold cross-validation and return the scores.
+
+    With a ``feature_cache`` over ``X``, the preprocessed fold matrices are reused and only the model step is fitted.
+    ``parallel_plan`` sets the fold workers (and their backend over cached features); default: one per core.
+    """
+    batches = iter_fold_scores(
+        n_folds, model, X, y, scoring_criterion, feature_cache, parallel_plan, batch_size=n_folds
     )
-    return scores
+    return np.concatenate(list(batches))
+
+
+def _fold_matrices(model: Pipeline, X: pd.DataFrame, y: pd.Series, train_idx, val_idx) -> tuple:
+    preprocessor = clone(model.named_steps["preprocessor"])
+    y_train, y_val = y.iloc[train_idx].to_numpy(), y.iloc[val_idx].to_numpy()
+    X_train = preprocessor.fit_transform(X.iloc[train_idx], y_train)
+    return X_train, y_train, preprocessor.transform(X.iloc[val_idx]), y_val
+
+
+def iter_fold_scores(
+    n_folds: int,
+    model: Pipeline,
+    X: pd.DataFrame,
+    y: pd.Series,
+    scoring_criterion: str,
+    feature_cache: FoldFeatureCache | None = None,
+    parallel_plan: ParallelPlan | None = None,
+    batch_size: int | None = None,
+    first_fold_fit_params: EvalFitParams | None = None,
+) -> Iterator[np.ndarray]:
+    """
+    ``evaluate_model`` fold by fold: yields the scores of ``batch_size`` folds at a time (default: the planned
+    fold workers, so each batch keeps them all busy), in fold order.
+
+    Stopping the iteration skips the remaining folds, which is how a pruned trial stops early.
+
+    ``first_fold_fit_params`` fits the first fold on its own with extra fit params of the model step (e.g. an
+    ``eval_set`` and callbacks that watch it) built from the estimator and that fold's validation data;
+    ``model`` must then be a ``preprocessor``/``model`` pipeline.
+    """
+    n_jobs = parallel_plan.fold_jobs if parallel_plan is not None else -1
+    batch_size = batch_size or (parallel_plan.fold_jobs if parallel_plan is not None else n_folds)
+    cached = feature_cache is not None and feature_cache.applies_to(model, X)
+    splits = list(KFold(n_splits=n_folds, shuffle=True, random_state=settings.SEED).split(X))
+
+    start = 0
+    if first_fold_fit_params is not None:
+        if cached:
+            X_train, y_train, X_val, y_val = feature_cache.folds(model.named_steps["preprocessor"], n_folds)[0]
+        else:
+            X_train, y_train, X_val, y_val = _fold_matrices(model, X, y, *splits[0])
+        estimator = clone(model.named_steps["model"])
+        if parallel_plan is not None:
+            parallel_plan.configure(estimator, refit=True)  # a lone fold may use the threads of all of them
+        estimator.fit(X_train, y_train, **first_fold_fit_params(estimator, X_val, y_val))
+        yield np.asarray([get_scorer(scoring_criterion)(estimator, X_val, y_val)], dtype=float)
+        start = 1
+
+    backend = parallel_plan.fold_backend if parallel_plan is not None else None
+    for first in range(start, n_folds, batch_size):
+        folds = range(first, min(first + batch_size, n_folds))
+        if cached:
+            yield feature_cache.cross_val_score(
+                model, n_folds, scoring_criterion, n_jobs=n_jobs, backend=backend, folds=folds
+            )
+        else:
+            yield cross_val_score(
+                model,
+                X,
+                y,
+                scoring=scoring_criterion,
+                cv=[splits[i] for i in folds],
+                n_jobs=n_jobs,
+                error_score="raise",
+            )
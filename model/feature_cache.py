@@ -0,0 +1,204 @@
+"""
+Fold-aware cache of the preprocessed feature matrices.
+
+The preprocessor (scaler, one-hot encoder, bigram TF-IDF) has no hyperparameters, so within one tuning run its
+output for a given CV fold is the same for every trial and every model. ``FoldFeatureCache`` fits a clone of it
+once per fold (and once on the full training set) and keeps the transformed train/validation matrices;
+``evaluate_model`` and the trial/final fits reuse them, so only the model step is fitted per trial.
+
+The matrices are dumped once to shared memory and memory-mapped, so joblib passes them to the fold workers by
+reference instead of pickling them for every trial (or, on the threading backend, shares them outright).
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from collections.abc import Sequence
+
+import joblib
+import numpy as np
+import pandas as pd
+from joblib import Parallel, delayed
+from loguru import logger
+from sklearn.base import BaseEstimator, clone
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold
+from sklearn.pipeline import Pipeline
+
+from application.utils.shared_data import shared_dir
+from core.settings import settings
+
+
+def _fit_fold(preprocessor, X, y, train_idx, val_idx, path: str) -> str:
+    y_train, y_val = y.iloc[train_idx].to_numpy(), y.iloc[val_idx].to_numpy()
+    X_train = preprocessor.fit_transform(X.iloc[train_idx], y_train)
+    X_val = preprocessor.transform(X.iloc[val_idx])
+    joblib.dump((X_train, y_train, X_val, y_val), path)
+    return path
+
+
+def _fit_and_score(estimator, X_train, y_train, X_val, y_val, scorer) -> float:
+    estimator.fit(X_train, y_train)
+    return scorer(estimator, X_val, y_val)
+
+
+def preprocessor_key(preprocessor: BaseEstimator) -> str:
+    """
+    Cache key of a preprocessor configuration: the hash of its unfitted clone, ``n_jobs`` aside.
+
+    Preprocessors that cannot be pickled (e.g. built from lambdas) are keyed by identity instead.
+    """
+    unfitted = clone(preprocessor)
+    if "n_jobs" in unfitted.get_params(deep=False):
+        unfitted.set_params(n_jobs=None)  # the parallelism plan does not change the output
+    try:
+        return joblib.hash(unfitted)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return f"id-{id(preprocessor)}"
+
+
+class FoldFeatureCache:
+    """
+    Preprocessed CV folds of one training set, keyed by preprocessor configuration and number of folds.
+
+    Folds are the ``KFold(n_folds, shuffle=True, random_state=SEED)`` splits ``evaluate_model`` uses, so the
+    scores equal those of ``cross_val_score`` on the full pipeline. ``n_jobs`` folds are preprocessed at once,
+    each in a worker that writes its matrices straight to the shared folder. Pipelines must name their steps
+    ``preprocessor`` and ``model``, as ``tune_model`` and ``train_and_compare`` do.
+
+    Usage:
+        with FoldFeatureCache(X_train, y_train) as feature_cache:
+            tune_model(..., feature_cache=feature_cache)
+    """
+
+    def __init__(self, X: pd.DataFrame, y: pd.Series, folder: str | os.PathLike | None = None, n_jobs: int = 1):
+        self.X = X
+        self.y = y
+        self.n_jobs = n_jobs
+        self._folder = folder
+        self._dir: str | None = None
+        self._folds: dict[tuple[str, int], list[tuple]] = {}
+        self._full: dict[str, tuple[BaseEstimator, object]] = {}
+        self._full_seconds: dict[str, float] = {}
+
+    def __enter__(self) -> FoldFeatureCache:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Drop the cached matrices and their shared-memory files."""
+        self._folds.clear()
+        self._full.clear()
+        self._full_seconds.clear()
+        if self._dir is not None:
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+
+    def applies_to(self, model: BaseEstimator, X: pd.DataFrame) -> bool:
+        """Whether ``model`` is a ``preprocessor``/``model`` pipeline and ``X`` this cache's training set."""
+        return isinstance(model, Pipeline) and "preprocessor" in model.named_steps and X is self.X
+
+    def _ensure_dir(self) -> None:
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix="feature-cache-", dir=shared_dir(self._folder))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self._dir, f"{name}.joblib")
+
+    def folds(self, preprocessor: BaseEstimator, n_folds: int) -> list[tuple]:
+        """``(X_train, y_train, X_val, y_val)`` matrices of every fold, computed on first use."""
+        key = (preprocessor_key(preprocessor), n_folds)
+        if key not in self._folds:
+            self._ensure_dir()
+            fold_pre = clone(preprocessor)
+            if self.n_jobs != 1 and "n_jobs" in fold_pre.get_params(deep=False):
+                fold_pre.set_params(n_jobs=1)  # the folds already run side by side
+            kf = KFold(n_splits=n_folds, shuffle=True, random_state=settings.SEED)
+            paths = Parallel(n_jobs=min(self.n_jobs, n_folds))(
+                delayed(_fit_fold)(
+                    clone(fold_pre), self.X, self.y, train_idx, val_idx, self._path(f"{len(self._folds)}-{i}")
+                )
+                for i, (train_idx, val_idx) in enumerate(kf.split(self.X))
+            )
+            # memory-mapped: joblib hands memmaps to its workers as file references
+            self._folds[key] = [joblib.load(path, mmap_mode="r") for path in paths]
+            logger.info(f"Cached preprocessed features of {n_folds} CV folds ({len(self.X)} rows)")
+        return self._folds[key]
+
+    def cross_val_score(
+        self,
+        pipeline: Pipeline,
+        n_folds: int,
+        scoring: str,
+        n_jobs: int = -1,
+        backend: str | None = None,
+        folds: Sequence[int] | None = None,
+    ) -> np.ndarray:
+        """
+        ``cross_val_score`` of ``pipeline``, fitting only its ``model`` step per fold.
+
+        ``backend="threading"`` suits estimators that release the GIL: the folds share the memory-mapped matrices
+        without any worker process. ``folds`` restricts the scores to those fold indices (default: all).
+        """
+        scorer = get_scorer(scoring)
+        estimator = pipeline.named_steps["model"]
+        matrices = self.folds(pipeline.named_steps["preprocessor"], n_folds)
+        selected = [matrices[i] for i in folds] if folds is not None else matrices
+        scores = Parallel(n_jobs=n_jobs, backend=backend)(
+            delayed(_fit_and_score)(clone(estimator), *fold, scorer) for fold in selected
+        )
+        return np.asarray(scores, dtype=float)
+
+    def full(self, preprocessor: BaseEstimator) -> tuple[BaseEstimator, object]:
+        """The preprocessor fitted on the full training set and its (memory-mapped) output, computed on first use."""
+        key = preprocessor_key(preprocessor)
+        if key not in self._full:
+            self._ensure_dir()
+            fitted = clone(preprocessor)
+            path = self._path(f"full-{len(self._full)}")
+            t0 = time.perf_counter()
+            X_t = fitted.fit_transform(self.X, self.y)
+            self._full_seconds[key] = time.perf_counter() - t0
+            joblib.dump(X_t, path)
+            self._full[key] = fitted, joblib.load(path, mmap_mode="r")
+        return self._full[key]
+
+    def preprocess_seconds(self, preprocessor: BaseEstimator) -> float:
+        """How long fitting ``preprocessor`` on the full training set took in ``full`` (0.0 before that)."""
+        return self._full_seconds.get(preprocessor_key(preprocessor), 0.0)
+
+    def warm(self, preprocessor: BaseEstimator, n_folds: int) -> None:
+        """
+        Compute the folds and full-training-set features of ``preprocessor`` now.
+
+        Call it before handing the cache to worker processes: each gets a copy of the cache, and what the copies
+        compute is not shared back.
+        """
+        self.folds(preprocessor, n_folds)
+        self.full(preprocessor)
+
+    def fit(self, pipeline: Pipeline) -> Pipeline:
+        """
+        ``pipeline.fit(X, y)`` with the preprocessor fitted once on the full training set per configuration.
+
+        Returns a pipeline of that (shared, fitted) preprocessor and the fitted ``model`` step of ``pipeline``.
+        """
+        fitted, X_t = self.full(pipeline.named_steps["preprocessor"])
+        estimator = pipeline.named_steps["model"]
+        estimator.fit(X_t, self.y.to_numpy())
+        return Pipeline([("preprocessor", fitted), ("model", estimator)])
+
+
+def fit_pipeline(
+    pipeline: Pipeline, X: pd.DataFrame, y: pd.Series, feature_cache: FoldFeatureCache | None = None
+) -> Pipeline:
+    """Fit ``pipeline`` on ``X``/``y``, reusing the cached full-training-set features when the cache applies."""
+    if feature_cache is not None and feature_cache.applies_to(pipeline, X):
+        return feature_cache.fit(pipeline)
+    return pipeline.fit(X, y)
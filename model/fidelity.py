@@ -0,0 +1,70 @@
+"""
+Multi-fidelity tuning: trials are scored on growing subsamples of the training rows.
+
+A fidelity schedule such as ``(0.1, 0.3, 1.0)`` scores every trial with CV on 10% of the training rows first,
+then 30%, then all of them. After each rung the trial reports its score to the Optuna pruner (step = rung
+number), so only the survivors pay for the larger fractions. The subsamples are:
+
+- stratified: every stratum (the split column, e.g. ``category``, or else deciles of the target) keeps its share;
+- nested: each subsample contains the smaller ones, so a trial's rungs add rows rather than swap them;
+- the same for every trial (seeded), so trials are compared on the same rows at each rung.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import numpy as np
+import pandas as pd
+
+from application.preprocessing import DATA_SPLIT_COL
+from core.settings import settings
+
+
+def fidelity_schedule(fidelities: Sequence[float]) -> tuple[float, ...]:
+    """
+    Validate a fidelity schedule: increasing fractions of the training rows in (0, 1], ending at 1 (the trial's
+    value is its CV score on all rows).
+    """
+    schedule = tuple(float(f) for f in fidelities)
+    if not schedule or schedule[-1] != 1.0:
+        raise ValueError(f"The fidelity schedule must end at 1.0 (all training rows), got {schedule}")
+    if any(not 0.0 < f <= 1.0 for f in schedule) or any(a >= b for a, b in zip(schedule, schedule[1:], strict=False)):
+        raise ValueError(f"The fidelity schedule must be increasing fractions in (0, 1], got {schedule}")
+    return schedule
+
+
+def fidelity_strata(X: pd.DataFrame, y: pd.Series, n_bins: int = 10) -> np.ndarray:
+    """Stratum of every training row: its split column (``DATA_SPLIT_COL``) if present, else its target decile."""
+    if DATA_SPLIT_COL in X.columns:
+        strata = X[DATA_SPLIT_COL]
+    else:
+        strata = pd.qcut(y, q=n_bins, labels=False, duplicates="drop")
+    return pd.factorize(pd.Series(strata).astype(str))[0]
+
+
+def fidelity_subsample(strata: np.ndarray, fraction: float, seed: int = settings.SEED) -> np.ndarray:
+    """
+    Sorted positions of a ``fraction`` of the rows, ``ceil(fraction * size)`` of every stratum.
+
+    Rows are drawn in one seeded random order per stratum, so a smaller fraction's rows are a subset of a larger
+    one's.
+    """
+    order = np.random.default_rng(seed).random(len(strata))
+    frame = pd.DataFrame({"stratum": strata, "order": order})
+    rank = frame.groupby("stratum")["order"].rank(method="first")
+    size = frame.groupby("stratum")["order"].transform("size")
+    keep = rank.to_numpy() <= np.ceil(fraction * size.to_numpy())
+    return np.flatnonzero(keep)
+
+
+def fidelity_subsamples(
+    X: pd.DataFrame, y: pd.Series, fidelities: Sequence[float], min_rows: int = 2
+) -> list[np.ndarray]:
+    """Row positions of each rung below full fidelity (see ``fidelity_subsample``)."""
+    strata = fidelity_strata(X, y)
+    subsamples = [fidelity_subsample(strata, f) for f in fidelities if f < 1.0]
+    for f, rows in zip(fidelities, subsamples, strict=False):
+        if len(rows) < min_rows:
+            raise ValueError(f"Fidelity {f:g} leaves {len(rows)} of {len(X)} training rows (at least {min_rows})")
+    return subsamples
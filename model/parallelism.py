@@ -0,0 +1,113 @@
+"""
+Parallelism planner for tuning and training.
+
+Every level of the training stack can parallelize on its own: Optuna trials, CV folds (``cross_val_score``),
+the ``ColumnTransformer`` blocks and the estimator (``n_jobs`` of XGBoost/LightGBM/random forest). Left at
+``n_jobs=-1`` everywhere, the levels nest: every fold worker starts a process pool for the preprocessor and
+an estimator with one thread per core, so the machine is oversubscribed many times over.
+
+``plan_parallelism`` splits one core budget (``settings.TRAINING_CORES``, default: the CPUs this process may
+use) across the levels instead:
+
+- trials get an equal share of the budget each;
+- folds run side by side within a trial's share;
+- estimators that release the GIL (``ModelSpec.threaded``) get the cores left per fold as threads, and their
+  folds run on a thread pool over the cached feature matrices: no worker processes, nothing pickled;
+- the preprocessor runs its blocks sequentially inside fold workers (the TF-IDF step holds the GIL, so only
+  processes would help, and those would nest).
+"""
+
+from __future__ import annotations
+
+import copy
+import os
+from dataclasses import asdict, dataclass
+
+from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+
+from core.settings import settings
+from model.registry import get_model_spec
+
+# blocks of the preprocessor (num, cat, text): more transformer jobs than this have nothing to run
+_PREPROCESSOR_BLOCKS = 3
+
+
+def available_cores() -> int:
+    """Cores this process may use (CPU affinity), capped by ``settings.TRAINING_CORES`` when set."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not available on macOS/Windows
+        cores = os.cpu_count() or 1
+    budget = settings.TRAINING_CORES
+    return max(1, min(cores, budget)) if budget else cores
+
+
+@dataclass(frozen=True)
+class ParallelPlan:
+    """Cores assigned to each level of one tuning/training run (all counts are >= 1)."""
+
+    cores: int  # total budget
+    trial_jobs: int  # concurrent Optuna trials
+    fold_jobs: int  # concurrent CV folds per trial
+    fold_backend: str  # joblib backend of the fold workers over cached features ("threading" or "loky")
+    transformer_jobs: int  # ColumnTransformer n_jobs
+    estimator_jobs: int  # estimator n_jobs while cross-validating
+    refit_jobs: int  # estimator n_jobs for the fits on the full training set
+
+    def configure(self, model: BaseEstimator, refit: bool = False) -> BaseEstimator:
+        """
+        Set the planned ``n_jobs`` on a ``preprocessor``/``model`` pipeline (or a bare estimator) in place.
+
+        The preprocessor is shared by the pipelines of every trial and model, so the pipeline gets a (shallow)
+        copy of it with the planned ``n_jobs`` instead: the caller's preprocessor is left as it is.
+        """
+        estimator = model
+        if isinstance(model, Pipeline):
+            preprocessor = model.named_steps.get("preprocessor")
+            if (
+                preprocessor is not None
+                and "n_jobs" in preprocessor.get_params(deep=False)
+                and preprocessor.get_params(deep=False)["n_jobs"] != self.transformer_jobs
+            ):
+                model.set_params(preprocessor=copy.copy(preprocessor).set_params(n_jobs=self.transformer_jobs))
+            estimator = model.named_steps.get("model", model.steps[-1][1])
+        if "n_jobs" in estimator.get_params(deep=False):
+            estimator.set_params(n_jobs=self.refit_jobs if refit else self.estimator_jobs)
+        return model
+
+    def as_dict(self) -> dict[str, int | str]:
+        return asdict(self)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.cores} core(s): {self.trial_jobs} trial(s) x {self.fold_jobs} fold(s) [{self.fold_backend}] "
+            f"x {self.estimator_jobs} estimator thread(s); preprocessor n_jobs={self.transformer_jobs}, "
+            f"refit n_jobs={self.refit_jobs}"
+        )
+
+
+def plan_parallelism(
+    n_folds: int, model_name: str | None = None, trial_jobs: int = 1, cores: int | None = None
+) -> ParallelPlan:
+    """
+    Split ``cores`` (default: ``available_cores()``) across ``trial_jobs`` trials of ``n_folds``-fold CV.
+
+    ``model_name`` picks the estimator level from the registry (``ModelSpec.threaded``); without it the plan
+    assumes a single-threaded estimator.
+    """
+    cores = max(1, cores or available_cores())
+    trial_jobs = max(1, min(trial_jobs, cores))
+    per_trial = max(1, cores // trial_jobs)
+    fold_jobs = max(1, min(n_folds, per_trial))
+    threaded = model_name is not None and get_model_spec(model_name).threaded
+    return ParallelPlan(
+        cores=cores,
+        trial_jobs=trial_jobs,
+        fold_jobs=fold_jobs,
+        fold_backend="threading" if threaded else "loky",
+        # folds already use the trial's cores; a lone fold (or a fit outside CV) may run the blocks side by side
+        transformer_jobs=1 if fold_jobs > 1 else min(_PREPROCESSOR_BLOCKS, per_trial),
+        estimator_jobs=max(1, per_trial // fold_jobs) if threaded else 1,
+        refit_jobs=per_trial if threaded else 1,
+    )
@@ -38,6 +38,29 @@ def lgbm_space(trial: optuna.Trial) -> dict[str, Any]:
     }
 
 
+def lgbm_native_space(trial: optuna.Trial) -> dict[str, Any]:
+    """LGBMRegressor search space plus the smoothing of its native categorical splits."""
+    return {
+        **lgbm_space(trial),
+        "cat_smooth": trial.suggest_float("cat_smooth", 1.0, 100.0, log=True),
+        "min_data_per_group": trial.suggest_int("min_data_per_group", 10, 200, log=True),
+    }
+
+
+# ---------- Histogram gradient boosting (Regressor) ----------
+def hgb_space(trial: optuna.Trial) -> dict[str, Any]:
+    """Compact HistGradientBoostingRegressor search space."""
+    return {
+        "max_iter": trial.suggest_int("max_iter", 50, 1500, step=50),
+        "learning_rate": trial.suggest_float("learning_rate", 1e-3, 0.3, log=True),
+        "max_leaf_nodes": trial.suggest_int("max_leaf_nodes", 16, 256),
+        "max_depth": trial.suggest_int("max_depth", 3, 15),
+        "min_samples_leaf": trial.suggest_int("min_samples_leaf", 5, 100),
+        "l2_regularization": trial.suggest_float("l2_regularization", 0.0, 2.0),
+        "max_features": trial.suggest_float("max_features", 0.5, 1.0),
+    }
+
+
 def dtree_space(trial: optuna.Trial) -> dict[str, Any]:
     """Compact DecisionTreeRegressor search space."""
     return {
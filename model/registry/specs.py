@@ -6,15 +6,22 @@ from typing import Any
 
 import optuna
 from lightgbm import LGBMRegressor
+from optuna_integration import LightGBMPruningCallback, XGBoostPruningCallback
 from sklearn.base import BaseEstimator
-from sklearn.ensemble import RandomForestRegressor
+from sklearn.ensemble import HistGradientBoostingRegressor, RandomForestRegressor
 from sklearn.linear_model import Lasso, LinearRegression, Ridge
 from sklearn.tree import DecisionTreeRegressor
 from xgboost import XGBRegressor
 
+from application.preprocessing import CATEGORICAL_COLS, DEFAULT_TEXT_COMPONENTS, NUMERIC_COLS
 from core.settings import settings
 
-from .spaces import dtree_space, lgbm_space, rf_space, xgb_space
+from .spaces import dtree_space, hgb_space, lgbm_native_space, lgbm_space, rf_space, xgb_space
+
+# positions of the categorical codes in the ``encoding="ordinal"`` features (``build_preprocessor``)
+_ORDINAL_CATEGORICAL = list(range(len(CATEGORICAL_COLS)))
+# XGBoost's type of every column of those features (default ``text_components``): "c"ategorical or "q"uantitative
+_ORDINAL_FEATURE_TYPES = ["c"] * len(CATEGORICAL_COLS) + ["q"] * (len(NUMERIC_COLS) + DEFAULT_TEXT_COMPONENTS)
 
 
 @dataclass(frozen=True)
@@ -25,21 +32,64 @@ class ModelSpec:
     - estimator_cls: the sklearn-compatible regressor class
     - base_kwargs: stable defaults you always want (n_jobs, random_state, etc.)
     - param_space: function that returns a dict of hyperparameters from a trial object
+    - threaded: fits with native threads (``n_jobs``) that release the GIL; the parallelism planner gives
+      it threads and runs its CV folds on a thread pool
+    - pruning: ``(trial, estimator, X_val, y_val) -> fit params`` that make the fit report the validation
+      metric of every boosting iteration to the Optuna trial (and stop once it is pruned)
+    - encoding: the features it is trained on, ``build_preprocessor(encoding=...)``: ``"onehot"`` (wide, sparse)
+      or ``"ordinal"`` (categorical codes and a dense projection of the ingredients)
+    - feature_kwargs: ``preprocessor -> kwargs`` that depend on the features the preprocessor outputs (e.g. the
+      type of each column); ``build`` merges them when given the preprocessor
     """
 
     name: str
     estimator_cls: type[BaseEstimator]
     base_kwargs: dict[str, Any]
     param_space: Callable[[optuna.Trial], dict[str, Any]] | None
-
-    def build(self, params: dict[str, Any] | None = None) -> BaseEstimator:
-        """Instantiate estimator with base kwargs merged with tuned params."""
+    threaded: bool = False
+    pruning: Callable[[optuna.Trial, BaseEstimator, Any, Any], dict[str, Any]] | None = None
+    encoding: str = "onehot"
+    feature_kwargs: Callable[[BaseEstimator], dict[str, Any]] | None = None
+
+    def build(self, params: dict[str, Any] | None = None, preprocessor: BaseEstimator | None = None) -> BaseEstimator:
+        """
+        Instantiate estimator with base kwargs merged with tuned params (and, given the ``preprocessor`` it is
+        trained behind, with its ``feature_kwargs``).
+        """
         # tuned params should override base defaults if keys collide
         params = params or {}
-        merged = {**self.base_kwargs, **params}
+        features = self.feature_kwargs(preprocessor) if self.feature_kwargs and preprocessor is not None else {}
+        merged = {**self.base_kwargs, **features, **params}
         return self.estimator_cls(**merged)
 
 
+def _xgb_pruning(trial: optuna.Trial, estimator: BaseEstimator, X_val, y_val) -> dict[str, Any]:
+    # XGBoost takes callbacks and metrics as estimator params, not fit params
+    estimator.set_params(eval_metric="rmse", callbacks=[XGBoostPruningCallback(trial, "validation_0-rmse")])
+    return {"eval_set": [(X_val, y_val)], "verbose": False}
+
+
+def _ordinal_feature_types(preprocessor: BaseEstimator) -> dict[str, Any]:
+    """XGBoost's ``feature_types`` of the ``encoding="ordinal"`` features of ``preprocessor``, at their real width."""
+    params = preprocessor.get_params(deep=True)
+    if "text__svd__n_components" not in params:
+        raise ValueError(
+            "Native categorical splits need the ordinal features (build_preprocessor(encoding='ordinal')), "
+            f"not {type(preprocessor).__name__} {preprocessor!r}"
+        )
+    columns = {name: cols for name, _, cols in params["transformers"]}
+    n_quantitative = len(columns["num"]) + params["text__svd__n_components"]
+    return {"feature_types": ["c"] * len(columns["cat"]) + ["q"] * n_quantitative}
+
+
+def _lgbm_pruning(trial: optuna.Trial, estimator: BaseEstimator, X_val, y_val) -> dict[str, Any]:
+    return {
+        "eval_set": [(X_val, y_val)],
+        "eval_metric": "l2",
+        "callbacks": [LightGBMPruningCallback(trial, "l2", valid_name="valid_0")],
+    }
+
+
 # -------- registry entries (add more models by adding more entries) --------
 
 LR_REG = ModelSpec(
@@ -91,6 +141,7 @@ RF_REG = ModelSpec(
         "random_state": settings.SEED,
     },
     param_space=rf_space,
+    threaded=True,
 )
 
 XGB_REG = ModelSpec(
@@ -102,6 +153,8 @@ XGB_REG = ModelSpec(
         "random_state": settings.SEED,
     },
     param_space=xgb_space,
+    threaded=True,
+    pruning=_xgb_pruning,
 )
 
 LGBM_REG = ModelSpec(
@@ -112,6 +165,56 @@ LGBM_REG = ModelSpec(
         "random_state": settings.SEED,
     },
     param_space=lgbm_space,
+    threaded=True,
+    pruning=_lgbm_pruning,
+)
+
+# ---- on the narrow ordinal features: histogram GBDTs, fast to fit on CPU ----
+
+HGB_REG = ModelSpec(
+    name="hgb",
+    estimator_cls=HistGradientBoostingRegressor,
+    base_kwargs={
+        "categorical_features": _ORDINAL_CATEGORICAL,
+        "early_stopping": False,  # max_iter is tuned, as n_estimators is for XGBoost/LightGBM
+        "random_state": settings.SEED,
+    },
+    param_space=hgb_space,
+    # OpenMP threads without an n_jobs parameter: CV folds run in processes, which joblib gives a share of
+    # the cores each
+    threaded=False,
+    encoding="ordinal",
+)
+
+XGB_NATIVE_REG = ModelSpec(
+    name="xgboost_native",
+    estimator_cls=XGBRegressor,
+    base_kwargs={
+        **XGB_REG.base_kwargs,
+        # XGBoost only splits natively on the columns typed "c", and takes the types of all of them: those of
+        # the default features here, those of the preprocessor's real ones when ``build`` is given it
+        "enable_categorical": True,
+        "feature_types": _ORDINAL_FEATURE_TYPES,
+    },
+    feature_kwargs=_ordinal_feature_types,
+    param_space=xgb_space,
+    threaded=True,
+    pruning=_xgb_pruning,
+    encoding="ordinal",
+)
+
+LGBM_NATIVE_REG = ModelSpec(
+    name="lightgbm_native",
+    estimator_cls=LGBMRegressor,
+    base_kwargs={
+        **LGBM_REG.base_kwargs,
+        # LightGBM's own parameter name: `categorical_feature` is a fit argument, ignored (with a warning) here
+        "categorical_column": _ORDINAL_CATEGORICAL,
+    },
+    param_space=lgbm_native_space,
+    threaded=True,
+    pruning=_lgbm_pruning,
+    encoding="ordinal",
 )
 
 REGISTRY: dict[str, ModelSpec] = {
@@ -122,6 +225,9 @@ REGISTRY: dict[str, ModelSpec] = {
     DTREE_REG.name: DTREE_REG,
     XGB_REG.name: XGB_REG,
     LGBM_REG.name: LGBM_REG,
+    HGB_REG.name: HGB_REG,
+    XGB_NATIVE_REG.name: XGB_NATIVE_REG,
+    LGBM_NATIVE_REG.name: LGBM_NATIVE_REG,
 }
 
 
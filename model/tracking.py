@@ -0,0 +1,340 @@
+"""
+Buffered, asynchronous MLflow logging for training and tuning runs.
+
+Every fluent ``mlflow.log_*`` call is a blocking request to the tracking server, a network round trip against
+Azure ML. Training and tuning log through this module instead:
+
+- params, metrics and tags are buffered per run and sent with ``MlflowClient.log_batch`` (as many entities per
+  request as the API allows) on a background thread, once a buffer fills and when the run ends;
+- artifacts are copied aside (callers reuse their file names) and uploaded on background threads;
+- failed requests are retried with exponential backoff;
+- ``start_run`` waits for all requests of the run before ending it, and logs how long the run spent on tracking:
+  ``tracking_blocking_sec`` on the training thread (including that final wait, requests sent on that thread and
+  ``timed`` sections such as ``log_model``) and ``tracking_background_sec`` in the background requests. Each
+  second is counted once: nested blocking calls (e.g. a ``flush`` within ``log_params``) only count in the
+  outermost one.
+
+Usage:
+    with tracking.start_run(run_name="ridge"):
+        tracking.log_params(params)
+        tracking.log_metric("rmse", rmse)
+        tracking.log_artifact(path, artifact_path="plots")
+        with tracking.timed():
+            mlflow.sklearn.log_model(...)
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator, Mapping
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import AbstractContextManager, contextmanager
+from dataclasses import asdict, dataclass
+from typing import Any
+
+import mlflow
+from loguru import logger
+from mlflow.entities import Metric, Param, RunTag
+
+# MlflowClient.log_batch limits per request
+_MAX_METRICS, _MAX_PARAMS, _MAX_TAGS, _MAX_ENTITIES = 1000, 100, 100, 1000
+_ATTEMPTS = 3
+_BACKOFF_SECONDS = 1.0
+_BACKGROUND_THREADS = 4
+
+
+@dataclass
+class TrackingStats:
+    """Time and requests one run spent on tracking."""
+
+    blocking_seconds: float = 0.0  # on the training thread
+    background_seconds: float = 0.0  # in background requests (including retries), not the ones sent synchronously
+    requests: int = 0
+    failed_requests: int = 0  # given up after all attempts
+
+    def as_metrics(self) -> dict[str, float]:
+        return {f"tracking_{k.replace('_seconds', '_sec')}": float(v) for k, v in asdict(self).items()}
+
+
+def _blocking(method: Callable) -> Callable:
+    """Count the time spent in ``method`` as blocking tracking time (see ``RunLogger.timed``)."""
+
+    @functools.wraps(method)
+    def wrapper(self: RunLogger, *args, **kwargs):
+        with self.timed():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class RunLogger:
+    """
+    Buffered params/metrics/tags and background artifact uploads of one run.
+
+    ``executor=None`` sends every request on the calling thread (still batched, still retried), as blocking time.
+    """
+
+    def __init__(
+        self,
+        run_id: str,
+        client: Any = None,
+        executor: ThreadPoolExecutor | None = None,
+        attempts: int = _ATTEMPTS,
+        backoff: float = _BACKOFF_SECONDS,
+    ):
+        self.run_id = run_id
+        self.client = client or mlflow.MlflowClient()
+        self.stats = TrackingStats()
+        self._executor = executor
+        self._attempts = attempts
+        self._backoff = backoff
+        self._lock = threading.Lock()
+        self._local = threading.local()  # per thread: depth of the nested blocking calls
+        self._metrics: list[Metric] = []
+        self._params: dict[str, Param] = {}
+        self._tags: dict[str, RunTag] = {}
+        self._futures: list[Future] = []
+        self._tmp_dir: str | None = None
+
+    # ---- buffered entities ----
+    @_blocking
+    def log_params(self, params: Mapping[str, Any]) -> None:
+        self._params.update({k: Param(k, str(v)) for k, v in params.items()})
+        if len(self._params) >= _MAX_PARAMS:
+            self.flush()
+
+    def log_param(self, key: str, value: Any) -> None:
+        self.log_params({key: value})
+
+    @_blocking
+    def log_metrics(self, metrics: Mapping[str, float], step: int | None = None) -> None:
+        timestamp = int(time.time() * 1000)
+        self._metrics.extend(Metric(k, float(v), timestamp, step or 0) for k, v in metrics.items())
+        if len(self._metrics) >= _MAX_METRICS:
+            self.flush()
+
+    def log_metric(self, key: str, value: float, step: int | None = None) -> None:
+        self.log_metrics({key: value}, step=step)
+
+    @_blocking
+    def set_tags(self, tags: Mapping[str, Any]) -> None:
+        self._tags.update({k: RunTag(k, str(v)) for k, v in tags.items()})
+        if len(self._tags) >= _MAX_TAGS:
+            self.flush()
+
+    def set_tag(self, key: str, value: Any) -> None:
+        self.set_tags({key: value})
+
+    @_blocking
+    def flush(self) -> None:
+        """Send the buffered params, metrics and tags (in ``log_batch`` requests)."""
+        params, tags, metrics = list(self._params.values()), list(self._tags.values()), self._metrics
+        self._params, self._tags, self._metrics = {}, {}, []
+        while params or tags or metrics:
+            batch_params, params = params[:_MAX_PARAMS], params[_MAX_PARAMS:]
+            batch_tags, tags = tags[:_MAX_TAGS], tags[_MAX_TAGS:]
+            n_metrics = min(_MAX_METRICS, _MAX_ENTITIES - len(batch_params) - len(batch_tags))
+            batch_metrics, metrics = metrics[:n_metrics], metrics[n_metrics:]
+            self._submit(
+                "log_batch",
+                functools.partial(
+                    self.client.log_batch, self.run_id, metrics=batch_metrics, params=batch_params, tags=batch_tags
+                ),
+            )
+
+    # ---- artifacts ----
+    def _staged(self, name: str) -> str:
+        """A fresh path named ``name`` in this run's staging folder."""
+        if self._tmp_dir is None:
+            self._tmp_dir = tempfile.mkdtemp(prefix="mlflow-artifacts-")
+        folder = tempfile.mkdtemp(dir=self._tmp_dir)
+        return os.path.join(folder, name)
+
+    @_blocking
+    def log_artifact(self, local_path: str | os.PathLike, artifact_path: str | None = None) -> None:
+        """Upload a file in the background; the file may be overwritten or deleted once this returns."""
+        staged = self._staged(os.path.basename(local_path))
+        shutil.copyfile(local_path, staged)
+        self._submit(
+            f"log_artifact {staged}", functools.partial(self.client.log_artifact, self.run_id, staged, artifact_path)
+        )
+
+    def _log_staged(self, staged: str, artifact_file: str) -> None:
+        folder = os.path.dirname(artifact_file) or None
+        self._submit(
+            f"log_artifact {artifact_file}",
+            functools.partial(self.client.log_artifact, self.run_id, staged, folder),
+        )
+
+    @_blocking
+    def log_figure(self, figure: Any, artifact_file: str) -> None:
+        """Render a matplotlib (or plotly) figure now, on the calling thread, and upload it in the background."""
+        staged = self._staged(os.path.basename(artifact_file))
+        if hasattr(figure, "savefig"):
+            figure.savefig(staged)
+        elif artifact_file.endswith(".html"):
+            figure.write_html(staged, include_plotlyjs="cdn")
+        else:
+            figure.write_image(staged)
+        self._log_staged(staged, artifact_file)
+
+    @_blocking
+    def log_dict(self, dictionary: Mapping, artifact_file: str) -> None:
+        staged = self._staged(os.path.basename(artifact_file))
+        with open(staged, "w") as f:
+            json.dump(dictionary, f, indent=2)
+        self._log_staged(staged, artifact_file)
+
+    # ---- requests ----
+    def _run_with_retries(self, what: str, request: Callable[[], Any], background: bool = True) -> None:
+        t0 = time.perf_counter()
+        try:
+            for attempt in range(1, self._attempts + 1):
+                try:
+                    request()
+                    return
+                except Exception:
+                    if attempt == self._attempts:
+                        with self._lock:
+                            self.stats.failed_requests += 1
+                        logger.exception(f"MLflow {what} failed after {attempt} attempt(s) (run {self.run_id})")
+                        return
+                    delay = self._backoff * 2 ** (attempt - 1)
+                    logger.warning(
+                        f"MLflow {what} failed (attempt {attempt}/{self._attempts}); retrying in {delay:.1f} s"
+                    )
+                    time.sleep(delay)
+        finally:
+            with self._lock:
+                self.stats.requests += 1
+                if background:  # a synchronous request is blocking time of its caller
+                    self.stats.background_seconds += time.perf_counter() - t0
+
+    def _submit(self, what: str, request: Callable[[], Any]) -> None:
+        if self._executor is None:
+            self._run_with_retries(what, request, background=False)
+        else:
+            self._futures.append(self._executor.submit(self._run_with_retries, what, request))
+
+    @_blocking
+    def wait(self) -> TrackingStats:
+        """Flush, wait for every request of the run and drop the staged files; returns the run's stats."""
+        self.flush()
+        futures, self._futures = self._futures, []
+        for future in futures:
+            future.result()
+        if self._tmp_dir is not None:
+            shutil.rmtree(self._tmp_dir, ignore_errors=True)
+            self._tmp_dir = None
+        return self.stats
+
+    @contextmanager
+    def timed(self) -> Iterator[None]:
+        """
+        Count a synchronous MLflow call (e.g. ``log_model``) as blocking tracking time.
+
+        Only the outermost section of a thread is counted, so the time of nested ones is not added twice.
+        """
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0:
+                with self._lock:
+                    self.stats.blocking_seconds += time.perf_counter() - t0
+
+
+# ---- fluent layer over the active run ----
+_run_loggers: dict[str, RunLogger] = {}
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=_BACKGROUND_THREADS, thread_name_prefix="mlflow-tracking")
+        return _executor
+
+
+@contextmanager
+def start_run(**kwargs) -> Iterator[mlflow.ActiveRun]:
+    """
+    ``mlflow.start_run`` whose logging goes through a ``RunLogger``: everything is sent before the run ends.
+
+    The run's tracking stats are logged as its ``tracking_*`` metrics.
+    """
+    with mlflow.start_run(**kwargs) as run:
+        run_id = run.info.run_id
+        run_logger = _run_loggers[run_id] = RunLogger(run_id, executor=_shared_executor())
+        try:
+            yield run
+        finally:
+            _run_loggers.pop(run_id, None)
+            stats = run_logger.wait()
+            logger.debug(
+                f"MLflow tracking of run {run_id}: {stats.blocking_seconds:.2f} s blocking, "
+                f"{stats.background_seconds:.2f} s in {stats.requests} background request(s)"
+            )
+            run_logger.log_metrics(stats.as_metrics())
+            run_logger._executor = None  # the stats go out now, before the run ends
+            run_logger.flush()
+
+
+def active_logger() -> RunLogger:
+    """The ``RunLogger`` of the active MLflow run, which must have been started with ``start_run``."""
+    run = mlflow.active_run()
+    if run is None or run.info.run_id not in _run_loggers:
+        raise RuntimeError("No active run started with model.tracking.start_run")
+    return _run_loggers[run.info.run_id]
+
+
+def log_params(params: Mapping[str, Any]) -> None:
+    active_logger().log_params(params)
+
+
+def log_param(key: str, value: Any) -> None:
+    active_logger().log_param(key, value)
+
+
+def log_metrics(metrics: Mapping[str, float], step: int | None = None) -> None:
+    active_logger().log_metrics(metrics, step=step)
+
+
+def log_metric(key: str, value: float, step: int | None = None) -> None:
+    active_logger().log_metric(key, value, step=step)
+
+
+def set_tags(tags: Mapping[str, Any]) -> None:
+    active_logger().set_tags(tags)
+
+
+def set_tag(key: str, value: Any) -> None:
+    active_logger().set_tag(key, value)
+
+
+def log_artifact(local_path: str | os.PathLike, artifact_path: str | None = None) -> None:
+    active_logger().log_artifact(local_path, artifact_path)
+
+
+def log_figure(figure: Any, artifact_file: str) -> None:
+    active_logger().log_figure(figure, artifact_file)
+
+
+def log_dict(dictionary: Mapping, artifact_file: str) -> None:
+    active_logger().log_dict(dictionary, artifact_file)
+
+
+def timed() -> AbstractContextManager[None]:
+    """Count the enclosed synchronous MLflow calls (e.g. ``log_model``) as tracking time of the active run."""
+    return active_logger().timed()
@@ -16,9 +16,13 @@ from tqdm.auto import tqdm
 from yellowbrick.regressor import ResidualsPlot
 
 # --- App bootstrap & settings ---
+from application.utils.profiling import cpu_usage
 from core.settings import settings
+from menu_transformers import CODE_PATH
 
-from . import evaluate_model, get_model_spec
+from . import evaluate_model, get_model_spec, tracking
+from .feature_cache import FoldFeatureCache, fit_pipeline
+from .parallelism import plan_parallelism
 
 
 def _log_residuals_plot(
@@ -43,7 +47,8 @@ def _log_residuals_plot(
     pre = pipeline.named_steps["preprocessor"]
     reg = pipeline.named_steps["model"]
 
-    X_train_t = pre.fit_transform(X_train, y_train)
+    # the pipeline is already fitted on X_train; transform only
+    X_train_t = pre.transform(X_train)
     X_test_t = pre.transform(X_test)
 
     viz = ResidualsPlot(reg)
@@ -71,26 +76,32 @@ def train_and_compare(
     y_train: pd.Series,
     X_test: pd.DataFrame,
     y_test: pd.Series,
-    preprocessor: ColumnTransformer,
+    preprocessor: ColumnTransformer | Mapping[str, ColumnTransformer],
     cv_folds: int = 5,
     scoring_criterion: str = "neg_mean_squared_error",
     parent_run_name: str = "model-comparison",
     best_model_registry_name: str | None = None,
+    feature_cache: FoldFeatureCache | None = None,
 ) -> tuple[dict[str, dict[str, float]], str, str]:
     """
     Train & compare models using provided estimators+params (fixed or tuned).
     - Child runs: params, metrics, model, residuals plot per model.
     - Parent run: comparison artifacts (boxplot, leaderboard), context, and best model tag.
+    - With a ``feature_cache`` over ``X_train``, CV and fits reuse its preprocessed features.
+    - ``preprocessor`` is shared by all models, or given per feature encoding (``ModelSpec.encoding``).
+    - The leaderboard reports each model's ``train_seconds`` (final fit of the whole pipeline, its
+      cached preprocessing included) and ``infer_time_ms_per_row``.
     """
     results: dict[str, dict[str, float]] = {}  # model name -> metrics
+    encodings: dict[str, str] = {}
     cv_rmse_all: list[np.ndarray] = []
     labels: list[str] = []
     model_uri, best_model_name = None, None
 
-    with mlflow.start_run(run_name=parent_run_name) as parent_run:
+    with tracking.start_run(run_name=parent_run_name) as parent_run:
         # ---- Parent context logs (simple, useful) ----
-        mlflow.set_tags({"run_type": "comparison"})
-        mlflow.log_params(
+        tracking.set_tags({"run_type": "comparison"})
+        tracking.log_params(
             {
                 "n_models": len(models_with_params),
                 "cv_folds": cv_folds,
@@ -99,36 +110,57 @@ def train_and_compare(
             }
         )
         # Log models+params mapping for traceability
-        mlflow.log_dict(
+        tracking.log_dict(
             {k: v for k, v in models_with_params.items()},
             artifact_file="models_params.json",
         )
 
         # CV strategy snapshot
-        mlflow.log_dict({"n_splits": cv_folds, "shuffle": True, "random_state": settings.SEED}, "context/cv.json")
+        tracking.log_dict({"n_splits": cv_folds, "shuffle": True, "random_state": settings.SEED}, "context/cv.json")
 
         for model_name, params in tqdm(models_with_params.items()):
-            with mlflow.start_run(run_name=model_name, nested=True):
+            with tracking.start_run(run_name=model_name, nested=True):
                 # clone to ensure a fresh estimator for each run
                 spec = get_model_spec(model_name)
-                final_model = spec.build(params)
+                model_preprocessor = preprocessor[spec.encoding] if isinstance(preprocessor, Mapping) else preprocessor
+                final_model = spec.build(params, model_preprocessor)
+                encodings[model_name] = spec.encoding
 
-                pipe = Pipeline([("preprocessor", preprocessor), ("model", final_model)])
+                plan = plan_parallelism(cv_folds, model_name)
+                pipe = plan.configure(Pipeline([("preprocessor", model_preprocessor), ("model", final_model)]))
+                tracking.set_tags({f"parallel_{k}": v for k, v in plan.as_dict().items()})
+                tracking.set_tags({"encoding": spec.encoding})
 
-                logger.info(f"Fitting {model_name} model with params: {params}")
+                logger.info(f"Fitting {model_name} model with params: {params} (parallelism: {plan})")
 
                 # --- CV RMSE on the whole pipeline ---
-                cv_scores = evaluate_model(
-                    n_folds=cv_folds, model=pipe, X=X_train, y=y_train, scoring_criterion=scoring_criterion
-                )
+                with cpu_usage(plan.cores) as cv_usage:
+                    cv_scores = evaluate_model(
+                        n_folds=cv_folds,
+                        model=pipe,
+                        X=X_train,
+                        y=y_train,
+                        scoring_criterion=scoring_criterion,
+                        feature_cache=feature_cache,
+                        parallel_plan=plan,
+                    )
                 cv_rmse = np.sqrt(-np.array(cv_scores))  # convert to RMSE per fold
                 cv_rmse_all.append(cv_rmse)
                 labels.append(model_name)
 
                 # --- Fit / timings ---
-                t0 = time.time()
-                pipe.fit(X_train, y_train)
-                train_seconds = time.time() - t0
+                pipe = plan.configure(pipe, refit=True)
+                cached = feature_cache is not None and feature_cache.applies_to(pipe, X_train)
+                if cached:  # computed once per configuration, maybe by an earlier model or tuning refit
+                    feature_cache.full(pipe.named_steps["preprocessor"])
+                t0 = time.perf_counter()
+                pipe = fit_pipeline(pipe, X_train, y_train, feature_cache)
+                train_seconds = time.perf_counter() - t0
+                if cached:  # the whole pipeline fit: the cached preprocessing counts as well
+                    train_seconds += feature_cache.preprocess_seconds(pipe.named_steps["preprocessor"])
+                if cv_usage.utilization is not None:
+                    logger.info(f"{model_name} CV kept {cv_usage.utilization:.0%} of {plan.cores} core(s) busy")
+                    tracking.log_metric("cv_cpu_utilization", cv_usage.utilization)
 
                 # --- metrics on test data ---
                 y_pred = pipe.predict(X_test)
@@ -143,9 +175,9 @@ def train_and_compare(
 
                 # simple inference latency on a small batch
                 batch_n = min(settings.BATCH_SIZE_INFER_TEST, len(X_test))
-                t0 = time.time()
+                t0 = time.perf_counter()
                 _ = pipe.predict(X_test.iloc[:batch_n])
-                infer_ms = (time.time() - t0) / batch_n * 1000
+                infer_ms = (time.perf_counter() - t0) / batch_n * 1000
                 metrics["infer_time_ms_per_row"] = float(infer_ms)
 
                 logger.info(f"Metrics for {model_name}: {metrics}")
@@ -153,13 +185,13 @@ def train_and_compare(
                 results[model_name] = metrics
 
                 # --- Log child run assets ---
-                mlflow.log_params(params)
-                mlflow.log_metrics(metrics)
+                tracking.log_params(params)
+                tracking.log_metrics(metrics)
 
                 # Residuals
                 resid_path = Path(settings.ARTIFACT_DIR, f"residuals_{model_name}.png")
                 _log_residuals_plot(pipe, X_train, y_train, X_test, y_test, resid_path)
-                mlflow.log_artifact(str(resid_path), artifact_path=f"plots/{model_name}")
+                tracking.log_artifact(str(resid_path), artifact_path=f"plots/{model_name}")
 
                 # y_true vs y_pred (quick bias check)
                 plt.figure()
@@ -170,32 +202,35 @@ def train_and_compare(
                 yp_path = Path(settings.ARTIFACT_DIR, f"y_true_vs_pred_{model_name}.png")
                 plt.savefig(yp_path)
                 plt.close()
-                mlflow.log_artifact(str(yp_path), artifact_path=f"plots/{model_name}")
+                tracking.log_artifact(str(yp_path), artifact_path=f"plots/{model_name}")
 
                 signature_example = X_train.iloc[:10]
                 signature_out = pipe.predict(signature_example)
 
                 signature = infer_signature(signature_example, signature_out)
                 # log model
-                mlflow.sklearn.log_model(
-                    pipe,
-                    # name=f"model_{model_name}",
-                    artifact_path=f"model_{model_name}",
-                    signature=signature,
-                    input_example=signature_example,
-                )
+                with tracking.timed():
+                    mlflow.sklearn.log_model(
+                        pipe,
+                        # name=f"model_{model_name}",
+                        artifact_path=f"model_{model_name}",
+                        signature=signature,
+                        input_example=signature_example,
+                        code_paths=[CODE_PATH],
+                        serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_PICKLE,
+                    )
 
         # ---- Parent-level comparison artifacts ----
         # Existing CV RMSE boxplot
         cmp_path = Path(settings.ARTIFACT_DIR, "cv_rmse_comparison.png")
         _boxplot_cv_rmse(cv_rmse_all, labels, cmp_path)
-        mlflow.log_artifact(str(cmp_path), artifact_path="plots/comparison")
+        tracking.log_artifact(str(cmp_path), artifact_path="plots/comparison")
 
         # Leaderboard CSV/JSON (sorted by CV_RMSE_mean)
         # generate leaderboard DataFrame
         leaderboard = (
             pd.DataFrame.from_dict(results, orient="index")
-            .assign(model=lambda d: d.index)
+            .assign(model=lambda d: d.index, encoding=lambda d: d.index.map(encodings))
             .sort_values("CV_RMSE_mean")
             .reset_index(drop=True)
         )
@@ -207,8 +242,8 @@ def train_and_compare(
         leaderboard.to_csv(lb_csv, index=False)
         leaderboard.to_json(lb_json, orient="records", indent=2)
 
-        mlflow.log_artifact(str(lb_csv), artifact_path="tables")
-        mlflow.log_artifact(str(lb_json), artifact_path="tables")
+        tracking.log_artifact(str(lb_csv), artifact_path="tables")
+        tracking.log_artifact(str(lb_json), artifact_path="tables")
 
         # CV RMSE mean ± std bar plot
         means = leaderboard["CV_RMSE_mean"].values
@@ -221,15 +256,15 @@ def train_and_compare(
         bar_path = Path(settings.ARTIFACT_DIR, "cv_rmse_mean_bar.png")
         plt.savefig(bar_path)
         plt.close()
-        mlflow.log_artifact(str(bar_path), artifact_path="plots/comparison")
+        tracking.log_artifact(str(bar_path), artifact_path="plots/comparison")
 
         # Raw CV arrays (re-plot later if needed)
         cv_dump = {lbl: arr.tolist() for lbl, arr in zip(labels, cv_rmse_all, strict=False)}
-        mlflow.log_dict(cv_dump, artifact_file="cv_rmse_raw.json")
+        tracking.log_dict(cv_dump, artifact_file="cv_rmse_raw.json")
 
         # Tag best model on the parent run
         best_row = leaderboard.iloc[0]
-        mlflow.set_tags(
+        tracking.set_tags(
             {
                 "best_model": str(best_row["model"]),
                 "best_model_cv_rmse_mean": f"{best_row['CV_RMSE_mean']:.6f}",
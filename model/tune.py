@@ -1,6 +1,11 @@
 from __future__ import annotations
 
+import os
+import socket
 import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 
 import matplotlib.pyplot as plt
@@ -13,10 +18,22 @@ from mlflow.models import infer_signature
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 
+from application.utils.profiling import cpu_usage
 from core.settings import settings
+from menu_transformers import CODE_PATH
 from model.registry import get_model_spec
+from model.registry.specs import ModelSpec
 
-from . import evaluate_model
+from . import tracking
+from .evaluation import iter_fold_scores
+from .feature_cache import FoldFeatureCache, fit_pipeline
+from .fidelity import fidelity_schedule, fidelity_subsamples
+from .parallelism import ParallelPlan, plan_parallelism
+from .study import optimize_study, optuna_storage
+from .warm_start import FEATURE_SET_VERSION, StudyKey, WarmStart, check_study_key, warm_start
+
+# which trials get their pipeline refitted and logged (with a pred-vs-true figure): none, the k best, or all
+TRIAL_ARTIFACTS = ("none", "top-k", "all")
 
 
 def _pred_vs_true_figure(y_true: pd.Series, y_pred: np.ndarray, title: str = "Predicted vs True"):
@@ -77,30 +94,251 @@ def plot_residuals(model, X_test, y_test, save_path=None):
     return fig
 
 
-def champion_callback(study, frozen_trial):
-    """
-    Logging callback that will report when a new trial iteration improves upon existing
-    best trial values.
-
-    Note: This callback is not intended for use in distributed computing systems such as Spark
-    or Ray due to the micro-batch iterative implementation for distributing trials to a cluster's
-    workers or agents.
-    The race conditions with file system state management for distributed trials will render
-    inconsistent values with this callback.
+@dataclass
+class _TrialObjective:
     """
+    Optuna objective of ``tune_model``: one nested MLflow run per trial.
 
-    winner = study.user_attrs.get("winner", None)
+    A module-level class rather than a closure so it pickles to the tuning worker processes; each worker logs
+    its trials under the parent run ``parent_run_id`` of ``experiment_id`` on ``tracking_uri``.
+    """
 
-    if study.best_value and winner != study.best_value:
-        study.set_user_attr("winner", study.best_value)
-        if winner:
-            improvement_percent = (abs(winner - study.best_value) / study.best_value) * 100
-            logger.info(
-                f"Trial {frozen_trial.number} achieved value: {frozen_trial.value} with "
-                f"{improvement_percent: .4f}% improvement"
+    model_name: str
+    preprocessor: ColumnTransformer
+    X_train: pd.DataFrame
+    y_train: pd.Series
+    X_test: pd.DataFrame
+    y_test: pd.Series
+    cv_folds: int
+    scoring_criterion: str
+    feature_cache: FoldFeatureCache | None
+    plan: ParallelPlan
+    parent_run_id: str
+    experiment_id: str
+    tracking_uri: str
+    prune_iterations: bool = True
+    trial_artifacts: str = "all"
+    fidelities: tuple[float, ...] = (1.0,)
+    # row positions of X_train for every fidelity below 1.0
+    subsamples: list[np.ndarray] = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self.subsamples = fidelity_subsamples(self.X_train, self.y_train, self.fidelities, min_rows=2 * self.cv_folds)
+
+    def __call__(self, trial: optuna.Trial) -> float:
+        model_name, plan = self.model_name, self.plan
+        if mlflow.active_run() is None:  # worker process: point it at the parent's tracking server
+            mlflow.set_tracking_uri(self.tracking_uri)
+        # One child run per trial (official mlflow pattern), attached to the parent run explicitly so the trials
+        # of every worker process nest under it
+        with tracking.start_run(
+            nested=True,
+            run_name=f"trial_{trial.number}",
+            experiment_id=self.experiment_id,
+            parent_run_id=self.parent_run_id,
+        ) as run:
+            tracking.set_tag("model_name", model_name)
+            tracking.set_tag("model_flavor", "sklearn")
+            tracking.set_tags(
+                {
+                    "optuna_study": trial.study.study_name,
+                    "optuna_trial": trial.number,
+                    "optuna_worker": f"{socket.gethostname()}:{os.getpid()}",
+                }
+            )
+            model_spec = get_model_spec(model_name)  # e.g., "rforest" or "xgboost"
+            # 1) sample hyperparameters from the spec's space
+            params = model_spec.param_space(trial)
+            # 2) build the estimator with base kwargs merged with trial params
+            model = model_spec.build(params, self.preprocessor)
+
+            tracking.log_params(params)
+
+            # model = XGBRegressor(**params)
+            pipe = plan.configure(Pipeline([("preprocessor", self.preprocessor), ("model", model)]))
+
+            # Optional breadcrumb: link back the run id to the Optuna trial
+            trial.set_user_attr("mlflow_run_id", run.info.run_id)
+            trial.set_user_attr("mlflow_parent_run_id", self.parent_run_id)
+
+            t0 = time.perf_counter()
+            try:
+                scores = self._cross_validate(trial, pipe, model_spec)
+            except optuna.TrialPruned as exc:
+                # the run itself finishes normally: it holds what the trial did until it was stopped
+                pruned = exc
+                tracking.set_tag("trial_state", "PRUNED")
+                tracking.log_metric("trial_fit_time_sec", time.perf_counter() - t0)
+                trial.set_user_attr("fit_time_sec", time.perf_counter() - t0)
+            else:
+                return self._log_completed(trial, pipe, scores, time.perf_counter() - t0)
+        raise pruned
+
+    def _cross_validate(self, trial: optuna.Trial, pipe: Pipeline, model_spec: ModelSpec) -> list[float]:
+        """
+        CV scores of ``pipe``, fold batch by fold batch, reporting the running objective to ``trial`` after each
+        batch; raises ``optuna.TrialPruned`` (skipping the remaining folds) once the pruner says so.
+
+        With ``prune_iterations`` and a boosted model (``ModelSpec.pruning``), the trial reports the validation
+        metric of every boosting iteration of the first fold instead, and is pruned in the middle of that fit.
+        A multi-fidelity schedule reports once per fidelity instead (``_cross_validate_fidelities``).
+        """
+        if len(self.fidelities) > 1:
+            return self._cross_validate_fidelities(trial, pipe)
+        trial.set_user_attr("fidelity", 1.0)
+        trial.set_user_attr("fidelity_rows", len(self.X_train))
+        iteration_pruning = self.prune_iterations and model_spec.pruning is not None
+        scores: list[float] = []
+        for batch in iter_fold_scores(
+            self.cv_folds,
+            pipe,
+            self.X_train,
+            self.y_train,
+            self.scoring_criterion,
+            feature_cache=self.feature_cache,
+            parallel_plan=self.plan,
+            first_fold_fit_params=partial(model_spec.pruning, trial) if iteration_pruning else None,
+        ):
+            scores.extend(batch)
+            running = -float(np.mean(scores))  # positive MSE of the folds so far
+            tracking.log_metric("cv_objective_running", running, step=len(scores))
+            if iteration_pruning:
+                continue  # one step axis per trial: here, the boosting iterations of the first fold
+            trial.report(running, step=len(scores))
+            if trial.should_prune():
+                raise optuna.TrialPruned(f"pruned after {len(scores)} of {self.cv_folds} folds")
+        return scores
+
+    def _cross_validate_fidelities(self, trial: optuna.Trial, pipe: Pipeline) -> list[float]:
+        """
+        CV scores of ``pipe`` on all training rows, after its CV on each smaller fidelity (see ``model.fidelity``)
+        survived the pruner: the objective is reported once per rung (step = rung number).
+        """
+        for rung, fraction in enumerate(self.fidelities, start=1):
+            if fraction < 1.0:
+                rows = self.subsamples[rung - 1]
+                X, y, feature_cache = self.X_train.iloc[rows], self.y_train.iloc[rows], None
+            else:
+                X, y, feature_cache = self.X_train, self.y_train, self.feature_cache
+            batches = iter_fold_scores(
+                self.cv_folds,
+                pipe,
+                X,
+                y,
+                self.scoring_criterion,
+                feature_cache=feature_cache,
+                parallel_plan=self.plan,
+                batch_size=self.cv_folds,
             )
-        else:
-            logger.info(f"Initial trial {frozen_trial.number} achieved value: {frozen_trial.value}")
+            scores = [float(s) for batch in batches for s in batch]
+            value = -float(np.mean(scores))  # positive MSE at this fidelity
+            trial.set_user_attr("fidelity", fraction)
+            trial.set_user_attr("fidelity_rows", len(X))
+            tracking.log_metric("cv_objective_fidelity", value, step=rung)
+            trial.report(value, step=rung)
+            if fraction < 1.0 and trial.should_prune():
+                raise optuna.TrialPruned(f"pruned at fidelity {fraction:g} ({len(X)} rows)")
+        return scores
+
+    def _log_completed(self, trial: optuna.Trial, pipe: Pipeline, scores: list[float], fit_time: float) -> float:
+        # scores are NEGATIVE MSE -> objective is POSITIVE MSE
+        cv_mse_mean = float(np.mean(scores))  # e.g., -123.4
+        cv_mse_std = float(np.std(scores))
+        objective_value = -cv_mse_mean  # +123.4 (the MSE you minimize)
+        cv_rmse_mean = float(np.mean(np.sqrt([-s for s in scores])))
+
+        # Log a concise set of trial metrics (single objective + a few helpers)
+        tracking.log_metric("objective_value", objective_value)
+        tracking.log_metric("cv_mse_mean", -cv_mse_mean)  # positive MSE
+        tracking.log_metric("cv_mse_std", cv_mse_std)
+        tracking.log_metric("cv_rmse_mean", cv_rmse_mean)
+        tracking.log_metric("n_splits", self.cv_folds)
+        tracking.log_metric("trial_fit_time_sec", fit_time)
+
+        # the leaderboard row lives in the study, where every worker's trials end up
+        trial.set_user_attr("cv_rmse_mean", cv_rmse_mean)
+        trial.set_user_attr("cv_mse_mean", -cv_mse_mean)  # positive MSE
+        trial.set_user_attr("cv_mse_std", cv_mse_std)
+        trial.set_user_attr("fit_time_sec", fit_time)
+
+        if self.trial_artifacts == "all":
+            trial.set_user_attr("artifact_time_sec", self._log_artifacts(trial.number, pipe))
+        return objective_value  # Optuna will minimize this
+
+    def _log_artifacts(self, trial_number: int, pipe: Pipeline) -> float:
+        """Refit ``pipe`` on the training set and log it, with its test figure, to the active run; returns seconds."""
+        model_name, X_train = self.model_name, self.X_train
+        t0 = time.perf_counter()
+
+        # Log the trained pipeline for this trial with a proper signature.
+        pipe = fit_pipeline(self.plan.configure(pipe, refit=True), X_train, self.y_train, self.feature_cache)
+
+        example_in = X_train.iloc[:10]
+        signature_ml = infer_signature(example_in, pipe.predict(example_in))
+
+        with tracking.timed():
+            mlflow.sklearn.log_model(
+                sk_model=pipe,
+                # name=f"model_pipeline_{model_name}_{trial_number}",
+                artifact_path=f"model_pipeline_{model_name}_{trial_number}",
+                signature=signature_ml,
+                input_example=example_in,  # also displayed in UI
+                code_paths=[CODE_PATH],
+                serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_PICKLE,
+            )
+
+        # Trial-level figure (Pred vs True on held-out test)
+        y_pred_test = pipe.predict(self.X_test)
+        fig = _pred_vs_true_figure(
+            y_true=self.y_test,
+            y_pred=y_pred_test,
+            title=f"{model_name}-Trial {trial_number} – Pred vs True (test)",
+        )
+        tracking.log_figure(fig, f"plots/{model_name}_pred_vs_true_test.png")
+        plt.close(fig)
+
+        artifact_time = time.perf_counter() - t0
+        tracking.log_metric("trial_artifact_time_sec", artifact_time)
+        return artifact_time
+
+    def log_trial_artifacts(self, trial: optuna.trial.FrozenTrial) -> float:
+        """Log the artifacts of a finished trial to its run after the study (``top-k`` policy); returns seconds."""
+        model_spec = get_model_spec(self.model_name)
+        # replay the trial's suggestions through the space: the same estimator params as during the trial
+        params = model_spec.param_space(optuna.trial.FixedTrial(trial.params))
+        pipe = Pipeline([("preprocessor", self.preprocessor), ("model", model_spec.build(params, self.preprocessor))])
+        with tracking.start_run(run_id=trial.user_attrs["mlflow_run_id"], nested=True):
+            return self._log_artifacts(trial.number, pipe)
+
+
+_LEADERBOARD_ATTRS = (
+    "cv_rmse_mean",
+    "cv_mse_mean",
+    "cv_mse_std",
+    "fidelity",
+    "fidelity_rows",
+    "fit_time_sec",
+    "warm_start_from",
+)
+
+
+def _leaderboard_rows(study: optuna.Study) -> list[dict]:
+    """
+    A compact table row per completed or pruned trial of ``study`` (from any worker), with the resources it used:
+    the largest fidelity it reached (fraction and number of training rows) and its objective time.
+    """
+    states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    return [
+        {
+            "trial": t.number,
+            "state": t.state.name,
+            **t.params,
+            # a pruned trial's value is its last intermediate one, not comparable to a full CV score
+            "objective_value": t.value if t.state == optuna.trial.TrialState.COMPLETE else None,
+            **{k: t.user_attrs.get(k) for k in _LEADERBOARD_ATTRS},
+        }
+        for t in study.get_trials(deepcopy=False, states=states)
+    ]
 
 
 def tune_model(
@@ -113,6 +351,17 @@ def tune_model(
     n_trials: int = 5,
     cv_folds: int = 5,
     scoring_criterion: str = "neg_mean_squared_error",
+    feature_cache: FoldFeatureCache | None = None,
+    n_workers: int = 1,
+    storage: str | None = None,
+    study_name: str | None = None,
+    pruner: str = "median",
+    prune_iterations: bool = True,
+    trial_artifacts: str = "top-k",
+    top_k: int = 3,
+    fidelities: Sequence[float] = (1.0,),
+    warm_start_trials: int = 10,
+    warm_start_similarity: float = 0.7,
 ) -> tuple[dict[str, float | int], float]:
     """
     One MLflow parent run + a nested child run per Optuna trial.
@@ -121,20 +370,75 @@ def tune_model(
       • searched hyperparameters (given hyperparameter space)
       • objective_value  -> positive MSE (= -mean(neg_MSE))  (single objective per trial)
       • cv_mse_mean, cv_mse_std, rmse (sqrt(objective_value)), n_splits, trial_fit_time_sec
-      • the trained pipeline (preprocessor + model) with a real model signature
+      • the trained pipeline (preprocessor + model) with a real model signature and a pred-vs-true figure,
+        per the ``trial_artifacts`` policy (see ``TRIAL_ARTIFACTS``), with trial_artifact_time_sec
 
     Parent logs:
       • best_* parameters
       • best_objective (minimized positive MSE)
+      • trials_objective_time_sec (CV of all trials) and trials_artifact_time_sec (refits and their artifacts)
+
+    With a ``feature_cache`` over ``X_train``, the preprocessor is fitted once per CV fold (and once on the full
+    training set) for all trials instead of once per fold per trial.
+
+    ``n_workers`` processes run trials side by side (the core budget is split between them, so at most one
+    worker per core is started). They share the study through ``storage`` (an RDB URL or ``journal:<path>``,
+    see ``model.study``; default: a temporary journal). Workers on other machines join the study by running with
+    the same ``storage`` and ``study_name``; ``n_trials`` counts the trials of all of them.
+
+    In a persistent ``storage``, the study is named after the model, the preprocessor's configuration and a
+    fingerprint of the training data by default (see ``model.warm_start``): a rerun on the same data continues
+    it, ``n_trials`` more trials on top of the stored ones. A new study (e.g. after a data refresh) starts with
+    the ``warm_start_trials`` (at most ``n_trials``) best configurations of the earlier study of the same model and
+    feature set whose training rows overlap most with ``X_train`` (Jaccard similarity at least
+    ``warm_start_similarity``).
+    Without ``storage``, the study is unique to this run.
+
+    Each trial reports its running CV score after every batch of folds, so the ``pruner`` (see
+    ``model.study.PRUNERS``) stops unpromising trials before their remaining folds and their refit. With
+    ``prune_iterations``, boosted models (XGBoost, LightGBM) report every boosting iteration of their first fold
+    instead, and are stopped in the middle of it.
+
+    Refitting and logging every trial's pipeline can cost more than its CV (e.g. ``ridge``). Under the default
+    ``trial_artifacts="top-k"``, only the ``top_k`` best trials are refitted and logged, after the study, into
+    their own runs; ``"all"`` does it within every completed trial, ``"none"`` never.
+
+    A multi-fidelity schedule such as ``fidelities=(0.1, 0.3, 1.0)`` scores each trial on stratified subsamples
+    of ``X_train`` first (see ``model.fidelity``), and the ``pruner`` promotes only the promising ones to the
+    larger fractions; the trials then report once per fidelity, not per fold or boosting iteration. The trials
+    summary table records the fidelity (and rows) each trial reached.
 
     Returns: (best_params, best_value)
     """
 
-    model_spec = get_model_spec(model_name)  # e.g., "rforest" or "xgboost"
+    if trial_artifacts not in TRIAL_ARTIFACTS:
+        raise ValueError(f"Unknown trial artifact policy {trial_artifacts!r}; expected one of {TRIAL_ARTIFACTS}")
+    fidelities = fidelity_schedule(fidelities)
+    if len(fidelities) > 1 and pruner == "none":
+        logger.warning("Multi-fidelity tuning without a pruner: every trial runs every fidelity")
+    plan = plan_parallelism(cv_folds, model_name, trial_jobs=n_workers)
+    if plan.trial_jobs < n_workers:
+        logger.warning(
+            f"{n_workers} tuning workers requested, but the budget of {plan.cores} core(s) runs "
+            f"{plan.trial_jobs} at once; starting {plan.trial_jobs}"
+        )
+        n_workers = plan.trial_jobs
+    logger.info(f"Parallelism plan for {model_name}: {plan}")
+
+    with tracking.start_run(run_name=f"{model_name}-tuning") as parent:
+        key = StudyKey.of(model_name, preprocessor, X_train, y_train) if storage else None
+        study_name = study_name or (key.study_name if key else f"{model_name}-tuning-{parent.info.run_id}")
+        seeded = WarmStart()
+
+        def prepare(study: optuna.Study) -> None:
+            nonlocal seeded
+            check_study_key(study, key)
+            # no more than this run's trials: enqueued trials it does not run would stay waiting in the storage
+            n_configs = min(warm_start_trials, n_trials)
+            seeded = warm_start(study, optuna_storage(storage), key, n_configs, warm_start_similarity)
 
-    with mlflow.start_run(run_name=f"{model_name}-tuning"):
         # log tags
-        mlflow.set_tags(
+        tracking.set_tags(
             {
                 "project": "Restaurant Menu Pricing",
                 "run_type": "hpo",
@@ -143,90 +447,80 @@ def tune_model(
                 "scoring": scoring_criterion,
                 "n_trials": n_trials,
                 "cv_folds": cv_folds,
-                "feature_set_version": 1,
+                "feature_set_version": FEATURE_SET_VERSION,
+                **({"feature_set": key.feature_set[:8], "dataset_fingerprint": key.dataset[:12]} if key else {}),
+                "optuna_study": study_name,
+                "optuna_workers": n_workers,
+                "optuna_pruner": pruner,
+                "fidelities": ",".join(f"{f:g}" for f in fidelities),
+                "trial_artifacts": f"top-{top_k}" if trial_artifacts == "top-k" else trial_artifacts,
+                **{f"parallel_{k}": v for k, v in plan.as_dict().items()},
             }
         )
 
-        trial_rows: list[dict] = []
-
-        def objective(trial: optuna.Trial) -> float:
-            # One child run per trial (official mlflow pattern)
-            with mlflow.start_run(nested=True, run_name=f"trial_{trial.number}"):
-                mlflow.set_tag("model_name", model_name)
-                mlflow.set_tag("model_flavor", "sklearn")
-                # 1) sample hyperparameters from the spec's space
-                params = model_spec.param_space(trial)
-                # 2) build the estimator with base kwargs merged with trial params
-                model = model_spec.build(params)
-
-                mlflow.log_params(params)
-
-                # model = XGBRegressor(**params)
-                pipe = Pipeline([("preprocessor", preprocessor), ("model", model)])
-
-                t0 = time.perf_counter()
-                scores = evaluate_model(
-                    n_folds=cv_folds, model=pipe, X=X_train, y=y_train, scoring_criterion=scoring_criterion
-                )
-                fit_time = time.perf_counter() - t0
-
-                # scores are NEGATIVE MSE -> objective is POSITIVE MSE
-                cv_mse_mean = float(np.mean(scores))  # e.g., -123.4
-                cv_mse_std = float(np.std(scores))
-                objective_value = -cv_mse_mean  # +123.4 (the MSE you minimize)
-                cv_rmse_mean = float(np.mean(np.sqrt([-s for s in scores])))
-
-                # Log a concise set of trial metrics (single objective + a few helpers)
-                mlflow.log_metric("objective_value", objective_value)
-                mlflow.log_metric("cv_mse_mean", -cv_mse_mean)  # positive MSE
-                mlflow.log_metric("cv_mse_std", cv_mse_std)
-                mlflow.log_metric("cv_rmse_mean", cv_rmse_mean)
-                mlflow.log_metric("n_splits", cv_folds)
-                mlflow.log_metric("trial_fit_time_sec", fit_time)
-
-                # Log the trained pipeline for this trial with a proper signature.
-                pipe.fit(X_train, y_train)
-
-                example_in = X_train.iloc[:10]
-                signature_ml = infer_signature(example_in, pipe.predict(example_in))
-
-                mlflow.sklearn.log_model(
-                    sk_model=pipe,
-                    # name=f"model_pipeline_{model_name}_{trial.number}",
-                    artifact_path=f"model_pipeline_{model_name}_{trial.number}",
-                    signature=signature_ml,
-                    input_example=example_in,  # also displayed in UI
-                )
-
-                # Trial-level figure (Pred vs True on held-out test)
-                y_pred_test = pipe.predict(X_test)
-                fig = _pred_vs_true_figure(
-                    y_true=y_test, y_pred=y_pred_test, title=f"{model_name}-Trial {trial.number} – Pred vs True (test)"
-                )
-                mlflow.log_figure(fig, f"plots/{model_name}_pred_vs_true_test.png")
-                plt.close(fig)
-
-                # keep a compact table row for parent summary CSV
-                trial_rows.append(
-                    {
-                        "trial": trial.number,
-                        **params,
-                        "objective_value": objective_value,
-                        "cv_rmse_mean": cv_rmse_mean,
-                        "cv_mse_mean": -cv_mse_mean,  # positive MSE
-                        "cv_mse_std": cv_mse_std,
-                        "fit_time_sec": fit_time,
-                    }
-                )
-
-                # Optional breadcrumb: link back the run id to the Optuna trial
-                trial.set_user_attr("mlflow_run_id", mlflow.active_run().info.run_id)
-
-                return objective_value  # Optuna will minimize this
-
-        # Initialize the Optuna study
-        study = optuna.create_study(direction="minimize")
-        study.optimize(objective, n_trials=n_trials, show_progress_bar=True, callbacks=[champion_callback])
+        if feature_cache is not None and n_workers > 1 and X_train is feature_cache.X:
+            feature_cache.warm(preprocessor, cv_folds)  # once here rather than once per worker
+
+        objective = _TrialObjective(
+            model_name=model_name,
+            preprocessor=preprocessor,
+            X_train=X_train,
+            y_train=y_train,
+            X_test=X_test,
+            y_test=y_test,
+            cv_folds=cv_folds,
+            scoring_criterion=scoring_criterion,
+            feature_cache=feature_cache,
+            plan=plan,
+            parent_run_id=parent.info.run_id,
+            experiment_id=parent.info.experiment_id,
+            tracking_uri=mlflow.get_tracking_uri(),
+            prune_iterations=prune_iterations,
+            trial_artifacts=trial_artifacts,
+            fidelities=fidelities,
+        )
+        with cpu_usage(plan.cores) as usage:
+            study = optimize_study(
+                objective,
+                n_trials,
+                study_name,
+                storage_url=storage,
+                n_workers=n_workers,
+                pruner=pruner,
+                prepare=prepare if key else None,
+            )
+        if usage.utilization is not None:
+            logger.info(
+                f"{model_name} tuning kept {usage.utilization:.0%} of {plan.cores} core(s) busy "
+                f"({usage.cpu_seconds:.1f} CPU s in {usage.seconds:.1f} s)"
+            )
+            tracking.log_metric("cpu_utilization", usage.utilization)
+        if key is not None:
+            tracking.set_tags({"warm_start_source": seeded.source or "none", "warm_start_trials": seeded.n_enqueued})
+            if seeded.similarity is not None:
+                tracking.set_tag("warm_start_similarity", f"{seeded.similarity:.3f}")
+        trial_rows = _leaderboard_rows(study)  # the whole study, stored trials of earlier runs included
+        # this run's trials (a continued study also holds earlier runs')
+        run_trials = [t for t in study.trials if t.user_attrs.get("mlflow_parent_run_id") == parent.info.run_id]
+        n_pruned = sum(t.state == optuna.trial.TrialState.PRUNED for t in run_trials)
+        logger.info(f"{model_name}: {n_pruned} of {len(run_trials)} trials pruned")
+        tracking.log_metric("n_pruned_trials", n_pruned)
+
+        artifact_time = 0.0
+        if trial_artifacts == "top-k":
+            # lazily, for the best trials of the study that ran under this parent run (not other machines')
+            completed = study.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+            for trial in sorted(completed, key=lambda t: t.value)[:top_k]:
+                if trial.user_attrs.get("mlflow_parent_run_id") == parent.info.run_id:
+                    artifact_time += objective.log_trial_artifacts(trial)
+        objective_time = sum(t.user_attrs.get("fit_time_sec", 0.0) for t in run_trials)
+        artifact_time += sum(t.user_attrs.get("artifact_time_sec", 0.0) for t in run_trials)
+        logger.info(
+            f"{model_name} trials: {objective_time:.1f} s of objective (CV), "
+            f"{artifact_time:.1f} s of refits and artifacts ({trial_artifacts})"
+        )
+        tracking.log_metric("trials_objective_time_sec", objective_time)
+        tracking.log_metric("trials_artifact_time_sec", artifact_time)
 
         # ----- Parent-level logging -----
         # Best params & metrics
@@ -234,14 +528,14 @@ def tune_model(
         best_value: float = float(study.best_value)
 
         # Params: prefix to avoid collisions
-        mlflow.log_params({f"best_{k}": v for k, v in best_params.items()})
+        tracking.log_params({f"best_{k}": v for k, v in best_params.items()})
         # Metrics
-        mlflow.log_metric("best_mse", best_value)
-        mlflow.log_metric("best_objective_value", best_value)
-        mlflow.log_metric("best_rmse", np.sqrt(best_value))
+        tracking.log_metric("best_mse", best_value)
+        tracking.log_metric("best_objective_value", best_value)
+        tracking.log_metric("best_rmse", np.sqrt(best_value))
 
         # Useful tag
-        mlflow.set_tag("best_trial", study.best_trial.number)
+        tracking.set_tag("best_trial", study.best_trial.number)
 
         # Trials summary CSV (quick compare at parent level)
         if trial_rows:
@@ -257,27 +551,27 @@ def tune_model(
             leaderboard.to_csv(lb_csv, index=False)
             leaderboard.to_json(lb_json, orient="records", indent=2)
 
-            mlflow.log_artifact(str(lb_csv), artifact_path="tables")
-            mlflow.log_artifact(str(lb_json), artifact_path="tables")
+            tracking.log_artifact(str(lb_csv), artifact_path="tables")
+            tracking.log_artifact(str(lb_json), artifact_path="tables")
 
         # Optimization Plot
         # Optimization History Plot
         fig_history = optuna.visualization.plot_optimization_history(study)
-        mlflow.log_figure(fig_history, "plots/optimization_history.html")
+        tracking.log_figure(fig_history, "plots/optimization_history.html")
 
         # Optimization Hyperparameter Importance Plot
         fig_importances = optuna.visualization.plot_param_importances(study)
-        mlflow.log_figure(fig_importances, "plots/param_importances.html")
+        tracking.log_figure(fig_importances, "plots/param_importances.html")
 
         # Log a fit model instance
         spec = get_model_spec(model_name)
-        final_model = spec.build(best_params)
-        pipe = Pipeline([("preprocessor", preprocessor), ("model", final_model)])
-        pipe.fit(X_train, y_train)
+        final_model = spec.build(best_params, preprocessor)
+        pipe = plan.configure(Pipeline([("preprocessor", preprocessor), ("model", final_model)]), refit=True)
+        pipe = fit_pipeline(pipe, X_train, y_train, feature_cache)
 
         # Log the residuals plot
         residuals = plot_residuals(pipe, X_test, y_test)
-        mlflow.log_figure(figure=residuals, artifact_file="plots/residuals.png")
+        tracking.log_figure(figure=residuals, artifact_file="plots/residuals.png")
 
         artifact_path = f"best_model_{model_name}"
 
@@ -285,13 +579,16 @@ def tune_model(
         signature_out = pipe.predict(signature_example)
         signature = infer_signature(signature_example, signature_out)
 
-        mlflow.sklearn.log_model(
-            sk_model=pipe,
-            # name=artifact_path,
-            artifact_path=artifact_path,
-            signature=signature,
-            input_example=signature_example,
-        )
+        with tracking.timed():
+            mlflow.sklearn.log_model(
+                sk_model=pipe,
+                # name=artifact_path,
+                artifact_path=artifact_path,
+                signature=signature,
+                input_example=signature_example,
+                code_paths=[CODE_PATH],
+                serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_PICKLE,
+            )
 
         # Get the logged model uri so that we can load it from the artifact store
         model_uri = mlflow.get_artifact_uri(artifact_path)
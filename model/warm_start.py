@@ -0,0 +1,187 @@
+"""
+Persistent tuning studies, keyed by what their trials were scored on, and warm starts from earlier ones.
+
+A study's trials are only comparable under the same model, feature set (the preprocessor's configuration) and
+training data. ``StudyKey`` fingerprints the three; in a persistent Optuna storage the study is named after it, so:
+
+- a run on the same model, feature set and data continues the stored study: its sampler learns from every
+  earlier trial;
+- a run on refreshed data starts a new study, seeded (``warm_start``) with the best configurations of the most
+  similar earlier study of the same model and feature set, provided the two datasets share enough rows.
+
+Dataset similarity is the Jaccard index of their sets of rows, estimated from bottom-k sketches of the row hashes
+(the ``_SKETCH_SIZE`` smallest ones) kept in the study's user attributes.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import optuna
+import pandas as pd
+from loguru import logger
+from sklearn.base import BaseEstimator
+
+from application.dataset.checkpoints import fingerprint, frame_fingerprint
+
+# bump when the preprocessing code changes the features in a way its parameters do not show
+FEATURE_SET_VERSION = 1
+_SKETCH_SIZE = 512
+_TARGET_COLUMN = "__target__"
+
+
+def _stable_repr(value) -> str:
+    """``repr`` without memory addresses: estimators, classes and functions by qualified name."""
+    if isinstance(value, BaseEstimator):  # its parameters are listed on their own
+        value = type(value)
+    if isinstance(value, type) or callable(value):
+        return f"{getattr(value, '__module__', '')}.{getattr(value, '__qualname__', type(value).__qualname__)}"
+    if isinstance(value, list | tuple):
+        return "(" + ", ".join(_stable_repr(v) for v in value) + ")"
+    if isinstance(value, dict):
+        return "{" + ", ".join(f"{k!r}: {_stable_repr(v)}" for k, v in sorted(value.items())) + "}"
+    return repr(value)
+
+
+def feature_set_key(preprocessor: BaseEstimator) -> str:
+    """
+    Fingerprint of the (unfitted) preprocessor's configuration and ``FEATURE_SET_VERSION``, ``n_jobs`` aside (as
+    in ``feature_cache.preprocessor_key``): the parallelism plan does not change the features.
+    """
+    params = sorted(
+        (k, v) for k, v in preprocessor.get_params(deep=True).items() if k != "n_jobs" and not k.endswith("__n_jobs")
+    )
+    return fingerprint(FEATURE_SET_VERSION, _stable_repr(preprocessor), [(k, _stable_repr(v)) for k, v in params])
+
+
+def _training_frame(X: pd.DataFrame, y: pd.Series) -> pd.DataFrame:
+    return X.assign(**{_TARGET_COLUMN: np.asarray(y)})
+
+
+def _row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    try:
+        hashes = pd.util.hash_pandas_object(frame, index=False)
+    except TypeError:  # unhashable cells (e.g. lists): hash their text
+        hashes = pd.util.hash_pandas_object(frame.astype(str), index=False)
+    return np.unique(hashes.to_numpy())
+
+
+def row_sketch(X: pd.DataFrame, y: pd.Series, size: int = _SKETCH_SIZE) -> list[int]:
+    """Bottom-k sketch of the training rows: the ``size`` smallest distinct row hashes (index ignored)."""
+    return [int(h) for h in _row_hashes(_training_frame(X, y))[:size]]
+
+
+def jaccard_estimate(a: Sequence[int], b: Sequence[int], size: int = _SKETCH_SIZE) -> float:
+    """Jaccard index of two row sets, estimated from their bottom-k sketches."""
+    union = np.union1d(a, b)[:size]
+    if len(union) == 0:
+        return 1.0
+    both = np.intersect1d(np.intersect1d(a, b), union)
+    return len(both) / len(union)
+
+
+@dataclass(frozen=True)
+class StudyKey:
+    """What a study's trials were scored on; stored in the study's user attributes."""
+
+    model_name: str
+    feature_set: str
+    dataset: str
+    n_rows: int
+    sketch: tuple[int, ...]
+
+    @classmethod
+    def of(cls, model_name: str, preprocessor: BaseEstimator, X: pd.DataFrame, y: pd.Series) -> StudyKey:
+        return cls(
+            model_name=model_name,
+            feature_set=feature_set_key(preprocessor),
+            dataset=frame_fingerprint(_training_frame(X, y)),
+            n_rows=len(X),
+            sketch=tuple(row_sketch(X, y)),
+        )
+
+    @property
+    def study_name(self) -> str:
+        return f"{self.model_name}-fs{self.feature_set[:8]}-ds{self.dataset[:12]}"
+
+    def save(self, study: optuna.Study) -> None:
+        for k, v in asdict(self).items():
+            study.set_user_attr(f"key_{k}", list(v) if isinstance(v, tuple) else v)
+
+    @classmethod
+    def load(cls, user_attrs: dict) -> StudyKey | None:
+        try:
+            attrs = {k: user_attrs[f"key_{k}"] for k in cls.__dataclass_fields__}
+        except KeyError:
+            return None
+        return cls(**{**attrs, "sketch": tuple(attrs["sketch"])})
+
+
+@dataclass
+class WarmStart:
+    """The earlier study a new one was seeded from (``source=None``: cold start)."""
+
+    source: str | None = None
+    similarity: float | None = None
+    n_enqueued: int = 0
+
+
+def check_study_key(study: optuna.Study, key: StudyKey) -> None:
+    """Record ``key`` on a new study; warn when a stored study was scored on other data or features."""
+    stored = StudyKey.load(study.user_attrs)
+    if stored is None:
+        key.save(study)
+    elif (stored.feature_set, stored.dataset) != (key.feature_set, key.dataset):
+        logger.warning(
+            f"Study {study.study_name!r} holds trials scored on another feature set or dataset; its objective "
+            "values are not comparable with this run's (use a new study name)"
+        )
+
+
+def warm_start(
+    study: optuna.Study,
+    storage: optuna.storages.BaseStorage,
+    key: StudyKey,
+    n_configs: int = 10,
+    min_similarity: float = 0.7,
+) -> WarmStart:
+    """
+    Seed an empty ``study`` with the ``n_configs`` best configurations of the most similar earlier study in
+    ``storage`` (same model and feature set, dataset Jaccard similarity at least ``min_similarity``).
+
+    The configurations are enqueued: they are the study's first trials, re-scored on the current data.
+    """
+    if n_configs <= 0 or study.get_trials(deepcopy=False):
+        return WarmStart()
+    best_name, best_similarity = None, -1.0
+    for summary in optuna.get_all_study_summaries(storage, include_best_trial=False):
+        earlier = StudyKey.load(summary.user_attrs)
+        if (
+            summary.study_name == study.study_name
+            or earlier is None
+            or (earlier.model_name, earlier.feature_set) != (key.model_name, key.feature_set)
+        ):
+            continue
+        similarity = jaccard_estimate(earlier.sketch, key.sketch)
+        if similarity > best_similarity:
+            best_name, best_similarity = summary.study_name, similarity
+    if best_name is None or best_similarity < min_similarity:
+        logger.info(
+            f"Cold start for study {study.study_name!r}: no earlier {key.model_name} study on similar data "
+            f"(best similarity: {max(best_similarity, 0.0):.2f}, needed {min_similarity:.2f})"
+        )
+        return WarmStart(similarity=best_similarity if best_name else None)
+
+    source = optuna.load_study(study_name=best_name, storage=storage)
+    completed = source.get_trials(deepcopy=False, states=(optuna.trial.TrialState.COMPLETE,))
+    top = sorted(completed, key=lambda t: t.value, reverse=source.direction == optuna.study.StudyDirection.MAXIMIZE)
+    for trial in top[:n_configs]:
+        study.enqueue_trial(trial.params, user_attrs={"warm_start_from": f"{best_name}#{trial.number}"})
+    n_enqueued = min(n_configs, len(top))
+    logger.info(
+        f"Warm start for study {study.study_name!r}: {n_enqueued} best configuration(s) of {best_name!r} "
+        f"(dataset similarity {best_similarity:.2f})"
+    )
+    return WarmStart(source=best_name, similarity=best_similarity, n_enqueued=n_enqueued)
@@ -1,10 +1,12 @@
 import json
+from collections.abc import Sequence
 
 from loguru import logger
 
 from application.dataset.io import load_model_data, split_data
 from application.preprocessing import build_preprocessor
-from model import train_and_compare, tune_model
+from application.utils.shared_data import shared_frame
+from model import FoldFeatureCache, get_model_spec, plan_parallelism, train_and_compare, tune_model
 
 
 def autotune_pipeline(
@@ -14,49 +16,88 @@ def autotune_pipeline(
     cv_folds: int = 3,
     scoring: str = "neg_mean_squared_error",
     best_model_registry_name: str = "ubereats-price-predictor",
+    text_features: str = "tfidf",
+    n_workers: int = 1,
+    storage: str | None = None,
+    study_name: str | None = None,
+    pruner: str = "median",
+    prune_iterations: bool = True,
+    trial_artifacts: str = "top-k",
+    top_k: int = 3,
+    fidelities: Sequence[float] = (1.0,),
+    warm_start_trials: int = 10,
+    warm_start_similarity: float = 0.7,
 ) -> dict:
     """
     Run the end-to-end pipeline for the selected models.
+    ``text_features`` selects the ingredient featurizer of the preprocessor ("tfidf" or "hashing"); each model
+    gets the feature encoding of its registry entry (``ModelSpec.encoding``), one preprocessor per encoding.
+    ``n_workers`` tuning processes per model share an Optuna study in ``storage`` (see ``tune_model``); with a
+    ``study_name`` prefix, each model's study is ``<study_name>-<model>``, otherwise a persistent ``storage``
+    names it after the model, feature set and training data, and ``warm_start_trials``/``warm_start_similarity``
+    seed a new one from the most similar earlier study. ``pruner`` and ``prune_iterations``
+    control how unpromising trials are stopped early, ``trial_artifacts``/``top_k`` which trials get their pipeline
+    refitted and logged, and ``fidelities`` the multi-fidelity schedule of the trials (see ``tune_model``).
     Returns the comparison results dict (and logs info).
     """
     logger.info(f"Loading data from {data_path}")
     X_train, X_test, y_train, y_test = split_data(load_model_data(data_path))
 
-    logger.info("Building preprocessor")
-    preprocessor = build_preprocessor()
+    encodings = {model_name: get_model_spec(model_name).encoding for model_name in model_names}
+    preprocessors = {}
+    for encoding in dict.fromkeys(encodings.values()):
+        logger.info(f"Building {encoding} preprocessor ({text_features} ingredient features)")
+        preprocessors[encoding] = build_preprocessor(text_features=text_features, encoding=encoding)
 
-    tuned_models = {}
-    for model_name in model_names:
-        if model_name == "lr":
-            logger.info(f"Skipping tuning for {model_name}, using default params.")
-            tuned_models[model_name] = {}  # or your default params if any
-            continue
-        logger.info(f"Starting tuning for {model_name}")
-        best_params, best_metric = tune_model(
+    # written once, attached by every CV/tuning worker instead of being pickled into each fold task;
+    # the preprocessor is fitted once per CV fold and reused by every trial and model
+    cache_jobs = plan_parallelism(cv_folds).fold_jobs
+    with shared_frame(X_train) as X_train, FoldFeatureCache(X_train, y_train, n_jobs=cache_jobs) as feature_cache:
+        tuned_models = {}
+        for model_name in model_names:
+            if model_name == "lr":
+                logger.info(f"Skipping tuning for {model_name}, using default params.")
+                tuned_models[model_name] = {}  # or your default params if any
+                continue
+            logger.info(f"Starting tuning for {model_name}")
+            best_params, best_metric = tune_model(
+                X_train,
+                y_train,
+                X_test,
+                y_test,
+                preprocessors[encodings[model_name]],
+                model_name=model_name,
+                n_trials=n_trials,
+                cv_folds=cv_folds,
+                scoring_criterion=scoring,
+                feature_cache=feature_cache,
+                n_workers=n_workers,
+                storage=storage,
+                study_name=f"{study_name}-{model_name}" if study_name else None,
+                pruner=pruner,
+                prune_iterations=prune_iterations,
+                trial_artifacts=trial_artifacts,
+                top_k=top_k,
+                fidelities=fidelities,
+                warm_start_trials=warm_start_trials,
+                warm_start_similarity=warm_start_similarity,
+            )
+            logger.info(f"Tuning done for {model_name}: Best Params: {best_params}, Best Metric: {best_metric}")
+            tuned_models[model_name] = best_params
+
+        logger.info("Running model comparison")
+        results, best_model_name, model_uri = train_and_compare(
+            tuned_models,
             X_train,
             y_train,
             X_test,
             y_test,
-            preprocessor,
-            model_name=model_name,
-            n_trials=n_trials,
+            preprocessors,
             cv_folds=cv_folds,
             scoring_criterion=scoring,
+            best_model_registry_name=best_model_registry_name,
+            feature_cache=feature_cache,
         )
-        logger.info(f"Tuning done for {model_name}: Best Params: {best_params}, Best Metric: {best_metric}")
-        tuned_models[model_name] = best_params
-
-    logger.info("Running model comparison")
-    results, best_model_name, model_uri = train_and_compare(
-        tuned_models,
-        X_train,
-        y_train,
-        X_test,
-        y_test,
-        preprocessor,
-        scoring_criterion=scoring,
-        best_model_registry_name=best_model_registry_name,
-    )
 
     logger.info(f"Best model: {best_model_name}, URI: {model_uri}")
     logger.info(f"Comparison results:\n{json.dumps(results, indent=2)}")
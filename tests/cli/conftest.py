@@ -15,6 +15,12 @@ if str(PROJECT_ROOT) not in sys.path:
 # Shared state object the tests assert against
 _CLI_STATE = SimpleNamespace(
     generate_calls=0,
+    generate_engine=None,
+    generate_force=False,
+    generate_chunk_rows=None,
+    generate_cfg=None,
+    refresh_calls=0,
+    refresh_full=False,
     dwh_export_calls=0,
     autotune_calls=[],
 )
@@ -39,20 +45,49 @@ def _install_cli_stubs():
     config_mod.apply_global_settings = lambda: None
     application.config = config_mod
 
-    # application.dataset.generate_training_sample
+    # application.dataset.generate_training_sample / refresh_training_sample
     dataset_mod = importlib.import_module("application.dataset")
 
-    def generate_training_sample():
+    def generate_training_sample(cfg=None, force=False):
         _CLI_STATE.generate_calls += 1
+        _CLI_STATE.generate_engine = getattr(cfg, "engine", None)
+        _CLI_STATE.generate_force = force
+        _CLI_STATE.generate_chunk_rows = getattr(cfg, "chunk_rows", None)
+        _CLI_STATE.generate_cfg = cfg
+        return {"ok": True}
+
+    def refresh_training_sample(cfg=None, full=False):
+        _CLI_STATE.refresh_calls += 1
+        _CLI_STATE.refresh_full = full
+        _CLI_STATE.generate_cfg = cfg
         return {"ok": True}
 
     dataset_mod.generate_training_sample = generate_training_sample
+    dataset_mod.refresh_training_sample = refresh_training_sample
     application.dataset = dataset_mod
 
     # ----- pipelines (standalone module) -----
     pipelines = types.ModuleType("pipelines")
 
-    def autotune_pipeline(model_names, data_path, n_trials, cv_folds, scoring, best_model_registry_name):
+    def autotune_pipeline(
+        model_names,
+        data_path,
+        n_trials,
+        cv_folds,
+        scoring,
+        best_model_registry_name,
+        text_features,
+        n_workers=1,
+        storage=None,
+        study_name=None,
+        pruner="median",
+        prune_iterations=True,
+        trial_artifacts="top-k",
+        top_k=3,
+        fidelities=(1.0,),
+        warm_start_trials=10,
+        warm_start_similarity=0.7,
+    ):
         _CLI_STATE.autotune_calls.append(
             dict(
                 model_names=tuple(model_names),
@@ -61,6 +96,17 @@ def _install_cli_stubs():
                 cv_folds=cv_folds,
                 scoring=scoring,
                 best_model_registry_name=best_model_registry_name,
+                text_features=text_features,
+                n_workers=n_workers,
+                storage=storage,
+                study_name=study_name,
+                pruner=pruner,
+                prune_iterations=prune_iterations,
+                trial_artifacts=trial_artifacts,
+                top_k=top_k,
+                fidelities=tuple(fidelities),
+                warm_start_trials=warm_start_trials,
+                warm_start_similarity=warm_start_similarity,
             )
         )
         return {"best_model_name": (model_names or ["dummy"])[0]}
@@ -90,6 +136,9 @@ def _install_cli_stubs():
         "SAMPLED_DATA_PATH": "data/sampled-final-data.csv",
         "N_TRIALS": 3,
         "CV_FOLDS": 2,
+        "HPO_WORKERS": 1,
+        "OPTUNA_STORAGE": None,
+        "OPTUNA_STUDY_NAME": None,
         "SCORING": "neg_root_mean_squared_error",
         # match the test's expectation:
         "BEST_MODEL_REGISTRY_NAME": "ubereats-menu-price-predictor",
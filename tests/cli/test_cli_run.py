@@ -102,6 +102,118 @@ def test_cli_top_level_runs_autotune_pipeline(cli_stub_state, monkeypatch):
     call = cli_stub_state.autotune_calls[0]
     assert len(call["model_names"]) >= 2
     assert call["best_model_registry_name"] == "ubereats-menu-price-predictor"
+    assert call["text_features"] == "tfidf"
+
+
+def test_cli_top_level_passes_text_features(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    res = CliRunner().invoke(run_mod.cli, ["--text-features", "hashing"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["text_features"] == "hashing"
+    assert "Ingredient features: hashing" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--text-features", "bow"])
+    assert res.exit_code != 0
+
+
+def test_cli_top_level_passes_tuning_workers_and_storage(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    args = ["--n-workers", "4", "--optuna-storage", "sqlite:///optuna.db", "--study-name", "menu"]
+    res = CliRunner().invoke(run_mod.cli, args)
+    assert res.exit_code == 0, res.output
+    call = cli_stub_state.autotune_calls[-1]
+    assert call["n_workers"] == 4
+    assert call["storage"] == "sqlite:///optuna.db"
+    assert call["study_name"] == "menu"
+    assert "Tuning workers: 4, Optuna storage: sqlite:///optuna.db" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--n-workers", "0"])
+    assert res.exit_code != 0
+
+
+def test_cli_top_level_passes_pruning_options(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    res = CliRunner().invoke(run_mod.cli, [])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["pruner"] == "median"
+    assert cli_stub_state.autotune_calls[-1]["prune_iterations"] is True
+
+    res = CliRunner().invoke(run_mod.cli, ["--pruner", "halving", "--no-prune-iterations"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["pruner"] == "halving"
+    assert cli_stub_state.autotune_calls[-1]["prune_iterations"] is False
+    assert "Pruner: halving (boosting iterations: off)" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--pruner", "threshold"])
+    assert res.exit_code != 0
+
+
+def test_cli_top_level_passes_trial_artifact_policy(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    res = CliRunner().invoke(run_mod.cli, [])
+    assert res.exit_code == 0, res.output
+    assert (cli_stub_state.autotune_calls[-1]["trial_artifacts"], cli_stub_state.autotune_calls[-1]["top_k"]) == (
+        "top-k",
+        3,
+    )
+    assert "Trial artifacts: top-3" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--trial-artifacts", "all"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["trial_artifacts"] == "all"
+
+    res = CliRunner().invoke(run_mod.cli, ["--trial-artifacts", "best"])
+    assert res.exit_code != 0
+
+
+def test_cli_top_level_passes_fidelity_schedule(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    res = CliRunner().invoke(run_mod.cli, [])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["fidelities"] == (1.0,)
+
+    res = CliRunner().invoke(run_mod.cli, ["--fidelities", "0.1, 0.3,1"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.autotune_calls[-1]["fidelities"] == (0.1, 0.3, 1.0)
+    assert "Fidelities: 0.1, 0.3, 1" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--fidelities", "tenth,1"])
+    assert res.exit_code != 0
+
+
+def test_cli_top_level_passes_warm_start_options(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod, "configure_mlflow_backend", lambda: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    res = CliRunner().invoke(run_mod.cli, [])
+    assert res.exit_code == 0, res.output
+    call = cli_stub_state.autotune_calls[-1]
+    assert (call["warm_start_trials"], call["warm_start_similarity"]) == (10, 0.7)
+
+    res = CliRunner().invoke(run_mod.cli, ["--warm-start-trials", "0", "--warm-start-similarity", "0.9"])
+    assert res.exit_code == 0, res.output
+    call = cli_stub_state.autotune_calls[-1]
+    assert (call["warm_start_trials"], call["warm_start_similarity"]) == (0, 0.9)
+    assert "Warm start: 0 best configuration(s) of a study sharing >= 90% of the rows" in res.output
+
+    res = CliRunner().invoke(run_mod.cli, ["--warm-start-similarity", "1.5"])
+    assert res.exit_code != 0
 
 
 def test_subcommand_generate_train_sample_calls_dataset(cli_stub_state, monkeypatch):
@@ -113,6 +225,85 @@ def test_subcommand_generate_train_sample_calls_dataset(cli_stub_state, monkeypa
     res = runner.invoke(run_mod.cli, ["generate-train-sample"])
     assert res.exit_code == 0, res.output
     assert cli_stub_state.generate_calls == 1
+    assert cli_stub_state.generate_engine == "pandas"
+
+
+def test_subcommand_generate_train_sample_passes_engine(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+    monkeypatch.setattr(run_mod.mlflow, "set_tracking_uri", lambda *a, **k: None, raising=False)
+    monkeypatch.setattr(run_mod.mlflow, "set_experiment", lambda *a, **k: None, raising=False)
+
+    runner = CliRunner()
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--engine", "polars"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.generate_engine == "polars"
+
+
+def test_subcommand_generate_train_sample_passes_chunk_rows(cli_stub_state, monkeypatch):
+    run_mod = _import_cli()
+
+    runner = CliRunner()
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--chunk-rows", "1000"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.generate_chunk_rows == 1000
+
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--chunk-rows", "0"])
+    assert res.exit_code != 0
+
+
+def test_subcommand_generate_train_sample_passes_row_sampling(cli_stub_state):
+    run_mod = _import_cli()
+
+    runner = CliRunner()
+    args = ["generate-train-sample", "--sample-strata", "state_id, category", "--per-stratum", "50"]
+    res = runner.invoke(run_mod.cli, [*args, "--sample-size", "400"])
+    assert res.exit_code == 0, res.output
+    cfg = cli_stub_state.generate_cfg
+    assert (cfg.sample_strata, cfg.sample_per_stratum, cfg.sample_size) == (("state_id", "category"), 50, 400)
+
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--per-stratum", "50"])
+    assert res.exit_code != 0
+    assert "--sample-strata" in res.output
+
+
+def test_subcommand_generate_train_sample_passes_outlier_options(cli_stub_state):
+    run_mod = _import_cli()
+
+    runner = CliRunner()
+    args = ["generate-train-sample", "--outlier-groups", "category,state_id", "--outlier-sketch-compression", "200"]
+    res = runner.invoke(run_mod.cli, args)
+    assert res.exit_code == 0, res.output
+    cfg = cli_stub_state.generate_cfg
+    assert (cfg.outlier_groups, cfg.outlier_sketch_compression) == (("category", "state_id"), 200)
+
+
+def test_subcommand_generate_train_sample_csv_export_flag(cli_stub_state):
+    run_mod = _import_cli()
+
+    runner = CliRunner()
+    res = runner.invoke(run_mod.cli, ["generate-train-sample"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.generate_cfg.export_csv
+
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--no-csv-export"])
+    assert res.exit_code == 0, res.output
+    assert not cli_stub_state.generate_cfg.export_csv
+
+
+def test_subcommand_generate_train_sample_incremental(cli_stub_state):
+    run_mod = _import_cli()
+    generate_calls = cli_stub_state.generate_calls
+
+    runner = CliRunner()
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--incremental", "--drift-threshold", "0.2"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.refresh_calls == 1 and not cli_stub_state.refresh_full
+    assert cli_stub_state.generate_cfg.drift_threshold == 0.2
+    assert cli_stub_state.generate_calls == generate_calls
+
+    res = runner.invoke(run_mod.cli, ["generate-train-sample", "--incremental", "--force"])
+    assert res.exit_code == 0, res.output
+    assert cli_stub_state.refresh_calls == 2 and cli_stub_state.refresh_full
 
 
 def test_subcommand_dwh_export_calls_pipeline(cli_stub_state, monkeypatch):
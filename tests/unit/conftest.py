@@ -1,6 +1,7 @@
 import importlib
 import sys
 import types
+from collections import namedtuple
 from pathlib import Path
 from types import SimpleNamespace
 
@@ -32,12 +33,19 @@ def _install_minimal_stubs():
         SAMPLED_DATA_PATH="data/sampled-final-data.csv",
         TEST_SIZE=0.2,
         SEED=33,
+        TRAINING_CORES=None,
+        HPO_WORKERS=1,
+        OPTUNA_STORAGE=None,
+        OPTUNA_STUDY_NAME=None,
         DATABASE_HOST="mongodb://localhost:27017",
         DATABASE_NAME="db",
         DATABASE_COLLECTION="restaurants",
         RESTAURANT_DATA_PATH="restaurants.csv",
         MENU_DATA_PATH="restaurant-menus.csv",
         NER_MODEL="Dizex/InstaFoodRoBERTa-NER",
+        DATASET_CACHE_DIR=None,
+        SAMPLING_CHECKPOINT_DIR=None,
+        SAMPLE_STATE_DIR=None,
         # NOTE: intentionally NOT setting MLFLOW_BACKEND here.
     )
 
@@ -79,6 +87,12 @@ def _install_minimal_stubs():
     mlflow_models.infer_signature = lambda *a, **k: None
     sys.modules["mlflow.models"] = mlflow_models
 
+    mlflow_entities = types.ModuleType("mlflow.entities")
+    mlflow_entities.Metric = namedtuple("Metric", "key value timestamp step")
+    mlflow_entities.Param = namedtuple("Param", "key value")
+    mlflow_entities.RunTag = namedtuple("RunTag", "key value")
+    sys.modules["mlflow.entities"] = mlflow_entities
+
     # ----- kagglehub (block accidental downloads) -----
     kagglehub = types.ModuleType("kagglehub")
 
@@ -88,8 +102,12 @@ def _install_minimal_stubs():
     def dataset_load(adapter, handle, path, pandas_kwargs=None):
         raise RuntimeError("dataset_load stub should not be called in unit tests.")
 
+    def dataset_download(handle, path=None, force_download=False):
+        raise RuntimeError("dataset_download stub should not be called in unit tests.")
+
     kagglehub.KaggleDatasetAdapter = _Adapter
     kagglehub.dataset_load = dataset_load
+    kagglehub.dataset_download = dataset_download
     sys.modules["kagglehub"] = kagglehub
 
     # ----- application.preprocessing constants used by splitter -----
@@ -97,6 +115,9 @@ def _install_minimal_stubs():
     app_pre = types.ModuleType("application.preprocessing")
     app_pre.DATA_SPLIT_COL = "category"
     app_pre.TARGET_COL = "price"
+    app_pre.CATEGORICAL_COLS = ["category", "price_range", "state_id"]
+    app_pre.NUMERIC_COLS = ["cost_of_living_index", "density"]
+    app_pre.DEFAULT_TEXT_COMPONENTS = 32
 
     def _stub_build_preprocessor():
         # minimal placeholder so pipelines.autotune can import it;
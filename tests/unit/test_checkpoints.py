@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+
+@pytest.mark.unit
+def test_fingerprint_tracks_content_and_params():
+    from application.dataset.checkpoints import fingerprint
+
+    df = pd.DataFrame({"a": [1, 2], "b": ["x", "y"]})
+
+    assert fingerprint(df, ("wi",)) == fingerprint(df.copy(), ("wi",))
+    assert fingerprint(df, ("wi",)) != fingerprint(df, ("tx",))
+    assert fingerprint(df) != fingerprint(df.assign(b=["x", "z"]))
+    assert fingerprint(df) != fingerprint(df.astype({"a": "int32"}))
+
+
+@pytest.mark.unit
+def test_checkpoint_store_roundtrip_and_disabled(tmp_path):
+    from application.dataset.checkpoints import CheckpointStore
+
+    frames = {"sample": pd.DataFrame({"ingredients": [["tomato", "basil"], []]})}
+    store = CheckpointStore(tmp_path)
+    assert not store.exists("ner", "abc")
+
+    store.save("ner", "abc", frames)
+    assert store.exists("ner", "abc")
+    pd.testing.assert_frame_equal(store.load("ner", "abc")["sample"], frames["sample"])
+
+    disabled = CheckpointStore(None)
+    disabled.save("ner", "abc", frames)
+    assert not disabled.exists("ner", "abc")
+
+
+@pytest.mark.unit
+def test_source_fingerprint_follows_the_code(tmp_path, monkeypatch):
+    from application.dataset.checkpoints import source_fingerprint
+
+    package = tmp_path / "stagepkg"
+    (package / "sub").mkdir(parents=True)
+    (package / "__init__.py").write_text("")
+    (package / "sub" / "__init__.py").write_text("")
+    (package / "sub" / "stage.py").write_text("def run(frames):\n    return frames\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    before = source_fingerprint("stagepkg")
+    assert source_fingerprint("stagepkg") == before
+    (package / "sub" / "stage.py").write_text("def run(frames):\n    return frames.dropna()\n")
+    assert source_fingerprint("stagepkg") != before
@@ -0,0 +1,126 @@
+import pandas as pd
+import pytest
+
+
+def _frames():
+    restaurants = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "score": 4.0,
+            "ratings": 10,
+            "category": "House",
+            "price_range": ["$$", "$", "$$$", "$$", None],
+            "full_address": [
+                "1 Main St, Appleton, WI, 54911",
+                "2 Oak Ave, Appleton, WI, 54911",
+                "3 Elm St, Madison, WI, 53703",
+                "4 Pine Rd, Austin, TX, 73301",
+                "5 Lake Dr, Austin, TX, 73301",
+            ],
+            "lat": 0.0,
+            "lng": 0.0,
+        }
+    )
+    menus = pd.DataFrame(
+        {
+            "restaurant_id": [1, 1, 1, 1, 2, 2, 3, 3, 3, 4, 4, 4, 4, 5],
+            "category": ["Salads", "Salads", "Salads", "Drinks", "Salads", "Wraps", "Salads", "Salads", "Wraps"]
+            + ["Wraps", "Wraps", "Salads", "Salads", "Salads"],
+            "description": ["Tomato &amp; basil", "Tomato &amp; basil", "Greens", "Soda", "Caesar", "Chicken"]
+            + ["Kale", "Beet", "Tuna", "Falafel", "Hummus", "Cobb", "Quinoa", "Corn"],
+            "price": ["9.0 USD", "9.0 USD", "8.5 USD", "2.0 USD", "10.0 USD", "11.0 USD", "7.0 USD", "99.0 USD"]
+            + ["9.5 USD", "8.0 USD", "8.0 USD", "12.0 USD", "10.5 USD", "6.0 USD"],
+        }
+    )
+    index = pd.DataFrame(
+        [
+            {"state_id": "wi", "city": "appleton", "cost_of_living_index": 92.0},
+            {"state_id": "wi", "city": "madison", "cost_of_living_index": 101.0},
+            {"state_id": "tx", "city": "austin", "cost_of_living_index": 110.0},
+        ]
+    )
+    density = pd.DataFrame(
+        [
+            {"city": "Appleton", "state_id": "WI", "density": "1156"},
+            {"city": "Madison", "state_id": "WI", "density": "3000"},
+            {"city": "Austin", "state_id": "TX", "density": "3100"},
+        ]
+    )
+    states = pd.DataFrame([{"Abbreviation": "WI", "State": "Wisconsin"}, {"Abbreviation": "TX", "State": "Texas"}])
+    return {
+        "restaurants.csv": restaurants,
+        "restaurant-menus.csv": menus,
+        "index.csv": index,
+        "density.csv": density,
+        "states.csv": states,
+    }
+
+
+@pytest.mark.unit
+def test_restaurant_aligned_chunks_never_split_a_restaurant():
+    from application.dataset.chunked import _restaurant_aligned
+
+    ids = [1, 1, 1, 2, 3, 3, 3, 3, 3, 4]
+    chunks = [pd.DataFrame({"restaurant_id": ids[i : i + 3]}) for i in range(0, len(ids), 3)]
+
+    out = [c["restaurant_id"].tolist() for c in _restaurant_aligned(chunks)]
+
+    assert out == [[1, 1, 1, 2], [3, 3, 3, 3, 3], [4]]
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("chunk_rows", [1, 3, 100])
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"sample_strata": ("state_id",), "sample_per_stratum": 2},
+        {"outlier_groups": ("category", "state_id")},
+    ],
+)
+def test_chunked_sample_equals_in_memory_sample(monkeypatch, tmp_path, chunk_rows, options):
+    import application.dataset.io.loader as loader_mod
+    import application.dataset.sampling as sm
+    from application.dataset import processing as proc
+    from application.dataset.config import Config
+    from application.dataset.io import read_training_sample
+
+    frames = _frames()
+    for name, df in frames.items():
+        df.to_csv(tmp_path / name, index=False)
+    monkeypatch.setattr(loader_mod, "load_kaggle_dataset", lambda handle, path, pandas_kwargs=None: frames[path])
+    monkeypatch.setattr(loader_mod, "download_kaggle_file", lambda handle, path: str(tmp_path / path))
+    monkeypatch.setattr(proc, "extract_ingredients_series", lambda s, ner: s.map(lambda d: sorted(d.lower().split())))
+    monkeypatch.setattr(sm, "NERModelSingleton", lambda: type("NER", (), {"get_pipeline": lambda self: None})())
+
+    def config(path, **overrides):
+        return Config(
+            RESTAURANTS_DS="owner/restaurants",
+            MENUS_DS="owner/menus",
+            INDEX_DS="owner/index",
+            DENSITY_DS="owner/density",
+            STATES_DS="owner/states",
+            INDEX_FILE="index.csv",
+            DENSITY_FILE="density.csv",
+            STATES_FILE="states.csv",
+            DATASET_CACHE_DIR=None,
+            CHECKPOINT_DIR=None,
+            FINAL_SAMPLED_DATA_PATH=str(tmp_path / path),
+            top_states_filter=("wi", "tx"),
+            focus_categories=("Salads", "Wraps"),
+            top_cities_per_state=1,
+            **options,
+            **overrides,
+        )
+
+    in_memory = sm.generate_training_sample(config("in_memory.csv"))
+    assert sm.generate_training_sample(config("chunked.csv", chunk_rows=chunk_rows)) is None
+
+    assert not in_memory.empty
+    assert (tmp_path / "chunked.csv").read_text() == (tmp_path / "in_memory.csv").read_text()
+
+    def typed(path):
+        df = read_training_sample(tmp_path / path)
+        return df.astype({c: object for c in df.columns if df[c].dtype == "category"})
+
+    pd.testing.assert_frame_equal(typed("chunked.csv"), typed("in_memory.csv"))
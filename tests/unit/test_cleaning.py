@@ -1,4 +1,9 @@
 import pandas as pd
+import pytest
+
+# the cleaners filter frames and then set columns: they must do it on frames they own, with or without
+# pandas Copy-on-Write
+pytestmark = pytest.mark.filterwarnings("error::pandas.errors.SettingWithCopyWarning")
 
 
 def test_preprocess_menu_drops_invalid_and_parses_price(df_menu_raw):
@@ -74,3 +79,168 @@ def test_normalize_price_range_unknown_values_default_to_expensive():
     out = normalize_price_range(df)
 
     assert out["price_range"].tolist() == ["cheap", "expensive", "expensive", "expensive", "moderate"]
+
+
+def test_clean_ingredients_column_matches_per_element_cleaner():
+    import html
+
+    from bs4 import BeautifulSoup
+
+    from application.dataset.processing.cleaning import clean_ingredients_column
+
+    def reference(df, col="ingredients"):
+        out = df[df[col].apply(len) > 0].copy()
+        out[col] = out[col].map(lambda xs: list(set(y.lower() for y in xs)))
+        out[col] = out[col].map(
+            lambda xs: [html.unescape(BeautifulSoup(y.strip(), "html.parser").get_text(strip=True)).strip() for y in xs]
+        )
+        return out
+
+    df = pd.DataFrame(
+        {
+            "ingredients": [
+                ["Tomato", " tomato", "BASIL", "basil"],
+                [],
+                ["Mac &amp; Cheese", "<b>Ham</b>", "  ", "Fish &#38; Chips"],
+                ["onion"],
+            ],
+            "price": [1.0, 2.0, 3.0, 4.0],
+        }
+    )
+
+    out = clean_ingredients_column(df)
+    expected = reference(df)
+    assert out.index.tolist() == expected.index.tolist() == [0, 2, 3]
+    assert out["ingredients"].tolist() == expected["ingredients"].tolist()
+    assert "mac & cheese" in out.loc[2, "ingredients"] and "ham" in out.loc[2, "ingredients"]
+
+
+def test_clean_ingredients_column_all_empty_returns_empty_frame():
+    from application.dataset.processing.cleaning import clean_ingredients_column
+
+    out = clean_ingredients_column(pd.DataFrame({"ingredients": [[], []]}))
+    assert out.empty and "ingredients" in out.columns
+
+
+def test_build_address_fields_matches_split_parser():
+    from application.dataset.processing.cleaning import build_address_fields
+    from application.dataset.processing.dtypes import as_object
+
+    def reference(df):
+        df = df[df.full_address.str.split(",").apply(lambda x: len(x[-2].strip())) == 2].copy()
+        df = df[df.full_address.str.strip().str.lower().str.split(",").apply(lambda x: len(x[-3])) != 0].copy()
+        df["city"] = df.full_address.str.strip().str.lower().str.split(",").str[-3].str.strip()
+        df["state_id"] = df.full_address.str.strip().str.lower().str.split(",").str[-2].str.strip()
+        return df
+
+    df = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5, 6],
+            "full_address": [
+                "123 Main, Appleton, WI, 54911",
+                "45 Oak Ave, Suite 2, San Diego, CA, 92101",
+                "No State, Austin, Texas, 73301",
+                "9 Elm,  , UT, 84001",
+                "Salt Lake City, UT, 84101",
+                ", VA, 23220 ",
+            ],
+        }
+    )
+
+    out = build_address_fields(df)
+    assert isinstance(out["city"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(as_object(out), reference(df))
+    assert out["city"].tolist() == ["appleton", "san diego", "", "salt lake city"]
+    assert out["state_id"].tolist() == ["wi", "ca", "ut", "ut"]
+
+
+def test_build_address_fields_drops_short_addresses_and_keeps_zip():
+    from application.dataset.processing.cleaning import build_address_fields
+
+    df = pd.DataFrame({"id": [1, 2], "full_address": ["Appleton, WI", "1 St, Appleton, WI, 54911"]})
+    out = build_address_fields(df, keep_zip=True)
+    assert out["id"].tolist() == [2]
+    assert out["zip"].tolist() == ["54911"]
+
+
+def test_preprocess_menu_returns_categorical_category_without_mutating_input(df_menu_raw):
+    from application.dataset.processing.cleaning import preprocess_menu
+
+    snapshot = df_menu_raw.copy()
+    out = preprocess_menu(df_menu_raw)
+    assert isinstance(out["category"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df_menu_raw, snapshot)
+
+
+def test_preprocess_menu_matches_row_wise_cleaner():
+    import html
+
+    from application.dataset.processing import as_object
+    from application.dataset.processing.cleaning import preprocess_menu
+
+    def reference(df_menu):
+        def unescape(v):
+            return html.unescape(v) if pd.notnull(v) else v
+
+        df = df_menu.copy()
+        df["description"] = df.description.str.strip()
+        df.dropna(subset=["description"], inplace=True)
+        df["category"] = df.category.map(unescape).str.strip().str.normalize("NFKD")
+        df["description"] = df.description.map(unescape).str.strip().str.normalize("NFKD")
+        df = df[df.description.str.len() > 0].drop_duplicates()
+        df["price"] = df["price"].replace({"USD": ""}, regex=True).astype(float)
+        df = df[df["price"] != 0]
+        return df[df.category != "Picked for you"].copy()
+
+    rows = [
+        (1, "Fish &amp; Chips", "Cod &amp; fries ", "9.0 USD"),
+        (1, "Fish & Chips", "Cod & fries", "9.0 USD"),  # duplicate of the row above once unescaped
+        (1, "Fish & Chips", "Cod & fries", "9.00 USD"),  # same price, different raw text: kept
+        (2, " Salads ", "Café salad", "7.5 USD"),
+        (2, "Salads", "Café salad", "7.5 USD"),  # NFKD-equal to the row above
+        (2, "Salads", "&nbsp;", "5 USD"),  # blank after unescaping
+        (2, "Salads", None, "5 USD"),
+        (3, None, "Plain toast", "3 USD"),
+        (3, None, "Plain toast", "3 USD"),
+        (3, "Picked for you", "Toast", "3 USD"),
+        (3, "Sides", "Toast", "0 USD"),
+    ]
+    df = pd.DataFrame(rows, columns=["restaurant_id", "category", "description", "price"])
+
+    pd.testing.assert_frame_equal(as_object(preprocess_menu(df)), reference(df))
+
+    # numeric prices take the fast path
+    numeric = df.assign(price=df.price.str.replace(" USD", "").astype(float))
+    pd.testing.assert_frame_equal(as_object(preprocess_menu(numeric)), reference(numeric))
+
+
+def test_as_categorical_and_as_object_leave_their_input_alone():
+    from application.dataset.processing.dtypes import as_categorical, as_object
+
+    df = pd.DataFrame({"city": ["austin", "waco", "austin"], "price": [1.0, 2.0, 3.0]})
+    filtered = df[df["price"] > 1.0]
+
+    categorical = as_categorical(filtered, ["city"])
+    assert isinstance(categorical["city"].dtype, pd.CategoricalDtype)
+    assert filtered["city"].dtype == object and df["city"].dtype == object
+    assert as_object(categorical, ["city"])["city"].dtype == object
+    assert isinstance(categorical["city"].dtype, pd.CategoricalDtype)
+
+
+def test_preprocess_menu_keeps_distinct_rows_whose_hashes_collide(monkeypatch):
+    import numpy as np
+
+    from application.dataset.processing.cleaning import preprocess_menu
+
+    # every row hashes alike: only an exact comparison tells the distinct rows apart
+    monkeypatch.setattr(pd.util, "hash_pandas_object", lambda obj, **kw: pd.Series(np.zeros(len(obj), dtype="uint64")))
+    df = pd.DataFrame(
+        [
+            (1, "Salads", "Greek salad", "9.0"),
+            (1, "Salads", "Caesar salad", "9.0"),
+            (1, "Salads", "Caesar salad", "9.0"),
+        ],
+        columns=["restaurant_id", "category", "description", "price"],
+    )
+
+    assert preprocess_menu(df)["description"].tolist() == ["Greek salad", "Caesar salad"]
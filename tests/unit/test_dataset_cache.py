@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+
+@pytest.fixture
+def fake_kaggle(monkeypatch):
+    import application.dataset.io.loader as loader_mod
+
+    calls = []
+
+    def fake_loader(handle, path, pandas_kwargs=None):
+        calls.append((handle, path, dict(pandas_kwargs or {})))
+        df = pd.DataFrame({"id": ["1", "2", "3"], "lat": ["1.5", "2.5", "3.5"], "name": ["a", "b", "c"]})
+        if "usecols" in (pandas_kwargs or {}):
+            df = df[pandas_kwargs["usecols"]]
+        return df.astype((pandas_kwargs or {}).get("dtype", {}))
+
+    monkeypatch.setattr(loader_mod, "load_kaggle_dataset", fake_loader, raising=True)
+    return calls
+
+
+@pytest.mark.unit
+def test_cache_path_is_keyed_by_handle_and_version(tmp_path):
+    from application.dataset.io import dataset_cache_path
+
+    pinned = dataset_cache_path(tmp_path, "owner/ds/versions/12", "restaurants.csv")
+    unpinned = dataset_cache_path(tmp_path, "owner/ds", "restaurants.csv")
+
+    assert pinned == tmp_path / "owner" / "ds" / "12" / "restaurants.parquet"
+    assert unpinned == tmp_path / "owner" / "ds" / "latest" / "restaurants.parquet"
+
+
+@pytest.mark.unit
+def test_first_load_writes_cache_and_second_load_reads_it(tmp_path, fake_kaggle):
+    from application.dataset.io import dataset_cache_path, load_cached_dataset
+
+    dtypes = {"id": "int32", "lat": "float32"}
+    first = load_cached_dataset("owner/ds/versions/1", "r.csv", tmp_path, columns=["id", "lat"], dtypes=dtypes)
+    second = load_cached_dataset("owner/ds/versions/1", "r.csv", tmp_path, columns=["id", "lat"], dtypes=dtypes)
+
+    assert len(fake_kaggle) == 1  # CSV parsed once
+    assert fake_kaggle[0][2]["dtype"] == dtypes
+    assert dataset_cache_path(tmp_path, "owner/ds/versions/1", "r.csv").exists()
+    assert list(second.columns) == ["id", "lat"]
+    assert second.dtypes.astype(str).to_dict() == {"id": "int32", "lat": "float32"}
+    pd.testing.assert_frame_equal(first, second)
+
+    # the full file is cached, so other column selections are served from it too
+    names = load_cached_dataset("owner/ds/versions/1", "r.csv", tmp_path, columns=["name"])
+    assert names["name"].tolist() == ["a", "b", "c"]
+    assert len(fake_kaggle) == 1
+
+    load_cached_dataset("owner/ds/versions/1", "r.csv", tmp_path, refresh=True)
+    assert len(fake_kaggle) == 2
+
+
+@pytest.mark.unit
+def test_disabled_cache_loads_csv_with_pruned_columns(tmp_path, fake_kaggle):
+    from application.dataset.io import load_cached_dataset
+
+    df = load_cached_dataset("owner/ds", "r.csv", None, columns=["id"], dtypes={"id": "int32"})
+
+    assert list(df.columns) == ["id"]
+    assert fake_kaggle[0][2]["usecols"] == ["id"]
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.unit
+def test_iter_cached_dataset_streams_chunks_through_the_cache(tmp_path, monkeypatch):
+    import application.dataset.io.loader as loader_mod
+    from application.dataset.io import dataset_cache_path, iter_cached_dataset
+
+    csv_path = tmp_path / "menus.csv"
+    df = pd.DataFrame({"restaurant_id": range(10), "note": [None] * 4 + list("abcdef")})
+    df.to_csv(csv_path, index=False)
+    downloads = []
+    monkeypatch.setattr(
+        loader_mod, "download_kaggle_file", lambda handle, path: downloads.append(path) or str(csv_path)
+    )
+
+    kwargs = dict(cache_dir=tmp_path / "cache", chunk_rows=4, dtypes={"restaurant_id": "int32"})
+    first = list(iter_cached_dataset("owner/ds/versions/1", "menus.csv", **kwargs))
+    second = list(iter_cached_dataset("owner/ds/versions/1", "menus.csv", **kwargs))
+
+    assert len(downloads) == 1  # the second pass reads the cache
+    assert dataset_cache_path(tmp_path / "cache", "owner/ds/versions/1", "menus.csv").exists()
+    assert [len(c) for c in second] == [4, 4, 2]
+    for chunks in (first, second):
+        out = pd.concat(chunks, ignore_index=True)
+        assert out["restaurant_id"].dtype == "int32"
+        assert out["restaurant_id"].tolist() == list(range(10))
+        assert out["note"].iloc[4:].tolist() == list("abcdef")  # all-missing first chunk did not fix the type
+
+    no_cache = list(iter_cached_dataset("owner/ds", "menus.csv", None, chunk_rows=4, columns=["restaurant_id"]))
+    assert [list(c.columns) for c in no_cache] == [["restaurant_id"]] * 3
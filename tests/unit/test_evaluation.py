@@ -0,0 +1,101 @@
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+from model.evaluation import evaluate_model, iter_fold_scores
+from model.feature_cache import FoldFeatureCache
+from model.parallelism import plan_parallelism
+from model.registry import get_model_spec
+
+pytestmark = pytest.mark.unit
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+def _data(n=80):
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame({"category": rng.choice(["Salads", "Wraps", "Pizza"], n), "density": rng.random(n)})
+    y = pd.Series(X["density"] * 3 + (X["category"] == "Pizza") + rng.normal(0, 0.1, n), name="price")
+    return X, y
+
+
+def _pipe(model=None):
+    pre = ColumnTransformer(
+        [("cat", OneHotEncoder(handle_unknown="ignore"), ["category"]), ("num", MinMaxScaler(), ["density"])]
+    )
+    return Pipeline([("preprocessor", pre), ("model", model or Ridge())])
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_fold_batches_add_up_to_the_cv_scores(tmp_path, cached):
+    X, y = _data()
+    expected = evaluate_model(4, _pipe(), X, y, "neg_mean_squared_error")
+
+    with FoldFeatureCache(X, y, folder=tmp_path) as cache:
+        batches = list(
+            iter_fold_scores(
+                4, _pipe(), X, y, "neg_mean_squared_error", feature_cache=cache if cached else None, batch_size=3
+            )
+        )
+
+    assert [len(b) for b in batches] == [3, 1]
+    np.testing.assert_allclose(np.concatenate(batches), expected)
+
+
+def test_batches_follow_the_planned_fold_workers():
+    X, y = _data()
+    plan = plan_parallelism(5, "ridge", cores=2)
+
+    batches = list(iter_fold_scores(5, _pipe(), X, y, "neg_mean_squared_error", parallel_plan=plan))
+
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+
+def test_first_fold_fits_alone_with_its_validation_data():
+    X, y = _data()
+    seen = []
+
+    def fit_params(estimator, X_val, y_val):
+        seen.append((type(estimator).__name__, X_val.shape[0], len(y_val)))
+        return {}
+
+    scores = np.concatenate(
+        list(iter_fold_scores(4, _pipe(), X, y, "neg_mean_squared_error", first_fold_fit_params=fit_params))
+    )
+
+    assert seen == [("Ridge", 20, 20)]
+    np.testing.assert_allclose(scores, evaluate_model(4, _pipe(), X, y, "neg_mean_squared_error"))
+
+
+@pytest.mark.parametrize("model_name", ["xgboost", "lightgbm"])
+def test_boosted_models_report_every_iteration_and_stop_once_pruned(model_name):
+    X, y = _data()
+    spec = get_model_spec(model_name)
+    params = {"n_estimators": 30, "n_jobs": 1}
+
+    def objective(trial):
+        batches = iter_fold_scores(
+            3,
+            _pipe(spec.build(params)),
+            X,
+            y,
+            "neg_mean_squared_error",
+            first_fold_fit_params=lambda est, X_val, y_val: spec.pruning(trial, est, X_val, y_val),
+        )
+        return -float(np.mean(np.concatenate(list(batches))))
+
+    study = optuna.create_study(pruner=optuna.pruners.NopPruner())
+    study.optimize(objective, n_trials=1)
+    assert study.trials[0].state == optuna.trial.TrialState.COMPLETE
+    assert len(study.trials[0].intermediate_values) == 30
+
+    # any validation error is above the threshold: pruned at the first boosting iteration
+    study = optuna.create_study(pruner=optuna.pruners.ThresholdPruner(upper=0.0))
+    study.optimize(objective, n_trials=1)
+    assert study.trials[0].state == optuna.trial.TrialState.PRUNED
+    assert len(study.trials[0].intermediate_values) == 1
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+from model.evaluation import evaluate_model
+from model.feature_cache import FoldFeatureCache, fit_pipeline, preprocessor_key
+
+
+class CountingScaler(MinMaxScaler):
+    fits = 0
+
+    def fit(self, X, y=None):
+        type(self).fits += 1
+        return super().fit(X, y)
+
+
+def _data(n=60):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(
+        {
+            "category": rng.choice(["Salads", "Wraps", "Pizza"], n),
+            "density": rng.random(n),
+        }
+    )
+    y = pd.Series(X["density"] * 3 + (X["category"] == "Pizza") + rng.normal(0, 0.1, n), name="price")
+    return X, y
+
+
+def _pipe(alpha=1.0):
+    pre = ColumnTransformer(
+        [("cat", OneHotEncoder(handle_unknown="ignore"), ["category"]), ("num", CountingScaler(), ["density"])]
+    )
+    return Pipeline([("preprocessor", pre), ("model", Ridge(alpha=alpha))])
+
+
+@pytest.mark.unit
+def test_cached_scores_match_cross_validation(tmp_path):
+    X, y = _data()
+    expected = evaluate_model(3, _pipe(), X, y, "neg_mean_squared_error")
+
+    with FoldFeatureCache(X, y, folder=tmp_path) as cache:
+        scores = evaluate_model(3, _pipe(), X, y, "neg_mean_squared_error", feature_cache=cache)
+        assert list(tmp_path.iterdir())
+
+    np.testing.assert_allclose(scores, expected)
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.unit
+def test_preprocessor_is_fitted_once_per_fold_across_trials(tmp_path):
+    X, y = _data()
+    CountingScaler.fits = 0
+
+    with FoldFeatureCache(X, y, folder=tmp_path) as cache:
+        for alpha in (0.1, 1.0, 10.0):
+            evaluate_model(3, _pipe(alpha), X, y, "neg_mean_squared_error", feature_cache=cache)
+        assert CountingScaler.fits == 3
+        # another fold count is another entry
+        evaluate_model(2, _pipe(), X, y, "neg_mean_squared_error", feature_cache=cache)
+        assert CountingScaler.fits == 5
+
+        fitted = [fit_pipeline(_pipe(alpha), X, y, cache) for alpha in (0.1, 1.0)]
+        assert CountingScaler.fits == 6
+
+    expected = _pipe(1.0).fit(X, y).predict(X)
+    np.testing.assert_allclose(fitted[1].predict(X), expected)
+
+
+@pytest.mark.unit
+def test_full_fit_records_its_preprocessing_time(tmp_path):
+    X, y = _data()
+    pipe = _pipe()
+    with FoldFeatureCache(X, y, folder=tmp_path) as cache:
+        pre = pipe.named_steps["preprocessor"]
+        assert cache.preprocess_seconds(pre) == 0.0
+        fitted = fit_pipeline(pipe, X, y, cache)
+        seconds = cache.preprocess_seconds(pre)
+        # also found from the fitted copy the pipeline now holds, or under another n_jobs
+        assert seconds > 0 and cache.preprocess_seconds(fitted.named_steps["preprocessor"]) == seconds
+        assert cache.preprocess_seconds(pre.set_params(n_jobs=2)) == seconds
+
+
+@pytest.mark.unit
+def test_cache_only_applies_to_its_training_set(tmp_path):
+    X, y = _data()
+    with FoldFeatureCache(X, y, folder=tmp_path) as cache:
+        assert cache.applies_to(_pipe(), X)
+        assert not cache.applies_to(_pipe(), X.copy())
+        assert not cache.applies_to(Ridge(), X)
+
+
+@pytest.mark.unit
+def test_preprocessor_key_follows_the_configuration():
+    a, b = _pipe().named_steps["preprocessor"], _pipe().named_steps["preprocessor"]
+    assert preprocessor_key(a) == preprocessor_key(b)
+    b.set_params(cat__handle_unknown="error")
+    assert preprocessor_key(a) != preprocessor_key(b)
+    # unpicklable configurations fall back to identity
+    c = _pipe().named_steps["preprocessor"]
+    c.set_params(num=ColumnTransformer([("f", "passthrough", lambda X: ["density"])]))
+    assert preprocessor_key(c) == f"id-{id(c)}"
+
+
+@pytest.mark.unit
+def test_parallel_fold_building_and_threaded_scoring_match(tmp_path):
+    X, y = _data()
+    pre = _pipe().named_steps["preprocessor"]
+
+    with FoldFeatureCache(X, y, folder=tmp_path) as serial, FoldFeatureCache(X, y, folder=tmp_path, n_jobs=2) as par:
+        for a, b in zip(serial.folds(pre, 3), par.folds(pre, 3), strict=True):
+            np.testing.assert_allclose(a[0], b[0])
+        expected = serial.cross_val_score(_pipe(), 3, "neg_mean_squared_error")
+        threaded = par.cross_val_score(_pipe(), 3, "neg_mean_squared_error", n_jobs=2, backend="threading")
+
+    np.testing.assert_allclose(threaded, expected)
+    # the plan's n_jobs does not change the cached features
+    assert preprocessor_key(pre) == preprocessor_key(_pipe().named_steps["preprocessor"].set_params(n_jobs=4))
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from model.fidelity import fidelity_schedule, fidelity_strata, fidelity_subsample, fidelity_subsamples
+
+pytestmark = pytest.mark.unit
+
+
+def _data(n=400):
+    rng = np.random.default_rng(3)
+    # unbalanced categories: a subsample must keep their shares
+    X = pd.DataFrame(
+        {"category": rng.choice(["Salads", "Wraps", "Pizza"], n, p=[0.7, 0.2, 0.1]), "density": rng.random(n)}
+    )
+    y = pd.Series(X["density"] * 3 + rng.normal(0, 0.1, n), name="price")
+    return X, y
+
+
+def test_schedule_is_increasing_fractions_ending_at_one():
+    assert fidelity_schedule([0.1, 0.3, 1]) == (0.1, 0.3, 1.0)
+    assert fidelity_schedule((1.0,)) == (1.0,)
+    with pytest.raises(ValueError, match="end at 1.0"):
+        fidelity_schedule([0.1, 0.5])
+    with pytest.raises(ValueError, match="increasing"):
+        fidelity_schedule([0.5, 0.2, 1.0])
+    with pytest.raises(ValueError, match="increasing"):
+        fidelity_schedule([0.0, 1.0])
+
+
+def test_subsamples_are_stratified_and_nested():
+    X, y = _data()
+    strata = fidelity_strata(X, y)
+
+    small, large = fidelity_subsample(strata, 0.1), fidelity_subsample(strata, 0.5)
+
+    assert set(small) <= set(large)
+    assert np.all(np.diff(small) > 0)
+    for rows, fraction in ((small, 0.1), (large, 0.5)):
+        counts = X["category"].iloc[rows].value_counts()
+        expected = np.ceil(fraction * X["category"].value_counts())
+        pd.testing.assert_series_equal(counts.sort_index(), expected.astype(int).sort_index())
+    # seeded: the same rows for every trial
+    np.testing.assert_array_equal(small, fidelity_subsample(strata, 0.1))
+
+
+def test_target_deciles_stratify_without_a_split_column():
+    X, y = _data()
+    strata = fidelity_strata(X.drop(columns="category"), y)
+
+    assert len(np.unique(strata)) == 10
+    rows = fidelity_subsample(strata, 0.2)
+    assert len(rows) == pytest.approx(0.2 * len(y), abs=10)
+
+
+def test_every_fidelity_below_one_needs_enough_rows():
+    X, y = _data(n=40)
+
+    subsamples = fidelity_subsamples(X, y, (0.25, 0.5, 1.0))
+    assert [len(rows) for rows in subsamples] == [11, 21]  # ceil per category
+    with pytest.raises(ValueError, match="leaves"):
+        fidelity_subsamples(X, y, (0.01, 1.0), min_rows=10)
@@ -0,0 +1,153 @@
+import json
+
+import pandas as pd
+import pytest
+
+from tests.unit.test_chunked import _frames
+
+
+@pytest.fixture
+def refresh_env(monkeypatch, tmp_path):
+    import application.dataset.io.loader as loader_mod
+    import application.dataset.sampling as sm
+    from application.dataset import processing as proc
+    from application.dataset.config import Config
+
+    frames = _frames()
+    ner_calls = []
+
+    def fake_ner(s, ner):
+        ner_calls.append(sorted(s))
+        return s.map(lambda d: sorted(d.lower().split()))
+
+    monkeypatch.setattr(loader_mod, "load_kaggle_dataset", lambda handle, path, pandas_kwargs=None: frames[path])
+    monkeypatch.setattr(proc, "extract_ingredients_series", fake_ner)
+    monkeypatch.setattr(sm, "NERModelSingleton", lambda: type("NER", (), {"get_pipeline": lambda self: None})())
+
+    def config(path="sample.csv", **overrides):
+        options = dict(
+            RESTAURANTS_DS="owner/restaurants",
+            MENUS_DS="owner/menus",
+            INDEX_DS="owner/index",
+            DENSITY_DS="owner/density",
+            STATES_DS="owner/states",
+            INDEX_FILE="index.csv",
+            DENSITY_FILE="density.csv",
+            STATES_FILE="states.csv",
+            DATASET_CACHE_DIR=None,
+            CHECKPOINT_DIR=None,
+            SAMPLE_STATE_DIR=str(tmp_path / "state"),
+            FINAL_SAMPLED_DATA_PATH=str(tmp_path / path),
+            top_states_filter=("wi", "tx"),
+            focus_categories=("Salads", "Wraps"),
+            top_cities_per_state=1,
+        )
+        return Config(**{**options, **overrides})
+
+    def add_menu_rows(rows):
+        frames["restaurant-menus.csv"] = pd.concat(
+            [frames["restaurant-menus.csv"], pd.DataFrame(rows)], ignore_index=True
+        )
+
+    def manifest():
+        return json.loads((tmp_path / "state" / "manifest.json").read_text())
+
+    return type(
+        "Env",
+        (),
+        {
+            "config": staticmethod(config),
+            "add_menu_rows": staticmethod(add_menu_rows),
+            "manifest": staticmethod(manifest),
+            "ner_calls": ner_calls,
+            "path": tmp_path,
+        },
+    )
+
+
+@pytest.mark.unit
+def test_first_refresh_equals_full_build(refresh_env):
+    import application.dataset.sampling as sm
+    from application.dataset.incremental import refresh_training_sample
+
+    refresh_training_sample(refresh_env.config("incremental.csv"))
+    sm.generate_training_sample(refresh_env.config("full.csv"))
+
+    assert (refresh_env.path / "incremental.csv").read_text() == (refresh_env.path / "full.csv").read_text()
+    manifest = refresh_env.manifest()
+    assert manifest["version"] == 1 and manifest["reselected"] and manifest["reused_rows"] == 0
+
+
+@pytest.mark.unit
+def test_refresh_runs_ner_only_on_new_descriptions(refresh_env):
+    from application.dataset.incremental import refresh_training_sample
+
+    refresh_training_sample(refresh_env.config())
+    refresh_env.ner_calls.clear()
+    refresh_env.add_menu_rows(
+        {"restaurant_id": [1], "category": ["Salads"], "description": ["Spinach"], "price": ["9.0 USD"]}
+    )
+
+    df = refresh_training_sample(refresh_env.config())
+
+    assert refresh_env.ner_calls == [["Spinach"]]
+    assert ["spinach"] in df["ingredients"].tolist()
+    manifest = refresh_env.manifest()
+    assert manifest["version"] == 2
+    assert manifest["ner_rows"] == 1 and manifest["reused_rows"] == len(df) - 1
+
+
+@pytest.mark.unit
+def test_refresh_keeps_selection_below_drift_threshold(refresh_env):
+    from application.dataset.incremental import refresh_training_sample
+
+    refresh_training_sample(refresh_env.config())
+    first = refresh_env.manifest()
+    # Madison gains Wraps: enough to overtake Appleton on a full reselection, but a small category drift
+    refresh_env.add_menu_rows(
+        {"restaurant_id": [3] * 4, "category": ["Wraps"] * 4, "description": list("abcd"), "price": ["9.0 USD"] * 4}
+    )
+
+    refresh_training_sample(refresh_env.config(drift_threshold=0.5))
+    kept = refresh_env.manifest()
+    refresh_training_sample(refresh_env.config(drift_threshold=0.0))
+    reselected = refresh_env.manifest()
+
+    assert not kept["reselected"] and 0 < kept["drift"] <= 0.5
+    assert kept["top_cities"] == first["top_cities"]
+    assert reselected["reselected"] and reselected["top_cities"] != first["top_cities"]
+
+
+@pytest.mark.unit
+def test_full_refresh_ignores_previous_state(refresh_env):
+    from application.dataset.incremental import refresh_training_sample
+
+    refresh_training_sample(refresh_env.config())
+    refresh_env.ner_calls.clear()
+
+    refresh_training_sample(refresh_env.config(), full=True)
+
+    manifest = refresh_env.manifest()
+    assert manifest["version"] == 1 and manifest["reused_rows"] == 0
+    assert refresh_env.ner_calls
+
+
+@pytest.mark.unit
+def test_refresh_needs_a_state_dir(refresh_env):
+    from application.dataset.incremental import refresh_training_sample
+
+    with pytest.raises(ValueError, match="SAMPLE_STATE_DIR"):
+        refresh_training_sample(refresh_env.config(SAMPLE_STATE_DIR=None))
+
+
+@pytest.mark.unit
+def test_category_drift_is_total_variation_distance():
+    from application.dataset.incremental import category_drift
+
+    cols = ["state_id", "city", "menu_category", "count"]
+    a = pd.DataFrame([["wi", "x", "Salads", 3], ["wi", "x", "Wraps", 1]], columns=cols)
+    b = pd.DataFrame([["wi", "x", "Salads", 1], ["wi", "x", "Wraps", 1]], columns=cols)
+
+    assert category_drift(a, a) == 0
+    assert category_drift(a, b) == pytest.approx(0.25)
+    assert category_drift(a, b.assign(city="y")) == pytest.approx(1.0)
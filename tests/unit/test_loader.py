@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_load_model_data_parses_ingredients_list(tmp_path):
     import pandas as pd
 
@@ -40,3 +43,36 @@ def test_load_model_data_no_ingredients_column(tmp_path):
     # Should return frame unchanged (no error)
     assert list(out.columns) == ["x"]
     assert len(out) == 2
+
+
+def test_load_model_data_reads_typed_sample_without_parsing(tmp_path, monkeypatch):
+    import pandas as pd
+
+    from application.dataset.io import loader, write_training_sample
+
+    p = tmp_path / "sample.csv"
+    df = pd.DataFrame({"state_id": ["wi", "tx"], "ingredients": [["tomato", "basil"], []], "price": [9.0, 8.5]})
+    write_training_sample(df, p)
+    monkeypatch.setattr(loader, "_safe_eval_ingredients", lambda v: pytest.fail("CSV ingredients parsed"))
+
+    out = loader.load_model_data(str(p))
+    assert list(out.columns) == ["state_id", "ingredients", "price"]
+    assert out["state_id"].dtype == "category"
+    assert out["ingredients"].tolist() == [["tomato", "basil"], []]
+    assert out["price"].tolist() == [9.0, 8.5]
+
+
+def test_load_model_data_falls_back_to_newer_csv(tmp_path):
+    import os
+
+    import pandas as pd
+
+    from application.dataset.io import load_model_data, write_training_sample
+
+    p = tmp_path / "sample.csv"
+    write_training_sample(pd.DataFrame({"ingredients": [["old"]]}), p)
+    pd.DataFrame({"ingredients": [str(["new"])]}).to_csv(p, index=False)
+    stamp = os.path.getmtime(tmp_path / "sample.parquet")
+    os.utime(p, (stamp + 10, stamp + 10))
+
+    assert load_model_data(str(p)).loc[0, "ingredients"] == ["new"]
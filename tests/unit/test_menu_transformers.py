@@ -0,0 +1,49 @@
+import pickle
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse
+
+from application.preprocessing.transformers import build_preprocessor
+from menu_transformers import ColumnPicker, identity
+
+pytestmark = pytest.mark.unit
+
+
+def _frame():
+    return pd.DataFrame(
+        {
+            "cost_of_living_index": [92.0, 145.0, 100.0],
+            "density": [1156.0, 4300.0, 2000.0],
+            "category": ["Salads", "Sandwiches", "Salads"],
+            "price_range": ["cheap", "moderate", "cheap"],
+            "state_id": ["wi", "ca", "tx"],
+            "ingredients": [["onion", "tomato"], ["tomato", "onion", "bread"], ["onion", "tomato", "salt"]],
+        }
+    )
+
+
+def test_column_picker_returns_a_series_even_for_one_row():
+    df = _frame()[["ingredients"]]
+
+    picked = ColumnPicker(0).fit(df).transform(df.iloc[:1])
+    assert isinstance(picked, pd.Series) and len(picked) == 1
+    assert ColumnPicker("ingredients").transform(df).tolist() == df["ingredients"].tolist()
+    assert identity(["a", "b"]) == ["a", "b"]
+
+
+@pytest.mark.parametrize("text_features", ["tfidf", "hashing"])
+def test_fitted_preprocessor_pickles_without_cloudpickle(text_features):
+    df = _frame()
+    pre = build_preprocessor(text_features=text_features, n_features=32).fit(df)
+
+    restored = pickle.loads(pickle.dumps(pre))
+    expected, actual = pre.transform(df), restored.transform(df)
+    assert sparse.issparse(actual) == sparse.issparse(expected)
+    np.testing.assert_allclose(sparse.csr_matrix(actual).toarray(), sparse.csr_matrix(expected).toarray())
+    # stable configuration hash (the feature cache key)
+    assert joblib.hash(build_preprocessor(text_features=text_features)) == joblib.hash(
+        build_preprocessor(text_features=text_features)
+    )
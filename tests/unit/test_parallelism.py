@@ -0,0 +1,75 @@
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler
+
+from model.parallelism import available_cores, plan_parallelism
+
+pytestmark = pytest.mark.unit
+
+
+def test_threaded_estimators_get_the_cores_left_per_fold():
+    plan = plan_parallelism(5, "xgboost", cores=16)
+
+    assert (plan.fold_jobs, plan.estimator_jobs, plan.refit_jobs) == (5, 3, 16)
+    assert plan.fold_backend == "threading"
+    assert plan.transformer_jobs == 1
+    assert plan.fold_jobs * plan.estimator_jobs <= plan.cores
+
+
+def test_single_threaded_estimators_only_parallelize_folds():
+    plan = plan_parallelism(5, "ridge", cores=16)
+
+    assert (plan.fold_jobs, plan.estimator_jobs, plan.refit_jobs) == (5, 1, 1)
+    assert plan.fold_backend == "loky"
+
+
+def test_trials_share_the_budget():
+    plan = plan_parallelism(5, "lightgbm", trial_jobs=2, cores=8)
+
+    assert (plan.trial_jobs, plan.fold_jobs, plan.estimator_jobs, plan.refit_jobs) == (2, 4, 1, 4)
+    assert plan.trial_jobs * plan.fold_jobs * plan.estimator_jobs <= plan.cores
+
+
+def test_one_core_runs_everything_sequentially():
+    plan = plan_parallelism(5, "rforest", trial_jobs=4, cores=1)
+
+    assert (plan.trial_jobs, plan.fold_jobs, plan.transformer_jobs, plan.estimator_jobs, plan.refit_jobs) == (
+        1,
+        1,
+        1,
+        1,
+        1,
+    )
+
+
+def test_a_lone_fold_runs_the_preprocessor_blocks_side_by_side():
+    assert plan_parallelism(1, cores=8).transformer_jobs == 3
+
+
+def test_training_cores_setting_caps_the_budget(monkeypatch):
+    from model import parallelism
+
+    monkeypatch.setattr(parallelism.settings, "TRAINING_CORES", 1, raising=False)
+    assert available_cores() == 1
+    assert plan_parallelism(5, "xgboost").cores == 1
+
+
+def test_configure_sets_n_jobs_on_the_pipeline_steps():
+    plan = plan_parallelism(5, "rforest", cores=10)
+    shared = ColumnTransformer([("num", MinMaxScaler(), ["x"])], n_jobs=-1)
+    pipe = Pipeline(
+        [
+            ("preprocessor", shared),
+            ("model", RandomForestRegressor(n_jobs=-1)),
+        ]
+    )
+
+    plan.configure(pipe)
+    assert pipe.named_steps["preprocessor"].n_jobs == 1
+    # the preprocessor shared with other pipelines keeps its own setting
+    assert shared.n_jobs == -1 and pipe.named_steps["preprocessor"] is not shared
+    assert pipe.named_steps["model"].n_jobs == 2
+    plan.configure(pipe, refit=True)
+    assert pipe.named_steps["model"].n_jobs == 10
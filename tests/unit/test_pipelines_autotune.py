@@ -31,25 +31,80 @@ def test_autotune_pipeline_happy_path(monkeypatch):
     monkeypatch.setattr(p, "split_data", fake_split, raising=True)
 
     # preprocessor
-    def fake_build():
+    def fake_build(text_features, encoding):
         calls["build"] += 1
+        calls["text_features"] = text_features
+        calls.setdefault("encodings", []).append(encoding)
         return object()
 
     monkeypatch.setattr(p, "build_preprocessor", fake_build, raising=True)
 
     # tune (should be skipped for "lr", called for others)
-    def fake_tune(Xtr, ytr, Xte, yte, preprocessor, *, model_name, n_trials, cv_folds, scoring_criterion):
+    def fake_tune(
+        Xtr,
+        ytr,
+        Xte,
+        yte,
+        preprocessor,
+        *,
+        model_name,
+        n_trials,
+        cv_folds,
+        scoring_criterion,
+        feature_cache,
+        n_workers,
+        storage,
+        study_name,
+        pruner,
+        prune_iterations,
+        trial_artifacts,
+        top_k,
+        fidelities,
+        warm_start_trials,
+        warm_start_similarity,
+    ):
         calls["tune"].append(
-            dict(model_name=model_name, n_trials=n_trials, cv_folds=cv_folds, scoring=scoring_criterion)
+            dict(
+                model_name=model_name,
+                n_trials=n_trials,
+                cv_folds=cv_folds,
+                scoring=scoring_criterion,
+                n_workers=n_workers,
+                storage=storage,
+                study_name=study_name,
+                pruner=pruner,
+                prune_iterations=prune_iterations,
+                trial_artifacts=trial_artifacts,
+                top_k=top_k,
+                fidelities=fidelities,
+                warm_start=(warm_start_trials, warm_start_similarity),
+            )
         )
         return {"alpha": 0.1}, 0.123  # best_params, best_metric
 
     monkeypatch.setattr(p, "tune_model", fake_tune, raising=True)
 
     # compare
-    def fake_compare(tuned_models, Xtr, ytr, Xte, yte, preprocessor, *, scoring_criterion, best_model_registry_name):
+    def fake_compare(
+        tuned_models,
+        Xtr,
+        ytr,
+        Xte,
+        yte,
+        preprocessor,
+        *,
+        cv_folds,
+        scoring_criterion,
+        best_model_registry_name,
+        feature_cache,
+    ):
         calls["compare"].append(
-            dict(tuned_models=tuned_models, scoring=scoring_criterion, registry=best_model_registry_name)
+            dict(
+                tuned_models=tuned_models,
+                cv_folds=cv_folds,
+                scoring=scoring_criterion,
+                registry=best_model_registry_name,
+            )
         )
         results = {"lr": {"rmse": 1.0}, "xgboost": {"rmse": 0.9}}
         return results, "xgboost", "models:/xgboost/1"
@@ -64,12 +119,25 @@ def test_autotune_pipeline_happy_path(monkeypatch):
         cv_folds=3,
         scoring="neg_root_mean_squared_error",
         best_model_registry_name="ubereats-menu-price-predictor",
+        text_features="hashing",
+        n_workers=2,
+        storage="sqlite:///optuna.db",
+        study_name="menu",
+        pruner="hyperband",
+        prune_iterations=False,
+        trial_artifacts="top-k",
+        top_k=2,
+        fidelities=(0.2, 1.0),
+        warm_start_trials=5,
+        warm_start_similarity=0.9,
     )
 
     # --- asserts ---
     assert calls["load"] == 1
     assert calls["split"] == 1
     assert calls["build"] == 1
+    assert calls["text_features"] == "hashing"
+    assert calls["encodings"] == ["onehot"]
 
     # "lr" is skipped -> tune only called once for "xgboost"
     assert len(calls["tune"]) == 1
@@ -77,6 +145,12 @@ def test_autotune_pipeline_happy_path(monkeypatch):
     assert t0["model_name"] == "xgboost"
     assert t0["n_trials"] == 5 and t0["cv_folds"] == 3
     assert t0["scoring"] == "neg_root_mean_squared_error"
+    assert t0["n_workers"] == 2 and t0["storage"] == "sqlite:///optuna.db"
+    assert t0["study_name"] == "menu-xgboost"
+    assert t0["pruner"] == "hyperband" and t0["prune_iterations"] is False
+    assert t0["trial_artifacts"] == "top-k" and t0["top_k"] == 2
+    assert t0["fidelities"] == (0.2, 1.0)
+    assert t0["warm_start"] == (5, 0.9)
 
     # compare invoked with tuned_models for xgboost and {} for lr
     assert len(calls["compare"]) == 1
@@ -84,8 +158,37 @@ def test_autotune_pipeline_happy_path(monkeypatch):
     assert "lr" in tuned and tuned["lr"] == {}
     assert "xgboost" in tuned and tuned["xgboost"] == {"alpha": 0.1}
     assert calls["compare"][0]["registry"] == "ubereats-menu-price-predictor"
+    assert calls["compare"][0]["cv_folds"] == 3
 
     # returned payload shape
     assert set(out.keys()) == {"results", "best_model_name", "model_uri"}
     assert out["best_model_name"] == "xgboost"
     assert isinstance(out["results"], dict) and isinstance(out["model_uri"], str)
+
+
+def test_autotune_builds_one_preprocessor_per_feature_encoding(monkeypatch):
+    import pandas as pd
+
+    import pipelines.autotune as p
+
+    X, y = pd.DataFrame({"x": [1, 2]}), pd.Series([10, 20], name="y")
+    monkeypatch.setattr(p, "load_model_data", lambda path: None)
+    monkeypatch.setattr(p, "split_data", lambda df: (X, X.iloc[:1], y, y.iloc[:1]))
+    monkeypatch.setattr(p, "build_preprocessor", lambda text_features, encoding: f"{encoding}-{text_features}")
+    tuned_with, compared_with = {}, []
+
+    def fake_tune(Xtr, ytr, Xte, yte, preprocessor, *, model_name, **kwargs):
+        tuned_with[model_name] = preprocessor
+        return {}, 0.0
+
+    def fake_compare(tuned_models, Xtr, ytr, Xte, yte, preprocessor, **kwargs):
+        compared_with.append(preprocessor)
+        return {}, "hgb", "models:/hgb/1"
+
+    monkeypatch.setattr(p, "tune_model", fake_tune)
+    monkeypatch.setattr(p, "train_and_compare", fake_compare)
+
+    p.autotune_pipeline(model_names=["ridge", "hgb", "lightgbm_native"], data_path="data.csv")
+
+    assert tuned_with == {"ridge": "onehot-tfidf", "hgb": "ordinal-tfidf", "lightgbm_native": "ordinal-tfidf"}
+    assert compared_with == [{"onehot": "onehot-tfidf", "ordinal": "ordinal-tfidf"}]
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("polars")
+
+from application.dataset import processing  # noqa: E402
+from application.dataset.processing import polars_engine  # noqa: E402
+
+STATES = ("tx", "wi")
+FOCUS = ("Salads", "Sandwiches")
+
+
+def _fixture_frames(seed: int = 7):
+    rng = np.random.default_rng(seed)
+    n_res, n_menu = 120, 4000
+    state = rng.choice(["TX", "WI", "CA"], size=n_res)
+    city = [f"Town{s}{i}" for s, i in zip(state, rng.integers(0, 6, size=n_res), strict=True)]
+    addresses = [f"{i} Main St, {c}, {s}, 7870{i % 10}" for i, (c, s) in enumerate(zip(city, state, strict=True))]
+    addresses[:3] = ["Appleton, WI", "1 St, , TX, 78701", "1 St, Austin, Texas, 78701"]  # unusable addresses
+    df_restaurant = pd.DataFrame(
+        {
+            "id": np.arange(n_res, dtype=np.int32),
+            "price_range": rng.choice(np.array(["$", "$$", None], dtype=object), size=n_res),
+            "full_address": addresses,
+        }
+    )
+    df_menu = pd.DataFrame(
+        {
+            "restaurant_id": rng.integers(0, n_res + 10, size=n_menu),
+            "category": rng.choice(["Salads", "Sandwiches", "Picked for you", "Salads &amp; Bowls", "Drinks"], n_menu),
+            "description": rng.choice(
+                np.array(["Tomato &amp; basil", " ham ", "", None, "Club"], dtype=object), n_menu
+            ),
+            "price": [f"{p:.1f} USD" for p in rng.choice([0.0, 4.5, 7.0, 9.5, 12.0], size=n_menu)],
+        }
+    )
+    df_density = pd.DataFrame(
+        [{"city": f"Town{s}{i}", "state_id": s, "density": str(100 + i)} for s in ("TX", "WI", "CA") for i in range(5)]
+    )
+    return df_restaurant, df_menu, df_density
+
+
+def _pandas_engine(df_restaurant, df_menu, df_density):
+    df_menu = processing.preprocess_menu(df_menu)
+    df_restaurant, df_menu = processing.sync_restaurants_and_menus(df_restaurant, df_menu)
+    df_addr = processing.build_address_fields(df_restaurant)
+    df_addr = df_addr[df_addr.city.isin(set(df_density.city.str.strip().str.lower()))]
+    df_top_state = processing.filter_to_top_states(processing.merge_density(df_addr, df_density), STATES)
+    df_res_ext, top_categories = processing.compute_top_categories(df_menu, df_top_state, 3)
+    top_cities = processing.pick_top_cities(top_categories, FOCUS, 2)
+    df_final = processing.build_final_menu_frame(df_menu, df_res_ext, top_cities, FOCUS)
+    return processing.as_object(df_final).reset_index(drop=True)
+
+
+@pytest.mark.unit
+def test_polars_engine_matches_pandas_engine():
+    df_restaurant, df_menu, df_density = _fixture_frames()
+
+    expected = _pandas_engine(df_restaurant, df_menu, df_density)
+    actual = polars_engine.select_final_menu_frame(df_restaurant, df_menu, df_density, STATES, 3, FOCUS, 2)
+
+    assert len(expected) > 0
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+@pytest.mark.unit
+def test_polars_engine_does_not_mutate_inputs():
+    df_restaurant, df_menu, df_density = _fixture_frames()
+    before = df_menu.copy()
+
+    polars_engine.select_final_menu_frame(df_restaurant, df_menu, df_density, STATES, 3, FOCUS, 2)
+
+    pd.testing.assert_frame_equal(df_menu, before)
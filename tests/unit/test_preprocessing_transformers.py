@@ -101,3 +101,71 @@ def test_text_pipeline_handles_small_corpus_gracefully():
     # basic shape/typing checks
     assert X.shape[0] == len(df)
     assert sparse.issparse(X) or isinstance(X, np.ndarray)
+
+
+def test_hashing_text_features_have_a_fixed_width():
+    from application.preprocessing.schema import schema
+    from application.preprocessing.transformers import build_preprocessor
+
+    df = _toy_frame_for_vectorizer()[list(schema.feature_cols())]
+
+    for use_idf in (True, False):
+        ct = build_preprocessor(text_features="hashing", n_features=64, use_idf=use_idf)
+        X = ct.fit_transform(df)
+        text = ct.named_transformers_["text"]
+        # 2 scaled numeric + 6 one-hot (2 values in each of 3 columns) + 64 hashed columns
+        assert X.shape == (len(df), 2 + 6 + 64)
+        assert [name for name, _ in text.steps][1:] == (["hashing", "idf"] if use_idf else ["hashing"])
+        # single-occurrence phrases are kept (no min_df): every row has its 3 phrases + 2 bigrams
+        assert (text.transform(df[list(schema.text)]).getnnz(axis=1) >= 4).all()
+
+
+def test_build_preprocessor_rejects_unknown_text_featurizer():
+    from application.preprocessing.transformers import build_preprocessor
+
+    with pytest.raises(ValueError, match="text featurizer"):
+        build_preprocessor(text_features="bow")
+
+
+def _menu_frame(n=60, seed=0):
+    rng = np.random.default_rng(seed)
+    phrases = np.array([f"phrase {i}" for i in range(20)], dtype=object)
+    return pd.DataFrame(
+        {
+            "cost_of_living_index": rng.uniform(80, 180, n),
+            "density": rng.uniform(100, 10_000, n),
+            "category": rng.choice(["Salads", "Wraps", "Pizza"], n),
+            "price_range": rng.choice(["cheap", "moderate"], n),
+            "state_id": rng.choice(["wi", "ca", "tx", "ny"], n),
+            "ingredients": [list(rng.choice(phrases, 3, replace=False)) for _ in range(n)],
+        }
+    )
+
+
+@pytest.mark.parametrize("text_features", ["tfidf", "hashing"])
+def test_ordinal_encoding_is_dense_with_leading_categorical_codes(text_features):
+    from application.preprocessing.schema import schema
+    from application.preprocessing.transformers import build_preprocessor
+
+    df = _menu_frame()
+    ct = build_preprocessor(text_features=text_features, encoding="ordinal", text_components=4)
+    X = ct.fit_transform(df)
+
+    # 3 categorical codes, 2 raw numeric columns, 4 SVD components of the ingredients
+    assert isinstance(X, np.ndarray) and X.shape == (len(df), 3 + 2 + 4)
+    n_cat = len(schema.categorical)
+    codes = ct.named_transformers_["cat"].named_steps["ordinal"].categories_
+    for i, (col, categories) in enumerate(zip(schema.categorical, codes, strict=True)):
+        np.testing.assert_array_equal(categories[X[:, i].astype(int)], df[col])
+    np.testing.assert_array_equal(X[:, n_cat : n_cat + 2], df[list(schema.numeric)])
+
+    # unseen categories are missing values, which histogram GBDTs route on their own
+    unseen = ct.transform(df.assign(category="Sushi"))
+    assert np.isnan(unseen[:, 0]).all() and not np.isnan(unseen[:, 1:]).any()
+
+
+def test_build_preprocessor_rejects_unknown_encoding():
+    from application.preprocessing.transformers import build_preprocessor
+
+    with pytest.raises(ValueError, match="feature encoding"):
+        build_preprocessor(encoding="target")
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import Pipeline
+
+from model.registry import REGISTRY, get_model_spec
+
+pytestmark = pytest.mark.unit
+
+# a few boosting iterations each
+ORDINAL_MODELS = {
+    "hgb": {"max_iter": 20},
+    "xgboost_native": {"n_estimators": 20},
+    # LightGBM's default 100 rows per categorical split are more than this toy data has
+    "lightgbm_native": {"n_estimators": 20, "min_data_per_group": 10, "verbose": -1},
+}
+
+
+def _menu_data(n=200, seed=0):
+    rng = np.random.default_rng(seed)
+    phrases = np.array([f"phrase {i}" for i in range(30)], dtype=object)
+    X = pd.DataFrame(
+        {
+            "cost_of_living_index": rng.uniform(80, 180, n),
+            "density": rng.uniform(100, 10_000, n),
+            "category": rng.choice(["Salads", "Wraps", "Pizza", "Sushi"], n),
+            "price_range": rng.choice(["cheap", "moderate"], n),
+            "state_id": rng.choice(["wi", "ca", "tx"], n),
+            "ingredients": [list(rng.choice(phrases, 3, replace=False)) for _ in range(n)],
+        }
+    )
+    y = X["category"].map({"Salads": 8.0, "Wraps": 10.0, "Pizza": 14.0, "Sushi": 20.0}) + rng.normal(0, 0.5, n)
+    return X, y.rename("price")
+
+
+def test_encodings_of_the_registry():
+    assert {name for name, spec in REGISTRY.items() if spec.encoding == "ordinal"} == set(ORDINAL_MODELS)
+    assert all(spec.encoding in ("onehot", "ordinal") for spec in REGISTRY.values())
+
+
+@pytest.mark.parametrize("model_name", ORDINAL_MODELS)
+def test_ordinal_models_fit_on_the_ordinal_features(model_name):
+    from application.preprocessing.transformers import build_preprocessor
+
+    X, y = _menu_data()
+    spec = get_model_spec(model_name)
+    pre = build_preprocessor(text_features="hashing", n_features=256, encoding=spec.encoding, text_components=4)
+    pipe = Pipeline([("preprocessor", pre), ("model", spec.build(ORDINAL_MODELS[model_name], pre))]).fit(X, y)
+
+    assert np.sqrt(np.mean((pipe.predict(X) - y) ** 2)) < 0.5 * y.std()
+    # menus of unseen categories still get a prediction
+    assert np.isfinite(pipe.predict(X.assign(category="Tacos"))).all()
+
+
+def test_categorical_codes_are_split_on_natively():
+    from application.preprocessing.transformers import build_preprocessor
+
+    X, y = _menu_data()
+    pre = build_preprocessor(text_features="hashing", n_features=256, encoding="ordinal", text_components=4)
+    Xt = pre.fit_transform(X, y)
+
+    hgb = get_model_spec("hgb").build(ORDINAL_MODELS["hgb"]).fit(Xt, y)
+    assert hgb.is_categorical_.tolist() == [True] * 3 + [False] * 6
+
+    lgbm = get_model_spec("lightgbm_native").build(ORDINAL_MODELS["lightgbm_native"]).fit(Xt, y)
+    infos = lgbm.booster_.dump_model()["feature_infos"]
+    # categorical features list their values; numeric ones a range only
+    assert all(infos[f"Column_{i}"]["values"] for i in range(3))
+    assert not infos["Column_3"]["values"]
+
+    xgb = get_model_spec("xgboost_native").build(ORDINAL_MODELS["xgboost_native"], pre).fit(Xt, y)
+    # categorical splits test a set of codes, numeric ones a threshold
+    trees = xgb.get_booster().trees_to_dataframe()
+    assert trees.loc[trees["Feature"] == "f0", "Category"].notna().all()
+    assert trees.loc[trees["Feature"] == "f0"].shape[0] > 0
+
+
+@pytest.mark.parametrize("text_components", [None, 7])
+def test_xgboost_feature_types_follow_the_preprocessor(text_components):
+    from application.preprocessing.transformers import build_preprocessor
+
+    X, y = _menu_data()
+    size = {"text_components": text_components} if text_components else {}
+    pre = build_preprocessor(text_features="hashing", n_features=256, encoding="ordinal", **size)
+    Xt = pre.fit_transform(X, y)
+    spec = get_model_spec("xgboost_native")
+
+    feature_types = spec.build(preprocessor=pre).get_params()["feature_types"]
+    assert len(feature_types) == Xt.shape[1] and feature_types[:4] == ["c", "c", "c", "q"]
+    if text_components is None:  # without the preprocessor: typed for the default features
+        assert spec.base_kwargs["feature_types"] == feature_types
+    Pipeline([("preprocessor", pre), ("model", spec.build({"n_estimators": 5}, pre))]).fit(X, y)
+
+
+def test_xgboost_native_needs_the_ordinal_features():
+    from application.preprocessing.transformers import build_preprocessor
+
+    with pytest.raises(ValueError, match="ordinal features"):
+        get_model_spec("xgboost_native").build(preprocessor=build_preprocessor(text_features="hashing"))
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _rows(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame(
+        {
+            "state_id": rng.choice(["wi", "tx", "ut"], n),
+            "category": rng.choice(["Salads", "Wraps"], n),
+            "description": [f"item {i}" for i in range(n)],
+            "price": np.round(rng.uniform(1, 20, n), 1),
+        }
+    )
+
+
+@pytest.mark.unit
+def test_stratified_sample_caps_strata_and_total_size():
+    from application.dataset.processing import stratified_sample
+
+    df = _rows()
+    per_stratum = stratified_sample(df, ("state_id", "category"), per_stratum=10, seed=33)
+    capped = stratified_sample(df, ("state_id", "category"), per_stratum=10, size=25, seed=33)
+
+    assert per_stratum.groupby(["state_id", "category"]).size().tolist() == [10] * 6
+    assert len(capped) == 25
+    assert set(capped["description"]) <= set(per_stratum["description"])
+    # input order is kept
+    assert per_stratum["description"].map(lambda d: int(d.split()[1])).is_monotonic_increasing
+
+
+@pytest.mark.unit
+def test_reservoir_is_seeded_and_independent_of_chunking():
+    from application.dataset.processing import StratifiedReservoir, stratified_sample
+
+    df = _rows()
+    whole = stratified_sample(df, ("state_id",), per_stratum=7, size=15, seed=33)
+
+    reservoir = StratifiedReservoir(("state_id",), per_stratum=7, size=15, seed=33)
+    for chunk in np.array_split(df, 9):  # noqa: PD013
+        reservoir.update(chunk)
+
+    pd.testing.assert_frame_equal(reservoir.result(), whole)
+    pd.testing.assert_frame_equal(stratified_sample(df, ("state_id",), per_stratum=7, size=15, seed=33), whole)
+    assert not stratified_sample(df, ("state_id",), per_stratum=7, size=15, seed=34).equals(whole)
+
+
+@pytest.mark.unit
+def test_reservoir_rejects_invalid_configuration():
+    from application.dataset.processing import StratifiedReservoir
+
+    with pytest.raises(ValueError, match="strata"):
+        StratifiedReservoir(per_stratum=5)
+    with pytest.raises(ValueError, match="size"):
+        StratifiedReservoir(size=0)
+    with pytest.raises(ValueError, match="not in the sampled frame"):
+        StratifiedReservoir(("zip",), per_stratum=5).update(_rows(10))
+
+
+@pytest.mark.unit
+def test_sampling_stages_add_reservoir_only_when_configured():
+    from application.dataset.config import Config
+    from application.dataset.sampling import sampling_stages
+
+    names = [s.name for s in sampling_stages(Config(DATASET_CACHE_DIR=None, CHECKPOINT_DIR=None))]
+    sampled = sampling_stages(Config(DATASET_CACHE_DIR=None, CHECKPOINT_DIR=None, sample_size=100))
+
+    assert "reservoir" not in names
+    assert [s.name for s in sampled].index("reservoir") == names.index("ner")
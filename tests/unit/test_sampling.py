@@ -49,6 +49,7 @@ def test_load_base_frames_uses_injected_loader(monkeypatch):
         INDEX_FILE="index.csv",
         DENSITY_FILE="density.csv",
         STATES_FILE="states.csv",
+        DATASET_CACHE_DIR=None,  # exercise the injected loader, not the local cache
     )
     frames = load_base_frames(cfg)
     assert len(frames) == 5
@@ -96,6 +97,7 @@ def test_sampling_load_base_frames_smoke(monkeypatch):
             INDEX_FILE="index.csv",
             DENSITY_FILE="density.csv",
             STATES_FILE="states.csv",
+            DATASET_CACHE_DIR=None,  # exercise the injected loader, not the local cache
         )
     )
     assert len(frames) == 5
@@ -211,7 +213,7 @@ def test_generate_training_sample_minimal(monkeypatch, tmp_path, tmp_cost_index_
     )
 
     # final menu frame: produce a single-row frame with expected columns
-    def fake_build_final_menu_frame(df_menu, df_res_ext, top_cities, focus_categories):
+    def fake_build_final_menu_frame(df_menu, df_res_ext, top_cities, focus_categories, sorted_merge=False):
         return pd.DataFrame(
             [
                 {
@@ -265,6 +267,8 @@ def test_generate_training_sample_minimal(monkeypatch, tmp_path, tmp_cost_index_
         INDEX_FILE="index.csv",
         DENSITY_FILE="density.csv",
         STATES_FILE="states.csv",
+        DATASET_CACHE_DIR=None,
+        CHECKPOINT_DIR=None,
         FINAL_SAMPLED_DATA_PATH=str(tmp_path / "sampled-final-data.csv"),
         # the following are read by load_base_frames; values don't matter for our fake_loader
         RESTAURANTS_DS="owner/restaurants",
@@ -328,3 +332,77 @@ def test_generate_training_sample_minimal(monkeypatch, tmp_path, tmp_cost_index_
     assert out["price_range"].iloc[0] == "moderate"
     assert out["state_id"].iloc[0] in ("wi", "Wisconsin")  # allow either, depending on your normalize order
     assert isinstance(out["ingredients"].iloc[0], list) and "tomato" in out["ingredients"].iloc[0]
+
+
+@pytest.mark.unit
+def test_generate_training_sample_resumes_from_checkpoints(monkeypatch, tmp_path):
+    import application.dataset.io.loader as loader_mod
+    import application.dataset.sampling as sm
+    from application.dataset import processing as proc
+    from application.dataset.config import Config
+
+    frames = {
+        "restaurants.csv": pd.DataFrame(
+            {
+                "id": [1, 2],
+                "price_range": ["$$", "$"],
+                "full_address": ["1 Main St, Appleton, WI, 54911", "2 Oak Ave, Appleton, WI, 54911"],
+            }
+        ),
+        "restaurant-menus.csv": pd.DataFrame(
+            {
+                "restaurant_id": [1, 1, 2, 2],
+                "category": ["Salads", "Salads", "Salads", "Drinks"],
+                "description": ["Tomato &amp; basil", "Greens", "Caesar", "Soda"],
+                "price": ["9.0 USD", "8.0 USD", "10.0 USD", "2.0 USD"],
+            }
+        ),
+        "index.csv": pd.DataFrame([{"state_id": "wi", "city": "appleton", "cost_of_living_index": 92.0}]),
+        "density.csv": pd.DataFrame([{"city": "Appleton", "state_id": "WI", "density": "1156"}]),
+        "states.csv": pd.DataFrame([{"Abbreviation": "WI", "State": "Wisconsin"}]),
+    }
+    monkeypatch.setattr(loader_mod, "load_kaggle_dataset", lambda handle, path, pandas_kwargs=None: frames[path].copy())
+
+    ner_calls = []
+
+    def fake_extract(descriptions, ner):
+        ner_calls.append(len(descriptions))
+        return descriptions.map(lambda d: d.lower().split())
+
+    monkeypatch.setattr(proc, "extract_ingredients_series", fake_extract, raising=True)
+    monkeypatch.setattr(sm, "NERModelSingleton", lambda: type("NER", (), {"get_pipeline": lambda self: None})())
+
+    def config(**overrides):
+        return Config(
+            RESTAURANTS_DS="owner/restaurants",
+            MENUS_DS="owner/menus",
+            INDEX_DS="owner/index",
+            DENSITY_DS="owner/density",
+            STATES_DS="owner/states",
+            INDEX_FILE="index.csv",
+            DENSITY_FILE="density.csv",
+            STATES_FILE="states.csv",
+            DATASET_CACHE_DIR=None,
+            CHECKPOINT_DIR=str(tmp_path / "checkpoints"),
+            FINAL_SAMPLED_DATA_PATH=str(tmp_path / "sample.csv"),
+            top_states_filter=("wi",),
+            focus_categories=("Salads",),
+            **overrides,
+        )
+
+    first = sm.generate_training_sample(config())
+    second = sm.generate_training_sample(config())
+    assert len(ner_calls) == 1  # second run resumed from the final checkpoint
+    pd.testing.assert_frame_equal(first, second)
+
+    # a config change downstream of selection only reruns from NER on
+    sm.generate_training_sample(config(NER_MODEL="other/ner-model"))
+    assert len(ner_calls) == 2
+
+    sm.generate_training_sample(config(), force=True)
+    assert len(ner_calls) == 3
+
+    # so does an edit to the sampling or NER code
+    monkeypatch.setattr(sm.checkpoints, "source_fingerprint", lambda *packages: "edited")
+    sm.generate_training_sample(config())
+    assert len(ner_calls) == 4
@@ -88,3 +88,70 @@ def test_compute_top_categories_minimal(df_menu_raw, df_restaurant_base):
     assert "menu_category" in df_res_ext.columns
     assert not top_cats.empty
     assert {"state_id", "city", "menu_category", "count"}.issubset(top_cats.columns)
+
+
+def _selection_inputs():
+    restaurants = pd.DataFrame(
+        {
+            "id": [1, 2, 3, 4, 5],
+            "price_range": ["$$", "$", None, "$$", "$"],
+            "state_id": ["wi", "ca", "wi", "tx", "wi"],
+            "city": ["appleton", "san diego", "madison", "austin", "appleton"],
+            "density": [1156, 4300, 3000, 3100, 1156],
+        }
+    )
+    menu = pd.DataFrame(
+        {
+            "restaurant_id": [5, 1, 2, 3, 1, 4, 5, 2, 1, 3],
+            "category": [
+                "Salads",
+                "Salads",
+                "Salads",
+                "Wraps",
+                "Wraps",
+                "Salads",
+                "Wraps",
+                "Pizza",
+                "Salads",
+                "Salads",
+            ],
+            "description": [f"item {i}" for i in range(10)],
+            "price": [float(i + 1) for i in range(10)],
+        }
+    )
+    return restaurants, menu
+
+
+def test_location_key_follows_sorted_key_order():
+    from application.dataset.processing import location_key
+
+    restaurants, _ = _selection_inputs()
+    assert location_key(restaurants).tolist() == [2, 0, 3, 1, 2]  # (ca, san diego) < (tx, austin) < (wi, ...)
+
+
+def test_selection_on_location_key_matches_string_keys():
+    from application.dataset.processing import LOCATION_KEY, location_key
+    from application.dataset.processing.selection import (
+        build_final_menu_frame,
+        compute_top_categories,
+        pick_top_cities,
+    )
+
+    restaurants, menu = _selection_inputs()
+    focus = ("Salads", "Wraps")
+
+    df_res_ext, top_cats = compute_top_categories(menu, restaurants.assign(location_id=location_key(restaurants)), 2)
+    top_cities = pick_top_cities(top_cats, focus, 1)
+    keyed = build_final_menu_frame(menu, df_res_ext, top_cities, focus)
+    by_strings = build_final_menu_frame(
+        menu, df_res_ext.drop(columns=[LOCATION_KEY]), top_cities[["state_id", "city"]], focus
+    )
+    sorted_merge = build_final_menu_frame(menu, df_res_ext, top_cities, focus, sorted_merge=True)
+
+    assert set(zip(top_cities.state_id, top_cities.city, strict=True)) == {
+        ("ca", "san diego"),
+        ("tx", "austin"),
+        ("wi", "appleton"),
+    }
+    pd.testing.assert_frame_equal(keyed.reset_index(drop=True), by_strings.reset_index(drop=True))
+    pd.testing.assert_frame_equal(sorted_merge, keyed)
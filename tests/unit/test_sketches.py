@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+
+def _prices(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "state_id": rng.choice(["wi", "tx", "ut"], n),
+            "category": rng.choice(["Salads", "Wraps"], n),
+            "price": np.round(rng.lognormal(2.3, 0.6, n), 1),
+        }
+    )
+    df.loc[::97, "price"] = np.nan
+    return df
+
+
+@pytest.mark.unit
+def test_exact_sketch_merged_over_chunks_matches_row_wise_iqr_filter():
+    from application.dataset.processing import (
+        iqr_bounds_by_group,
+        merge_sketch_groups,
+        remove_price_outliers_grouped,
+        remove_price_outliers_iqr,
+        sketch_groups,
+    )
+
+    df = _prices()
+    chunks = np.array_split(df, 7)  # noqa: PD013
+    sketches = merge_sketch_groups(*(sketch_groups(c, compression=None) for c in chunks))
+    bounds = iqr_bounds_by_group(sketches)
+
+    assert sketches[()].exact and sketches[()].count == df["price"].notna().sum()
+    filtered = pd.concat([remove_price_outliers_grouped(c, bounds) for c in chunks])
+    pd.testing.assert_frame_equal(filtered, remove_price_outliers_iqr(df))
+
+
+@pytest.mark.unit
+def test_grouped_bounds_match_per_group_quantiles():
+    from application.dataset.processing import iqr_bounds_by_group, remove_price_outliers_grouped, sketch_groups
+
+    df = _prices()
+    by = ["category", "state_id"]
+    bounds = iqr_bounds_by_group(sketch_groups(df, by, compression=None), by).set_index(by).sort_index()
+
+    q = df.groupby(by)["price"].quantile([0.25, 0.75]).unstack()
+    iqr = q[0.75] - q[0.25]
+    pd.testing.assert_series_equal(bounds["lower"], q[0.25] - 1.5 * iqr, check_names=False)
+    pd.testing.assert_series_equal(bounds["upper"], q[0.75] + 1.5 * iqr, check_names=False)
+
+    kept = remove_price_outliers_grouped(df, bounds.reset_index(), by)
+    lower = df.join(bounds, on=by)["lower"]
+    assert (kept["price"] >= lower[kept.index]).all()
+    assert len(kept) < df["price"].notna().sum()
+
+
+@pytest.mark.unit
+def test_compressed_sketch_stays_small_and_close_to_exact_quantiles():
+    from application.dataset.processing import QuantileSketch
+
+    values = np.random.default_rng(1).lognormal(2.3, 0.6, 200_000)
+    sketch = QuantileSketch.from_values(values[:1000], compression=100)
+    for chunk in np.array_split(values[1000:], 20):
+        sketch = sketch.merge(QuantileSketch.from_values(chunk, compression=100))
+
+    assert not sketch.exact and len(sketch.means) <= 100
+    assert sketch.count == len(values)
+    ranked = np.sort(values)
+    for q in (0.25, 0.75):
+        rank = np.searchsorted(ranked, sketch.quantile(q)) / len(values)
+        assert abs(rank - q) < 0.01
+
+
+@pytest.mark.unit
+def test_sketch_groups_rejects_unknown_columns():
+    from application.dataset.processing import sketch_groups
+
+    with pytest.raises(ValueError, match="zip"):
+        sketch_groups(_prices(10), ["zip"])
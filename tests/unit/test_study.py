@@ -0,0 +1,107 @@
+import datetime as dt
+
+import optuna
+import pytest
+from optuna.storages import JournalStorage, RDBStorage
+from optuna.trial import TrialState, create_trial
+
+from model.study import PRUNERS, _improves_on_earlier, champion_callback, make_pruner, optimize_study, optuna_storage
+
+pytestmark = pytest.mark.unit
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+def _quadratic(trial: optuna.Trial) -> float:
+    x = trial.suggest_float("x", -10, 10)
+    trial.set_user_attr("x_squared", x * x)
+    return (x - 2) ** 2
+
+
+def _completed(value: float, seconds: int) -> optuna.trial.FrozenTrial:
+    trial = create_trial(state=TrialState.COMPLETE, value=value, params={}, distributions={})
+    trial.datetime_start = dt.datetime(2024, 1, 1)
+    trial.datetime_complete = trial.datetime_start + dt.timedelta(seconds=seconds)
+    return trial
+
+
+def test_storage_from_url(tmp_path):
+    assert optuna_storage(None) is None
+    assert optuna_storage("") is None
+    assert isinstance(optuna_storage(f"journal:{tmp_path / 'optuna.log'}"), JournalStorage)
+    assert isinstance(optuna_storage(f"sqlite:///{tmp_path / 'optuna.db'}"), RDBStorage)
+
+
+def test_pruners_by_name():
+    assert isinstance(make_pruner("none"), optuna.pruners.NopPruner)
+    assert isinstance(make_pruner("median"), optuna.pruners.MedianPruner)
+    assert isinstance(make_pruner("hyperband"), optuna.pruners.HyperbandPruner)
+    assert isinstance(make_pruner("halving"), optuna.pruners.SuccessiveHalvingPruner)
+    assert set(PRUNERS) == {"none", "median", "hyperband", "halving"}
+    with pytest.raises(ValueError, match="Unknown pruner"):
+        make_pruner("threshold")
+
+
+def _stepwise(trial: optuna.Trial) -> float:
+    x = trial.suggest_float("x", -10, 10)
+    for step in range(1, 5):
+        trial.report((x - 2) ** 2 + 1 / step, step)
+        if trial.should_prune():
+            raise optuna.TrialPruned()
+    return (x - 2) ** 2
+
+
+def test_workers_share_the_pruner(tmp_path):
+    storage = f"journal:{tmp_path / 'optuna.log'}"
+
+    study = optimize_study(
+        _stepwise, n_trials=20, study_name="pruned", storage_url=storage, n_workers=2, pruner="median"
+    )
+
+    states = {t.state for t in study.trials}
+    assert optuna.trial.TrialState.PRUNED in states
+    assert optuna.trial.TrialState.COMPLETE in states
+
+
+def test_champion_verdict_follows_completion_order_not_callback_order():
+    study = optuna.create_study(direction="minimize")
+    # trial 1 finished first with the better value; trial 0 (started earlier) finished later
+    first, late = _completed(5.0, seconds=20), _completed(3.0, seconds=10)
+    study.add_trials([first, late])
+    first, late = study.get_trials()
+
+    assert _improves_on_earlier(study, late) == (True, None)
+    assert _improves_on_earlier(study, first) == (False, 3.0)
+    # the callback only reads the study
+    champion_callback(study, first)
+    champion_callback(study, late)
+    assert study.user_attrs == {}
+
+
+def test_single_worker_keeps_the_study_in_memory():
+    study = optimize_study(_quadratic, n_trials=4, study_name="in-memory")
+
+    assert len(study.trials) == 4
+    assert all("x_squared" in t.user_attrs for t in study.trials)
+
+
+def test_workers_share_one_study_and_its_trial_budget(tmp_path):
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+
+    study = optimize_study(_quadratic, n_trials=6, study_name="shared", storage_url=storage, n_workers=2)
+
+    trials = optuna.load_study(study_name="shared", storage=storage).trials
+    # the budget is the study's: a worker may overshoot it only by the trials the others are running
+    assert 6 <= len(trials) <= 7
+    assert len({t.number for t in trials}) == len(trials)
+    assert len(study.trials) == len(trials)
+
+
+def test_workers_without_storage_share_a_temporary_journal(tmp_path, monkeypatch):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    study = optimize_study(_quadratic, n_trials=4, study_name="temporary", n_workers=2)
+
+    assert 4 <= len(study.trials) <= 5
+    assert study.best_value == min(t.value for t in study.trials)
+    assert list(tmp_path.iterdir()) == []  # the journal is gone
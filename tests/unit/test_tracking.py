@@ -0,0 +1,163 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from model import tracking
+from model.tracking import RunLogger
+
+pytestmark = pytest.mark.unit
+
+
+class FakeClient:
+    """Records log_batch requests and artifact uploads (with the file content at upload time)."""
+
+    def __init__(self, failures=0):
+        self.batches, self.uploads = [], []
+        self.failures = failures
+        self.release = threading.Event()
+        self.release.set()
+
+    def _maybe_fail(self):
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("tracking server unavailable")
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self._maybe_fail()
+        self.batches.append((run_id, list(metrics), list(params), list(tags)))
+
+    def log_artifact(self, run_id, local_path, artifact_path=None):
+        self.release.wait(5)
+        self._maybe_fail()
+        with open(local_path) as f:
+            self.uploads.append((run_id, local_path.rsplit("/", 1)[-1], artifact_path, f.read()))
+
+
+def test_entities_are_buffered_until_flushed():
+    client = FakeClient()
+    run = RunLogger("run-1", client=client)
+
+    run.log_params({"alpha": 0.1, "fit_intercept": True})
+    run.log_metric("rmse", 1.5)
+    run.log_metric("running", 2.0, step=3)
+    run.set_tag("model_name", "ridge")
+    assert client.batches == []
+
+    run.wait()
+
+    [(run_id, metrics, params, tags)] = client.batches
+    assert run_id == "run-1"
+    assert {(p.key, p.value) for p in params} == {("alpha", "0.1"), ("fit_intercept", "True")}
+    assert [(m.key, m.value, m.step) for m in metrics] == [("rmse", 1.5, 0), ("running", 2.0, 3)]
+    assert [(t.key, t.value) for t in tags] == [("model_name", "ridge")]
+
+
+def test_batches_respect_the_log_batch_limits():
+    client = FakeClient()
+    run = RunLogger("run-1", client=client)
+
+    run.log_params({f"p{i}": i for i in range(150)})
+    for step in range(2500):
+        run.log_metric("loss", step, step=step)
+    run.wait()
+
+    for _, metrics, params, tags in client.batches:
+        assert len(metrics) <= 1000 and len(params) <= 100 and len(tags) <= 100
+        assert len(metrics) + len(params) + len(tags) <= 1000
+    assert sum(len(b[1]) for b in client.batches) == 2500
+    assert sum(len(b[2]) for b in client.batches) == 150
+    assert run.stats.requests == len(client.batches)
+
+
+def test_artifacts_upload_in_the_background_from_a_copy(tmp_path):
+    client = FakeClient()
+    client.release.clear()  # hold the uploads until the file has been rewritten
+    path = tmp_path / "leaderboard.csv"
+    with ThreadPoolExecutor(2) as executor:
+        run = RunLogger("run-1", client=client, executor=executor)
+        path.write_text("ridge")
+        run.log_artifact(path, artifact_path="tables")
+        path.write_text("xgboost")
+        run.log_artifact(path, artifact_path="tables")
+        run.log_dict({"n_splits": 5}, "context/cv.json")
+        assert client.uploads == []
+
+        staging = run._tmp_dir
+        client.release.set()
+        stats = run.wait()
+
+    assert sorted(u[1:] for u in client.uploads) == [
+        ("cv.json", "context", '{\n  "n_splits": 5\n}'),
+        ("leaderboard.csv", "tables", "ridge"),
+        ("leaderboard.csv", "tables", "xgboost"),
+    ]
+    assert stats.requests == 3 and stats.failed_requests == 0
+    assert not os.path.exists(staging)  # the staged copies are gone
+
+
+def test_failed_requests_are_retried_then_counted(tmp_path):
+    path = tmp_path / "plot.png"
+    path.write_text("png")
+
+    client = FakeClient(failures=2)
+    run = RunLogger("run-1", client=client, attempts=3, backoff=0)
+    run.log_artifact(path)
+    assert len(client.uploads) == 1 and run.stats.failed_requests == 0
+
+    client = FakeClient(failures=3)
+    run = RunLogger("run-1", client=client, attempts=3, backoff=0)
+    run.log_metric("rmse", 1.0)
+    stats = run.wait()  # does not raise: tracking never fails the run
+    assert client.batches == [] and stats.failed_requests == 1
+
+
+def test_stats_become_run_metrics():
+    run = RunLogger("run-1", client=FakeClient())
+    with run.timed():
+        pass
+    run.log_metric("rmse", 1.0)
+    stats = run.wait()
+
+    metrics = stats.as_metrics()
+    assert set(metrics) == {
+        "tracking_blocking_sec",
+        "tracking_background_sec",
+        "tracking_requests",
+        "tracking_failed_requests",
+    }
+    assert metrics["tracking_requests"] == 1.0
+    assert metrics["tracking_blocking_sec"] > 0
+    assert metrics["tracking_background_sec"] == 0  # without an executor, the request blocked the caller
+
+
+class SlowClient(FakeClient):
+    """Each request takes a second of the fake ``clock``."""
+
+    def __init__(self, clock):
+        super().__init__()
+        self.clock = clock
+
+    def log_batch(self, run_id, metrics=(), params=(), tags=()):
+        self.clock[0] += 1.0
+        super().log_batch(run_id, metrics, params, tags)
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_tracking_time_is_counted_once(monkeypatch, background):
+    clock = [0.0]
+    monkeypatch.setattr(tracking.time, "perf_counter", lambda: clock[0])
+    executor = ThreadPoolExecutor(max_workers=1) if background else None
+    run = RunLogger("run-1", client=SlowClient(clock), executor=executor)
+
+    run.log_params({f"p{i}": i for i in range(tracking._MAX_PARAMS)})  # a full buffer: flushed within log_params
+    with run.timed():
+        run.set_tag("stage", "refit")
+    stats = run.wait()
+
+    assert stats.requests == 2
+    if background:  # both requests ran on the executor, waited for in wait()
+        assert stats.background_seconds == 2.0 and stats.blocking_seconds <= 2.0
+    else:  # the flushes within log_params and wait count once, as blocking time
+        assert stats.background_seconds == 0.0 and stats.blocking_seconds == 2.0
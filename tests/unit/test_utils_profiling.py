@@ -0,0 +1,40 @@
+def test_stage_profiler_records_time_memory_and_rows():
+    from application.utils.profiling import StageProfiler
+
+    profiler = StageProfiler(interval=0.01)
+    with profiler.stage("build") as stats:
+        data = list(range(100_000))
+        stats.rows = len(data)
+    with profiler.stage("noop"):
+        pass
+
+    assert [s.name for s in profiler.stages] == ["build", "noop"]
+    build = profiler.stages[0]
+    assert build.rows == 100_000
+    assert build.seconds >= 0.0
+    assert build.peak_rss_mb is None or build.peak_rss_mb > 0
+    profiler.log_summary()  # smoke
+
+
+def test_stage_profiler_records_stage_even_on_error():
+    import pytest
+
+    from application.utils.profiling import StageProfiler
+
+    profiler = StageProfiler()
+    with pytest.raises(ValueError), profiler.stage("boom"):
+        raise ValueError("fail")
+    assert profiler.stages[0].name == "boom"
+
+
+def test_cpu_usage_measures_busy_time():
+    from application.utils.profiling import cpu_usage, psutil
+
+    with cpu_usage(cores=1) as usage:
+        sum(i * i for i in range(2_000_000))
+
+    assert usage.seconds > 0
+    if psutil is None:
+        assert usage.utilization is None
+    else:
+        assert 0.3 < usage.utilization < 1.5
@@ -0,0 +1,79 @@
+import pickle
+
+import pandas as pd
+import pytest
+
+from application.utils.shared_data import SharedFrame, shared_frame
+
+
+def _frame(n=6):
+    return pd.DataFrame(
+        {
+            "category": pd.Categorical(["Salads", "Wraps"] * (n // 2)),
+            "state_id": ["wi", "tx", "ut"] * (n // 3),
+            "ingredients": [["tomato", "basil"], [], ["kale"]] * (n // 3),
+            "density": [float(i) for i in range(n)],
+        },
+        index=range(10, 10 + n),
+    )
+
+
+@pytest.mark.unit
+def test_shared_frame_pickles_as_a_path(tmp_path):
+    df = _frame()
+
+    with shared_frame(df, folder=tmp_path) as shared:
+        payload = pickle.dumps(shared)
+        restored = pickle.loads(payload)
+
+        assert isinstance(shared, SharedFrame) and isinstance(restored, SharedFrame)
+        assert len(payload) < 500
+        pd.testing.assert_frame_equal(restored, df, check_frame_type=False)
+        assert restored["ingredients"].tolist() == df["ingredients"].tolist()
+        # fold selections are ordinary frames
+        assert type(shared.take([0, 2])) is pd.DataFrame
+        assert type(shared.iloc[1:]) is pd.DataFrame
+        assert len(list(tmp_path.iterdir())) == 1
+
+    assert not list(tmp_path.iterdir())
+
+
+@pytest.mark.unit
+def test_cross_validation_workers_attach_the_shared_frame(tmp_path):
+    from sklearn.compose import ColumnTransformer
+    from sklearn.linear_model import LinearRegression
+    from sklearn.model_selection import KFold, cross_val_score
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import OneHotEncoder
+
+    df = _frame(60)
+    y = df["density"] * 2 + (df["category"] == "Wraps")
+    pipe = Pipeline(
+        [
+            ("pre", ColumnTransformer([("cat", OneHotEncoder(), ["category"]), ("num", "passthrough", ["density"])])),
+            ("model", LinearRegression()),
+        ]
+    )
+    cv = KFold(3, shuffle=True, random_state=0)
+
+    expected = cross_val_score(pipe, df, y, cv=cv)
+    with shared_frame(df, folder=tmp_path) as shared:
+        scores = cross_val_score(pipe, shared, y, cv=cv, n_jobs=2)
+
+    assert scores.tolist() == pytest.approx(expected.tolist())
+
+
+@pytest.mark.unit
+def test_numeric_columns_map_the_file_and_stale_frames_are_evicted(tmp_path):
+    from application.utils import shared_data
+
+    df = _frame()
+    with shared_frame(df, folder=tmp_path) as shared:
+        first = shared.shared_path
+        assert not shared["density"].to_numpy().flags.owndata  # a view of the mapped file
+        # what a reused worker keeps after the run that attached it
+        worker_frame = shared_data._ATTACHED[first]
+
+    shared_data._ATTACHED[first] = worker_frame
+    with shared_frame(df, folder=tmp_path) as shared:
+        assert list(shared_data._ATTACHED) == [shared.shared_path]
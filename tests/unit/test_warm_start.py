@@ -0,0 +1,125 @@
+from functools import partial
+
+import numpy as np
+import optuna
+import pandas as pd
+import pytest
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import Ridge
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import MinMaxScaler, OneHotEncoder
+
+from model.parallelism import plan_parallelism
+from model.study import optimize_study, optuna_storage
+from model.warm_start import StudyKey, check_study_key, feature_set_key, jaccard_estimate, row_sketch, warm_start
+
+pytestmark = pytest.mark.unit
+
+optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+
+def _data(n=2000, seed=0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame({"category": rng.choice(["Salads", "Wraps", "Pizza"], n), "density": rng.random(n)})
+    y = pd.Series(X["density"] * 3 + rng.normal(0, 0.1, n), name="price")
+    return X, y
+
+
+def _preprocessor(scaler=None):
+    return ColumnTransformer(
+        [("cat", OneHotEncoder(handle_unknown="ignore"), ["category"]), ("num", scaler or MinMaxScaler(), ["density"])]
+    )
+
+
+def _quadratic(trial: optuna.Trial) -> float:
+    x = trial.suggest_float("x", -10, 10)
+    return (x - 2) ** 2
+
+
+def test_feature_set_key_follows_the_preprocessor_configuration():
+    assert feature_set_key(_preprocessor()) == feature_set_key(_preprocessor())
+    assert feature_set_key(_preprocessor()) != feature_set_key(_preprocessor(MinMaxScaler(feature_range=(-1, 1))))
+
+
+def test_feature_set_key_survives_the_parallelism_plans_of_earlier_models():
+    preprocessor = _preprocessor()
+    preprocessor.set_params(n_jobs=-1)
+    X, y = _data()
+    keys = []
+    for model_name, cores in [("ridge", 4), ("rforest", 8)]:  # tuned in sequence, on one shared preprocessor
+        keys.append(StudyKey.of(model_name, preprocessor, X, y))
+        plan = plan_parallelism(3, model_name, trial_jobs=2, cores=cores)
+        plan.configure(Pipeline([("preprocessor", preprocessor), ("model", Ridge())]), refit=True)
+        preprocessor.set_params(n_jobs=plan.transformer_jobs)  # even a plan applied in place
+
+    assert keys[1].feature_set == keys[0].feature_set == feature_set_key(_preprocessor())
+    assert keys[1].study_name.split("-fs")[1] == keys[0].study_name.split("-fs")[1]
+
+
+def test_row_overlap_is_estimated_from_the_sketches():
+    X, y = _data()
+    # a refresh: 10% of the rows dropped, as many new ones added (shuffled, reindexed)
+    X_new, y_new = _data(seed=1)
+    X2 = pd.concat([X.iloc[200:], X_new.iloc[:200]]).sample(frac=1, random_state=0).reset_index(drop=True)
+    y2 = pd.concat([y.iloc[200:], y_new.iloc[:200]]).sample(frac=1, random_state=0).reset_index(drop=True)
+
+    assert jaccard_estimate(row_sketch(X, y), row_sketch(X, y)) == 1.0
+    assert jaccard_estimate(row_sketch(X, y), row_sketch(X2, y2)) == pytest.approx(1800 / 2200, abs=0.06)
+    assert jaccard_estimate(row_sketch(X, y), row_sketch(X_new, y_new)) < 0.05
+
+
+def test_same_data_continues_the_stored_study(tmp_path):
+    storage = f"sqlite:///{tmp_path / 'optuna.db'}"
+    X, y = _data()
+    key = StudyKey.of("ridge", _preprocessor(), X, y)
+
+    for _ in range(2):
+        study = optimize_study(
+            _quadratic, 3, key.study_name, storage_url=storage, prepare=lambda s: check_study_key(s, key)
+        )
+
+    assert len(study.trials) == 6
+    assert StudyKey.of("ridge", _preprocessor(), X.copy(), y.copy()).study_name == key.study_name
+    assert StudyKey.load(study.user_attrs) == key
+
+
+def test_new_data_starts_from_the_best_configurations_of_a_similar_study(tmp_path):
+    storage_url = f"journal:{tmp_path / 'optuna.log'}"
+    X, y = _data()
+    old_key = StudyKey.of("ridge", _preprocessor(), X, y)
+    old = optimize_study(
+        _quadratic, 8, old_key.study_name, storage_url=storage_url, prepare=lambda s: check_study_key(s, old_key)
+    )
+    best = sorted(t.value for t in old.trials)[:3]
+
+    refreshed = StudyKey.of("ridge", _preprocessor(), X.iloc[100:], y.iloc[100:])  # 5% of the rows dropped
+    seeded = []
+
+    def prepare(study):
+        check_study_key(study, refreshed)
+        seeded.append(warm_start(study, optuna_storage(storage_url), refreshed, n_configs=3))
+
+    new = optimize_study(_quadratic, 5, refreshed.study_name, storage_url=storage_url, prepare=prepare)
+
+    assert refreshed.study_name != old_key.study_name
+    assert seeded[0].source == old_key.study_name and seeded[0].n_enqueued == 3
+    assert seeded[0].similarity > 0.9
+    assert len(new.trials) == 5  # the enqueued configurations count towards the budget
+    np.testing.assert_allclose(sorted(t.value for t in new.trials[:3]), best)
+    assert all(t.user_attrs["warm_start_from"].startswith(old_key.study_name) for t in new.trials[:3])
+
+
+def test_no_warm_start_from_other_models_or_unrelated_data(tmp_path):
+    storage_url = f"journal:{tmp_path / 'optuna.log'}"
+    X, y = _data()
+    for key in (StudyKey.of("xgboost", _preprocessor(), X, y), StudyKey.of("ridge", _preprocessor(), *_data(seed=2))):
+        optimize_study(
+            _quadratic, 2, key.study_name, storage_url=storage_url, prepare=partial(check_study_key, key=key)
+        )
+
+    key = StudyKey.of("ridge", _preprocessor(), X, y)
+    study = optuna.create_study(study_name=key.study_name, storage=optuna_storage(storage_url))
+    seeded = warm_start(study, optuna_storage(storage_url), key)
+
+    assert seeded.source is None and seeded.similarity < 0.05
+    assert study.trials == []
@@ -0,0 +1,551 @@
+"""
+Benchmarks for the data and training pipelines.
+
+Each command builds a synthetic (or loaded) input, times the current implementation
+against the reference one it replaced, and checks that both produce the same output.
+
+Usage:
+    python -m tools.bench --help
+    python -m tools.bench ingredients --rows 200000
+    python -m tools.bench address --kaggle
+    python -m tools.bench menu --rows 2000000
+    python -m tools.bench sampling --menus 2000000
+    python -m tools.bench text-features --rows 100000
+    python -m tools.bench encodings --rows 100000
+    python -m tools.bench model-load --rows 50000
+"""
+
+from __future__ import annotations
+
+import html
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+import click
+import numpy as np
+import pandas as pd
+from bs4 import BeautifulSoup
+from loguru import logger
+
+from application.dataset import processing
+from application.dataset.processing import polars_engine
+from application.utils.misc import unescape_html
+from application.utils.profiling import StageProfiler, current_rss_mb
+from core import settings
+
+_FOOD_TOKENS = (
+    "Tomato",
+    "basil",
+    "Red Onion",
+    "lettuce",
+    "Bacon",
+    "chicken breast",
+    "Avocado",
+    "cheddar cheese",
+    "Sourdough",
+    "pesto",
+    "cucumber",
+    "Feta",
+    "romaine",
+    "turkey",
+    "Honey Mustard",
+)
+_MARKUP_TOKENS = ("Mac &amp; Cheese", "<b>Ham</b>", "salt &amp; pepper", "Fish &#38; Chips")
+_STATES = ("TX", "VA", "WA", "WI", "UT", "CA", "NY")
+_MENU_CATEGORIES = (
+    "Sandwiches",
+    "Salads",
+    "Wraps",
+    "Picked for you",
+    "Drinks",
+    "Desserts",
+    "Salads &amp; Bowls",
+) + tuple(f"Category {i}" for i in range(30))
+_DESCRIPTIONS = (
+    "Tomato &amp; basil",
+    "Bacon, lettuce, tomato",
+    " grilled chicken ",
+    "",
+    "Greens &nbsp;",
+    None,
+) + tuple(f"Menu item description {i}" for i in range(300))
+
+
+def _timed(fn: Callable[..., Any], *args, **kwargs) -> tuple[Any, float]:
+    """Run ``fn`` once and return (result, elapsed seconds)."""
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - t0
+
+
+def _report(name: str, rows: int, reference_s: float, current_s: float, equal: bool) -> None:
+    click.echo(
+        f"{name}: rows={rows:,} reference={reference_s:.3f}s current={current_s:.3f}s "
+        f"speedup={reference_s / max(current_s, 1e-9):.1f}x equal={equal}"
+    )
+
+
+# -------------------- reference implementations --------------------
+def _reference_clean_ingredients_column(df: pd.DataFrame, col: str = "ingredients") -> pd.DataFrame:
+    """Per-element ingredient cleaner (pre-vectorization), kept as the equivalence oracle."""
+    out = df.copy()
+    out = out[out[col].apply(len) > 0].copy()
+    out[col] = out[col].map(lambda xs: list(map(lambda y: y.lower(), xs)))
+    out[col] = out[col].map(lambda xs: list(set(xs)))
+    out[col] = out[col].map(lambda xs: list(map(lambda y: y.strip(), xs)))
+    out[col] = out[col].map(lambda xs: list(map(lambda y: BeautifulSoup(y, "html.parser").get_text(strip=True), xs)))
+    out[col] = out[col].map(lambda xs: list(map(lambda y: html.unescape(y).strip(), xs)))
+    return out
+
+
+def _reference_preprocess_menu(df_menu: pd.DataFrame) -> pd.DataFrame:
+    """Row-wise menu cleaner (pre-vectorization), kept as the equivalence oracle."""
+    df = df_menu.copy()
+    df["description"] = df.description.str.strip()
+    df.dropna(subset=["description"], inplace=True)
+    df["category"] = df.category.map(unescape_html).str.strip().str.normalize("NFKD")
+    df["description"] = df.description.map(unescape_html).str.strip().str.normalize("NFKD")
+    df = df[df.description.str.len() > 0].drop_duplicates()
+    df["price"] = df["price"].replace({"USD": ""}, regex=True).astype(float)
+    df = df[df["price"] != 0]
+    return df[df.category != "Picked for you"].copy()
+
+
+def _reference_build_address_fields(df_restaurant: pd.DataFrame) -> pd.DataFrame:
+    """Triple-split address parser (pre-vectorization), kept as the equivalence oracle."""
+    df = df_restaurant.copy()
+    df = df[df.full_address.str.split(",").apply(lambda x: len(x[-2].strip())) == 2].copy()
+    has_city = df.full_address.str.strip().str.lower().str.split(",").apply(lambda x: len(x[-3])) != 0
+    df = df[has_city].copy()
+    df["city"] = df.full_address.str.strip().str.lower().str.split(",").str[-3].str.strip()
+    df["state_id"] = df.full_address.str.strip().str.lower().str.split(",").str[-2].str.strip()
+    return df
+
+
+def _reference_build_preprocessor():
+    """Preprocessor with inline lambdas (pre-`menu_transformers`), kept as the serialization baseline."""
+    from sklearn.compose import ColumnTransformer
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder
+
+    from application.preprocessing import schema
+
+    text_tf = Pipeline(
+        [
+            ("pick_col", FunctionTransformer(lambda x: x.iloc[:, 0], validate=False)),
+            (
+                "tfidf",
+                TfidfVectorizer(
+                    analyzer="word",
+                    tokenizer=lambda x: x,
+                    preprocessor=lambda x: x,
+                    token_pattern=None,
+                    lowercase=False,
+                    ngram_range=(1, 2),
+                    min_df=2,
+                ),
+            ),
+        ]
+    )
+    return ColumnTransformer(
+        [
+            ("num", Pipeline([("scaler", MinMaxScaler())]), list(schema.numeric)),
+            ("cat", Pipeline([("onehot", OneHotEncoder(handle_unknown="ignore"))]), list(schema.categorical)),
+            ("text", text_tf, list(schema.text)),
+        ],
+        n_jobs=-1,
+    )
+
+
+# -------------------- synthetic inputs --------------------
+def _synthetic_ingredients(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    vocab = np.array(_FOOD_TOKENS + _MARKUP_TOKENS, dtype=object)
+    # markup tokens are rare in NER output, keep them at ~2% of tokens
+    weights = np.r_[np.full(len(_FOOD_TOKENS), 0.98 / len(_FOOD_TOKENS)), np.full(len(_MARKUP_TOKENS), 0.005)]
+    pads = np.array(["", " ", "  "], dtype=object)
+    lists = []
+    for n in rng.integers(0, 9, size=rows):
+        tokens = rng.choice(vocab, size=n, p=weights)
+        lists.append([f"{p}{t}{p}" for t, p in zip(tokens, rng.choice(pads, size=n), strict=True)])
+    return pd.DataFrame({"ingredients": lists, "price": rng.uniform(1, 30, size=rows)})
+
+
+def _synthetic_restaurants(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    cities = np.array(["Appleton", "San Diego", "Austin", "Salt Lake City", " ", "Richmond"], dtype=object)
+    states = np.array(["WI", "CA", "TX", "UT", "Texas", "VA"], dtype=object)
+    streets = np.array(["123 Main St", "45 Oak Ave, Suite 2", "9 Elm Rd"], dtype=object)
+    full_address = (
+        pd.Series(rng.choice(streets, size=rows))
+        + ", "
+        + rng.choice(cities, size=rows)
+        + ", "
+        + rng.choice(states, size=rows)
+        + ", "
+        + pd.Series(rng.integers(10000, 99999, size=rows)).astype(str)
+    )
+    return pd.DataFrame({"id": np.arange(rows, dtype=np.int32), "price_range": "$", "full_address": full_address})
+
+
+def _synthetic_base_frames(restaurants: int, menus: int, seed: int):
+    """Restaurants, menus and density tables shaped like the Kaggle export (see ``sampling.load_base_frames``)."""
+    rng = np.random.default_rng(seed)
+    state = rng.choice(_STATES, size=restaurants)
+    city = np.char.add(np.char.add("City ", state.astype(str)), rng.integers(0, 12, size=restaurants).astype(str))
+    full_address = pd.Series(np.arange(restaurants).astype(str)) + " Main St, " + city + ", " + state + ", 78701"
+    df_restaurant = pd.DataFrame(
+        {
+            "id": np.arange(restaurants, dtype=np.int32),
+            "price_range": rng.choice(np.array(["$", "$$", "$$$", None], dtype=object), size=restaurants),
+            "full_address": full_address,
+        }
+    )
+    price = np.round(rng.lognormal(2.3, 0.5, size=menus), 1)
+    price[rng.random(menus) < 0.02] = 0
+    df_menu = pd.DataFrame(
+        {
+            # ~5% of menu rows point at restaurants that are not in the restaurants table
+            "restaurant_id": rng.integers(0, int(restaurants * 1.05), size=menus),
+            "category": rng.choice(np.array(_MENU_CATEGORIES, dtype=object), size=menus),
+            "description": rng.choice(np.array(_DESCRIPTIONS, dtype=object), size=menus),
+            "price": pd.Series(price).map("{:.2f} USD".format),
+        }
+    )
+    df_density = pd.DataFrame(
+        [
+            {"city": f"City {s}{i}" if i % 2 else f"city {s.lower()}{i}", "state_id": s, "density": str(100 + 37 * i)}
+            for s in _STATES
+            for i in range(10)
+        ]
+    )
+    return df_restaurant, df_menu, df_density
+
+
+def _pandas_final_menu_frame(df_restaurant, df_menu, df_density, cfg) -> pd.DataFrame:
+    """The pandas-engine pre-NER chain of ``generate_training_sample``."""
+    df_menu = processing.preprocess_menu(df_menu)
+    df_restaurant, df_menu = processing.sync_restaurants_and_menus(df_restaurant, df_menu)
+    df_addr = processing.build_address_fields(df_restaurant)
+    df_addr = df_addr[df_addr.city.isin(set(df_density.city.str.strip().str.lower()))]
+    df_top_state = processing.filter_to_top_states(processing.merge_density(df_addr, df_density), cfg.top_states_filter)
+    df_res_ext, top_categories = processing.compute_top_categories(df_menu, df_top_state, cfg.top_categories_per_city)
+    top_cities = processing.pick_top_cities(top_categories, cfg.focus_categories, cfg.top_cities_per_state)
+    df_final = processing.build_final_menu_frame(df_menu, df_res_ext, top_cities, cfg.focus_categories)
+    return processing.as_object(df_final).reset_index(drop=True)
+
+
+def _synthetic_training_frame(rows: int, phrases: int, seed: int) -> tuple[pd.DataFrame, pd.Series]:
+    """Training-sample features (see ``ModelSchema``) with a price driven by Zipf-distributed ingredient phrases."""
+    rng = np.random.default_rng(seed)
+    vocab = np.array([f"ingredient phrase {i}" for i in range(phrases)], dtype=object)
+    # long tail: most phrases are rare, as in the NER output
+    weights = 1.0 / np.arange(1, phrases + 1)
+    weights /= weights.sum()
+    effects = rng.normal(0, 1.5, size=phrases)
+    categories = np.array(_MENU_CATEGORIES[:8], dtype=object)
+    X = pd.DataFrame(
+        {
+            "cost_of_living_index": rng.uniform(80, 180, size=rows),
+            "density": rng.uniform(100, 10_000, size=rows),
+            "category": rng.choice(categories, size=rows),
+            "price_range": rng.choice(np.array(["cheap", "moderate", "expensive"], dtype=object), size=rows),
+            "state_id": rng.choice(np.array(_STATES, dtype=object), size=rows),
+        }
+    )
+    lengths = rng.integers(1, 9, size=rows)
+    picks = np.split(rng.choice(phrases, size=int(lengths.sum()), p=weights), np.cumsum(lengths)[:-1])
+    X["ingredients"] = [vocab[idx].tolist() for idx in picks]
+    y = (
+        8
+        + X["cost_of_living_index"] / 40
+        + X["category"].map({c: i for i, c in enumerate(categories)})
+        + np.array([effects[idx].sum() for idx in picks])
+        + rng.normal(0, 1, size=rows)
+    )
+    return X, y.rename("price")
+
+
+# -------------------- CLI --------------------
+@click.group(
+    name="restaurant-menu-pricing-bench",
+    help="Benchmarks for the Restaurant Menu Pricing data and training pipelines.",
+    context_settings={"help_option_names": ["-h", "--help"]},
+)
+def cli() -> None:
+    pass
+
+
+@cli.command("ingredients")
+@click.option("--rows", type=int, default=200_000, show_default=True, help="Number of synthetic menu rows.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_ingredients(rows: int, seed: int) -> None:
+    """Vectorized `clean_ingredients_column` vs the per-element BeautifulSoup cleaner."""
+    df = _synthetic_ingredients(rows, seed)
+    logger.info("Synthetic ingredients: {} rows, {} tokens", len(df), int(df["ingredients"].str.len().sum()))
+
+    expected, reference_s = _timed(_reference_clean_ingredients_column, df)
+    actual, current_s = _timed(processing.clean_ingredients_column, df)
+
+    equal = expected.index.equals(actual.index) and expected["ingredients"].tolist() == actual["ingredients"].tolist()
+    _report("clean_ingredients_column", rows, reference_s, current_s, equal)
+    if not equal:
+        raise click.ClickException("clean_ingredients_column output differs from the reference implementation")
+
+
+@cli.command("menu")
+@click.option("--rows", type=int, default=2_000_000, show_default=True, help="Number of synthetic menu rows.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_menu(rows: int, seed: int) -> None:
+    """Per-distinct-value `preprocess_menu` vs the row-wise cleaner."""
+    _, df, _ = _synthetic_base_frames(max(rows // 100, 1), rows, seed)
+
+    expected, reference_s = _timed(_reference_preprocess_menu, df)
+    actual, current_s = _timed(processing.preprocess_menu, df)
+
+    equal = expected.equals(processing.as_object(actual))
+    _report("preprocess_menu", rows, reference_s, current_s, equal)
+    click.echo(f"throughput: reference={rows / reference_s:,.0f} rows/s current={rows / current_s:,.0f} rows/s")
+    if not equal:
+        raise click.ClickException("preprocess_menu output differs from the reference implementation")
+
+
+@cli.command("address")
+@click.option("--rows", type=int, default=500_000, show_default=True, help="Number of synthetic restaurant rows.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+@click.option(
+    "--kaggle",
+    is_flag=True,
+    help="Benchmark on the full restaurants table from the Kaggle export (Config.RESTAURANTS_DS) instead.",
+)
+def bench_address(rows: int, seed: int, kaggle: bool) -> None:
+    """Single-pass regex `build_address_fields` vs the triple-split parser."""
+    if kaggle:
+        from application.dataset.config import Config
+        from application.dataset.io import load_kaggle_dataset
+
+        cfg = Config()
+        df = load_kaggle_dataset(
+            cfg.RESTAURANTS_DS, cfg.RESTAURANTS_FILE, pandas_kwargs={"usecols": ["id", "price_range", "full_address"]}
+        )
+        df = df.dropna(subset=["full_address"])
+    else:
+        df = _synthetic_restaurants(rows, seed)
+
+    expected, reference_s = _timed(_reference_build_address_fields, df)
+    actual, current_s = _timed(processing.build_address_fields, df)
+
+    equal = expected.equals(processing.as_object(actual))
+    _report("build_address_fields", len(df), reference_s, current_s, equal)
+    if not equal:
+        raise click.ClickException("build_address_fields output differs from the reference implementation")
+
+
+@cli.command("sampling")
+@click.option("--restaurants", type=int, default=20_000, show_default=True, help="Number of synthetic restaurants.")
+@click.option("--menus", type=int, default=2_000_000, show_default=True, help="Number of synthetic menu rows.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_sampling(restaurants: int, menus: int, seed: int) -> None:
+    """Pre-NER sampling chain: polars engine vs pandas engine (wall time, peak RSS, equality)."""
+    from application.dataset.config import Config
+
+    cfg = Config()
+    df_restaurant, df_menu, df_density = _synthetic_base_frames(restaurants, menus, seed)
+    logger.info("Synthetic base frames: restaurants={} menus={}", len(df_restaurant), len(df_menu))
+
+    profiler = StageProfiler()
+    peaks = {}
+    for engine in ("pandas", "polars"):
+        rss_before = current_rss_mb()
+        with profiler.stage(engine) as stats:
+            if engine == "pandas":
+                expected = _pandas_final_menu_frame(df_restaurant, df_menu, df_density, cfg)
+            else:
+                actual = polars_engine.select_final_menu_frame(
+                    df_restaurant,
+                    df_menu,
+                    df_density,
+                    cfg.top_states_filter,
+                    cfg.top_categories_per_city,
+                    cfg.focus_categories,
+                    cfg.top_cities_per_state,
+                )
+            stats.rows = len(expected if engine == "pandas" else actual)
+        if rss_before is not None and stats.peak_rss_mb is not None:
+            peaks[engine] = stats.peak_rss_mb - rss_before
+
+    pandas_s, polars_s = (s.seconds for s in profiler.stages)
+    equal = expected.equals(actual)
+    _report("sampling[polars]", len(df_menu), pandas_s, polars_s, equal)
+    if peaks:
+        click.echo(f"peak RSS increase: pandas={peaks['pandas']:,.0f} MiB polars={peaks['polars']:,.0f} MiB")
+    if not equal:
+        raise click.ClickException("polars engine output differs from the pandas engine")
+
+
+@cli.command("text-features")
+@click.option("--rows", type=int, default=100_000, show_default=True, help="Number of synthetic training rows.")
+@click.option("--phrases", type=int, default=50_000, show_default=True, help="Distinct ingredient phrases.")
+@click.option("--n-features", type=int, default=2**18, show_default=True, help="Hashed columns of the hashing path.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_text_features(rows: int, phrases: int, n_features: int, seed: int) -> None:
+    """Ingredient featurizers of `build_preprocessor`: TF-IDF vs feature hashing (accuracy, time, latency, size)."""
+    import cloudpickle
+    from sklearn.linear_model import Ridge
+    from sklearn.metrics import root_mean_squared_error
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+
+    from application.preprocessing import build_preprocessor
+
+    X, y = _synthetic_training_frame(rows, phrases, seed)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed)
+    batch_n = min(1_000, len(X_test))
+
+    variants = {
+        "tfidf": dict(text_features="tfidf"),
+        "hashing+idf": dict(text_features="hashing", n_features=n_features, use_idf=True),
+        "hashing": dict(text_features="hashing", n_features=n_features, use_idf=False),
+    }
+    for name, kwargs in variants.items():
+        pipe = Pipeline([("preprocessor", build_preprocessor(**kwargs)), ("model", Ridge())])
+        _, fit_s = _timed(pipe.fit, X_train, y_train)
+        y_pred, predict_s = _timed(pipe.predict, X_test)
+        _, batch_s = _timed(pipe.predict, X_test.iloc[:batch_n])
+        _, row_s = _timed(pipe.predict, X_test.iloc[:1])
+        # mlflow serializes the pipeline with cloudpickle (the identity lambdas are not plain-picklable)
+        size_mib = len(cloudpickle.dumps(pipe)) / 2**20
+        width = pipe.named_steps["model"].n_features_in_
+        click.echo(
+            f"{name}: rmse={root_mean_squared_error(y_test, y_pred):.4f} fit={fit_s:.2f}s "
+            f"transform+predict={predict_s:.2f}s ({len(X_test):,} rows) "
+            f"latency={batch_s / batch_n * 1000:.3f}ms/row (batch {batch_n}) single_row={row_s * 1000:.1f}ms "
+            f"features={width:,} model_size={size_mib:.2f}MiB"
+        )
+
+
+@cli.command("encodings")
+@click.option("--rows", type=int, default=100_000, show_default=True, help="Number of synthetic training rows.")
+@click.option("--phrases", type=int, default=50_000, show_default=True, help="Distinct ingredient phrases.")
+@click.option("--n-estimators", type=int, default=300, show_default=True, help="Boosting iterations of every model.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_encodings(rows: int, phrases: int, n_estimators: int, seed: int) -> None:
+    """Gradient boosting on the one-hot features vs the ordinal ones (`build_preprocessor(encoding=...)`)."""
+    from sklearn.metrics import root_mean_squared_error
+    from sklearn.model_selection import train_test_split
+    from sklearn.pipeline import Pipeline
+
+    from application.preprocessing import build_preprocessor
+    from model.registry import get_model_spec
+
+    X, y = _synthetic_training_frame(rows, phrases, seed)
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=seed)
+    batch_n = min(1_000, len(X_test))
+
+    for encoding, model_names in {
+        "onehot": ("xgboost", "lightgbm"),
+        "ordinal": ("xgboost_native", "lightgbm_native", "hgb"),
+    }.items():
+        preprocessor = build_preprocessor(encoding=encoding)
+        Z_train, preprocess_s = _timed(preprocessor.fit_transform, X_train, y_train)
+        Z_test = preprocessor.transform(X_test)
+        click.echo(f"{encoding}: features={Z_train.shape[1]:,} preprocess={preprocess_s:.2f}s")
+        for model_name in model_names:
+            size = {"max_iter" if model_name == "hgb" else "n_estimators": n_estimators}
+            model = get_model_spec(model_name).build(size, preprocessor)
+            _, fit_s = _timed(model.fit, Z_train, y_train)
+            y_pred = model.predict(Z_test)
+            # served latency: the whole pipeline, preprocessing included
+            pipe = Pipeline([("preprocessor", preprocessor), ("model", model)])
+            _, batch_s = _timed(pipe.predict, X_test.iloc[:batch_n])
+            click.echo(
+                f"  {model_name}: rmse={root_mean_squared_error(y_test, y_pred):.4f} fit={fit_s:.2f}s "
+                f"latency={batch_s / batch_n * 1000:.3f}ms/row (batch {batch_n})"
+            )
+
+
+# loads a saved model in a fresh interpreter (cwd outside the repository, so only code_paths can provide imports)
+_LOAD_SCRIPT = """
+import pickle, sys, time
+import mlflow.pyfunc
+t0 = time.perf_counter()
+mlflow.pyfunc.load_model(sys.argv[1])
+load_s = time.perf_counter() - t0
+# deserialization alone, with every module already imported
+with open(sys.argv[1] + "/model.pkl", "rb") as f:
+    t0 = time.perf_counter()
+    pickle.load(f)
+print(load_s, time.perf_counter() - t0)
+"""
+
+
+def _cold_load_seconds(model_path: str, repeats: int) -> tuple[float, float]:
+    """Median (``mlflow.pyfunc.load_model``, unpickle) seconds over fresh interpreters (mlflow import excluded)."""
+    runs = []
+    for _ in range(repeats):
+        out = subprocess.run(
+            [sys.executable, "-c", _LOAD_SCRIPT, model_path],
+            cwd=tempfile.gettempdir(),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        runs.append(tuple(map(float, out.stdout.strip().splitlines()[-1].split())))
+    return statistics.median(r[0] for r in runs), statistics.median(r[1] for r in runs)
+
+
+@cli.command("model-load")
+@click.option("--rows", type=int, default=50_000, show_default=True, help="Number of synthetic training rows.")
+@click.option("--repeats", type=int, default=5, show_default=True, help="Cold loads / latency runs per variant.")
+@click.option("--seed", type=int, default=settings.SEED, show_default=True, help="Random seed for the input.")
+def bench_model_load(rows: int, repeats: int, seed: int) -> None:
+    """Logged pipeline: lambda preprocessor (cloudpickle) vs `menu_transformers` (pickle + code_paths)."""
+    import mlflow.pyfunc
+    import mlflow.sklearn
+    from sklearn.linear_model import Ridge
+    from sklearn.pipeline import Pipeline
+
+    from application.preprocessing import build_preprocessor
+    from menu_transformers import CODE_PATH
+
+    X, y = _synthetic_training_frame(rows, max(rows // 2, 1), seed)
+    X_serve = X.iloc[:1_000]
+    variants = {
+        "reference": (_reference_build_preprocessor(), dict(serialization_format="cloudpickle")),
+        "current": (
+            build_preprocessor(),
+            dict(serialization_format=mlflow.sklearn.SERIALIZATION_FORMAT_PICKLE, code_paths=[CODE_PATH]),
+        ),
+    }
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (preprocessor, save_kwargs) in variants.items():
+            pipe = Pipeline([("preprocessor", preprocessor), ("model", Ridge())]).fit(X, y)
+            path = f"{tmp}/{name}"
+            mlflow.sklearn.save_model(pipe, path, **save_kwargs)
+            load_s, unpickle_s = _cold_load_seconds(path, repeats)
+
+            model = mlflow.pyfunc.load_model(path)
+            model.predict(X_serve.iloc[:1])  # warm-up
+            row_s = statistics.median(_timed(model.predict, X_serve.iloc[[i]])[1] for i in range(repeats * 20))
+            batch_s = statistics.median(_timed(model.predict, X_serve)[1] for _ in range(repeats))
+            results[name] = model.predict(X_serve)
+            click.echo(
+                f"{name}: load={load_s * 1000:.0f}ms unpickle={unpickle_s * 1000:.1f}ms single_row={row_s * 1000:.2f}ms "
+                f"batch={batch_s / len(X_serve) * 1000:.4f}ms/row ({len(X_serve)} rows)"
+            )
+
+    equal = bool(np.allclose(results["reference"], results["current"]))
+    click.echo(f"predictions equal={equal}")
+    if not equal:
+        raise click.ClickException("menu_transformers pipeline predictions differ from the lambda pipeline")
+
+
+if __name__ == "__main__":
+    cli()
@@ -5,7 +5,8 @@ import mlflow
 from loguru import logger
 
 from application.config import apply_global_settings, configure_mlflow_backend
-from application.dataset import generate_training_sample
+from application.dataset import generate_training_sample, refresh_training_sample
+from application.dataset.config import Config
 from core import __version__, settings
 from model import REGISTRY
 from pipelines import autotune_pipeline, dwh_export_pipeline
@@ -57,13 +58,50 @@ def _validate_model_names(_: click.Context, __: click.Option, value: str | None)
     return parts
 
 
-def _print_plan(models, data_path, n_trials, cv_folds, scoring, best_model_registry_name):
+def _parse_fidelities(_: click.Context, __: click.Option, value: str) -> tuple[float, ...]:
+    """click callback: comma-separated fractions of the training rows (validated by ``tune_model``)."""
+    try:
+        return tuple(float(f) for f in value.split(",") if f.strip())
+    except ValueError as e:
+        raise click.BadParameter(f"Expected comma-separated fractions such as 0.1,0.3,1 (got {value!r})") from e
+
+
+def _split_columns(value: str) -> tuple[str, ...]:
+    """Parse a comma-separated list of column names."""
+    return tuple(c.strip() for c in value.split(",") if c.strip())
+
+
+def _print_plan(
+    models,
+    data_path,
+    n_trials,
+    cv_folds,
+    scoring,
+    best_model_registry_name,
+    text_features,
+    n_workers,
+    storage,
+    pruner,
+    prune_iterations,
+    trial_artifacts,
+    top_k,
+    fidelities,
+    warm_start_trials,
+    warm_start_similarity,
+):
     click.echo(
         "Plan:\n"
         f"  Models: {models}\n"
         f"  Data path: {data_path or '<settings default>'}\n"
         f"  Optuna trials: {n_trials}, CV folds: {cv_folds}\n"
+        f"  Tuning workers: {n_workers}, Optuna storage: {storage or '<in-memory>'}\n"
+        f"  Pruner: {pruner} (boosting iterations: {'on' if prune_iterations else 'off'})\n"
+        f"  Trial artifacts: {f'top-{top_k}' if trial_artifacts == 'top-k' else trial_artifacts}\n"
+        f"  Fidelities: {', '.join(f'{f:g}' for f in fidelities)}\n"
+        f"  Warm start: {min(warm_start_trials, n_trials)} best configuration(s) of a study sharing >= {warm_start_similarity:.0%} "
+        "of the rows\n"
         f"  Scoring criterion: {scoring}\n"
+        f"  Ingredient features: {text_features}\n"
         f"  Best model registry name: {best_model_registry_name}\n"
     )
 
@@ -80,6 +118,8 @@ def _print_plan(models, data_path, n_trials, cv_folds, scoring, best_model_regis
         "python -m tools.run --list-models  # list available models\n\n"
         "python -m tools.run --dry-run  # show the plan without running\n\n"
         "python -m tools.run --models dtree,xgboost --n-trials 5 --cv-folds 4\n\n"
+        "python -m tools.run --models xgboost --n-trials 200 --n-workers 4 --optuna-storage sqlite:///optuna.db\n\n"
+        "python -m tools.run --models xgboost,lightgbm --n-trials 200 --pruner halving --fidelities 0.1,0.3,1\n\n"
     ),
 )
 @click.version_option(
@@ -138,6 +178,107 @@ def _print_plan(models, data_path, n_trials, cv_folds, scoring, best_model_regis
     envvar="BEST_MODEL_REGISTRY_NAME",
     help="Name under which best model is registered in Mlflow Model Registry.",
 )
+@click.option(
+    "--text-features",
+    type=click.Choice(["tfidf", "hashing"]),
+    default="tfidf",
+    show_default=True,
+    envvar="TEXT_FEATURES",
+    help=(
+        "Ingredient featurizer: 'tfidf' (fitted phrase/bigram vocabulary) or 'hashing' "
+        "(stateless feature hashing of the same terms with IDF weights; fixed model size)."
+    ),
+)
+@click.option(
+    "--n-workers",
+    type=click.IntRange(min=1),
+    envvar="HPO_WORKERS",
+    help="Tuning worker processes per model; they run trials side by side on a shared Optuna study.",
+)
+@click.option(
+    "--optuna-storage",
+    envvar="OPTUNA_STORAGE",
+    help=(
+        "Optuna storage shared by the tuning workers: an RDB URL (sqlite:///optuna.db, postgresql://...) or "
+        "'journal:<path>'. Defaults to a temporary journal file."
+    ),
+)
+@click.option(
+    "--study-name",
+    envvar="OPTUNA_STUDY_NAME",
+    help=(
+        "Prefix of the Optuna study names ('<prefix>-<model>'). Workers on other machines join the studies by "
+        "running with the same prefix and --optuna-storage. Defaults to a name derived from the model, feature "
+        "set and training data with --optuna-storage (reruns continue the stored study), else unique to the run."
+    ),
+)
+@click.option(
+    "--pruner",
+    type=click.Choice(["none", "median", "hyperband", "halving"]),
+    default="median",
+    show_default=True,
+    envvar="OPTUNA_PRUNER",
+    help=(
+        "Optuna pruner that stops unpromising trials on their running CV score (reported after each batch of "
+        "folds): median, hyperband, successive halving, or none."
+    ),
+)
+@click.option(
+    "--prune-iterations/--no-prune-iterations",
+    default=True,
+    show_default=True,
+    envvar="PRUNE_ITERATIONS",
+    help="Let XGBoost/LightGBM trials report every boosting iteration of their first fold, and prune inside it.",
+)
+@click.option(
+    "--trial-artifacts",
+    type=click.Choice(["none", "top-k", "all"]),
+    default="top-k",
+    show_default=True,
+    envvar="TRIAL_ARTIFACTS",
+    help=(
+        "Which tuning trials get their pipeline refitted and logged (model + pred-vs-true figure): none, the "
+        "--top-k best (after the study), or all (within every trial)."
+    ),
+)
+@click.option(
+    "--top-k",
+    type=click.IntRange(min=1),
+    default=3,
+    show_default=True,
+    envvar="TRIAL_ARTIFACTS_TOP_K",
+    help="Number of best trials whose artifacts are logged under --trial-artifacts top-k.",
+)
+@click.option(
+    "--fidelities",
+    default="1",
+    show_default=True,
+    envvar="HPO_FIDELITIES",
+    callback=_parse_fidelities,
+    help=(
+        "Multi-fidelity schedule: increasing fractions of the training rows, ending at 1 (e.g. 0.1,0.3,1). Trials "
+        "are scored on stratified subsamples first; the pruner promotes the promising ones to larger fractions."
+    ),
+)
+@click.option(
+    "--warm-start-trials",
+    type=click.IntRange(min=0),
+    default=10,
+    show_default=True,
+    envvar="HPO_WARM_START_TRIALS",
+    help=(
+        "With --optuna-storage, a new study starts with this many (at most --n-trials) best configurations of the "
+        "earlier study (same model and feature set) on the most similar training data. 0 disables warm starts."
+    ),
+)
+@click.option(
+    "--warm-start-similarity",
+    type=click.FloatRange(min=0.0, max=1.0),
+    default=0.7,
+    show_default=True,
+    envvar="HPO_WARM_START_SIMILARITY",
+    help="Minimum share of training rows (Jaccard similarity) an earlier study must have in common to seed a new one.",
+)
 @click.pass_context
 def cli(
     ctx: click.Context,
@@ -148,6 +289,17 @@ def cli(
     cv_folds: int,
     scoring: str,
     best_model_registry_name: str,
+    text_features: str,
+    n_workers: int | None,
+    optuna_storage: str | None,
+    study_name: str | None,
+    pruner: str,
+    prune_iterations: bool,
+    trial_artifacts: str,
+    top_k: int,
+    fidelities: tuple[float, ...],
+    warm_start_trials: int,
+    warm_start_similarity: float,
     dry_run: bool,
 ) -> None:
     sampled_data_path = sampled_data_path or settings.SAMPLED_DATA_PATH
@@ -155,6 +307,9 @@ def cli(
     cv_folds = cv_folds or settings.CV_FOLDS
     scoring = scoring or settings.SCORING
     best_model_registry_name = best_model_registry_name or settings.BEST_MODEL_REGISTRY_NAME
+    n_workers = n_workers or settings.HPO_WORKERS
+    optuna_storage = optuna_storage or settings.OPTUNA_STORAGE
+    study_name = study_name or settings.OPTUNA_STUDY_NAME
 
     # If a subcommand is used, don't run default action
     if ctx.invoked_subcommand:
@@ -162,7 +317,24 @@ def cli(
 
     # dry-run: just show the plan and exit
     if dry_run:
-        _print_plan(models, sampled_data_path, n_trials, cv_folds, scoring, best_model_registry_name)
+        _print_plan(
+            models,
+            sampled_data_path,
+            n_trials,
+            cv_folds,
+            scoring,
+            best_model_registry_name,
+            text_features,
+            n_workers,
+            optuna_storage,
+            pruner,
+            prune_iterations,
+            trial_artifacts,
+            top_k,
+            fidelities,
+            warm_start_trials,
+            warm_start_similarity,
+        )
         raise SystemExit(0)
     # quick list-and-exit
     elif list_models:
@@ -172,7 +344,24 @@ def cli(
         # apply global settings (seed, matplotlib, warnings)
         apply_global_settings()
 
-        _print_plan(models, sampled_data_path, n_trials, cv_folds, scoring, best_model_registry_name)
+        _print_plan(
+            models,
+            sampled_data_path,
+            n_trials,
+            cv_folds,
+            scoring,
+            best_model_registry_name,
+            text_features,
+            n_workers,
+            optuna_storage,
+            pruner,
+            prune_iterations,
+            trial_artifacts,
+            top_k,
+            fidelities,
+            warm_start_trials,
+            warm_start_similarity,
+        )
 
         # Setup mlflow
         tracking_uri = configure_mlflow_backend()
@@ -190,6 +379,17 @@ def cli(
                 cv_folds=cv_folds,
                 scoring=scoring,
                 best_model_registry_name=best_model_registry_name,
+                text_features=text_features,
+                n_workers=n_workers,
+                storage=optuna_storage,
+                study_name=study_name,
+                pruner=pruner,
+                prune_iterations=prune_iterations,
+                trial_artifacts=trial_artifacts,
+                top_k=top_k,
+                fidelities=fidelities,
+                warm_start_trials=warm_start_trials,
+                warm_start_similarity=warm_start_similarity,
             )
             logger.info(f"Best model: {result['best_model_name']}")
         except Exception as e:
@@ -201,16 +401,112 @@ def cli(
 # New: simple no-arg generator command
 # --------------------------
 @cli.command("generate-train-sample")
-def generate():
+@click.option(
+    "--engine",
+    type=click.Choice(["pandas", "polars"]),
+    default="pandas",
+    show_default=True,
+    help="Engine for the cleaning/selection stages before NER ('polars' needs the optional polars package).",
+)
+@click.option(
+    "--refresh-cache",
+    is_flag=True,
+    help="Re-download and re-convert the Kaggle inputs instead of reading the local dataset cache.",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help=(
+        "Recompute every stage, ignoring (and overwriting) existing checkpoints. Not needed after changes to the "
+        "sampling or NER code, which are part of the checkpoint keys; needed after changes elsewhere (e.g. a "
+        "dependency upgrade) that alter the stage outputs."
+    ),
+)
+@click.option(
+    "--chunk-rows",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Out-of-core mode: stream the menus in chunks of this many rows (bounded memory, pandas engine only).",
+)
+@click.option(
+    "--sample-strata",
+    default="",
+    help="Comma-separated columns to stratify the row sample on (e.g. 'state_id,category').",
+)
+@click.option(
+    "--per-stratum",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Keep at most this many rows per stratum (seeded reservoir sampling before NER).",
+)
+@click.option(
+    "--sample-size",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Keep at most this many rows in total (seeded reservoir sampling before NER).",
+)
+@click.option(
+    "--outlier-groups",
+    default="",
+    help="Comma-separated columns to compute the IQR price bounds per group of (e.g. 'category,state_id').",
+)
+@click.option(
+    "--outlier-sketch-compression",
+    type=click.IntRange(min=10),
+    default=None,
+    help="Compute the IQR bounds from mergeable quantile sketches of about this many centroids (default: exact).",
+)
+@click.option(
+    "--csv-export/--no-csv-export",
+    default=True,
+    show_default=True,
+    help="Also write the CSV export next to the typed (Parquet) sample that training loads.",
+)
+@click.option(
+    "--incremental",
+    is_flag=True,
+    help="Refresh the previous sample: NER only runs on new/changed descriptions (with --force: full rebuild).",
+)
+@click.option(
+    "--drift-threshold",
+    type=click.FloatRange(min=0.0, max=1.0),
+    default=0.05,
+    show_default=True,
+    help="With --incremental: category drift above which the top categories/cities and bounds are recomputed.",
+)
+def generate(
+    engine: str,
+    refresh_cache: bool,
+    force: bool,
+    chunk_rows: int | None,
+    sample_strata: str,
+    per_stratum: int | None,
+    sample_size: int | None,
+    outlier_groups: str,
+    outlier_sketch_compression: int | None,
+    csv_export: bool,
+    incremental: bool,
+    drift_threshold: float,
+):
     """
     Generates a sampled, feature-enriched training dataset from the published data warehouse exports on Kaggle.
 
     \b
-    - Output: {settings.TRAINING_DATA_SAMPLE_PATH}
+    - Output: {settings.TRAINING_DATA_SAMPLE_PATH} (CSV export) and the typed sample next to it (.parquet, native
+      ingredient lists), which training loads.
     - Produces a cleaned, enriched subset of crawled restaurant data for model training.
     - Includes NER-extracted ingredients, cost-of-living index, and location features (e.g., population density).
     - Removes price outliers and normalizes price ranges into buckets.
     - Requires internet access for NER model download on first run.
+    - Checkpoints stage outputs; a rerun with unchanged inputs/config resumes after the last valid checkpoint
+      (per-stage timings and cache hits are logged in the stage summary).
+    - --chunk-rows N streams the menus in N-row chunks (two passes, no checkpoints) for inputs too large for memory.
+    - --sample-strata/--per-stratum/--sample-size draw a seeded (settings.SEED) stratified sample of the selected
+      rows before NER, e.g. a small fast-iteration dataset: --sample-strata state_id,category --per-stratum 200.
+    - --outlier-groups computes the IQR price bounds per group (e.g. category,state_id) instead of globally;
+      --outlier-sketch-compression bounds the quantile sketches the bounds are computed from (approximate).
+    - --incremental refreshes the previous sample from the current exports: only new or changed descriptions go
+      through NER, and the selection is kept unless the category drift exceeds --drift-threshold.
 
     Sampling and filtering logic (to be made configurable):
     - Focuses on top restaurant categories (e.g., Sandwiches, Salads, Wraps).
@@ -218,10 +514,28 @@ def generate():
     - Filters for top US states by restaurant count (e.g., TX, VA, WA, WI, UT).
 
     """
+    strata = _split_columns(sample_strata)
+    if per_stratum is not None and not strata:
+        raise click.BadParameter("--per-stratum needs --sample-strata.", param_hint="--per-stratum")
     try:
         # apply global settings (seed, matplotlib, warnings)
         apply_global_settings()
-        _ = generate_training_sample()
+        cfg = Config(
+            engine=engine,
+            refresh_cache=refresh_cache,
+            chunk_rows=chunk_rows,
+            sample_strata=strata,
+            sample_per_stratum=per_stratum,
+            sample_size=sample_size,
+            outlier_groups=_split_columns(outlier_groups),
+            outlier_sketch_compression=outlier_sketch_compression,
+            drift_threshold=drift_threshold,
+            export_csv=csv_export,
+        )
+        if incremental:
+            _ = refresh_training_sample(cfg, full=force)
+        else:
+            _ = generate_training_sample(cfg, force=force)
         logger.info(f"Data generation complete -> {settings.SAMPLED_DATA_PATH}")
     except Exception as e:
         logger.error(f"Data generation failed: {e}")